@@ -0,0 +1,145 @@
+try:
+    import numpy as np
+except ImportError:  # batch scoring is optional
+    np = None
+
+
+def encode_strings(strings):
+    """Code points of each string in a zero-padded (len(strings), max_length) matrix"""
+    lengths = np.fromiter((len(s) for s in strings), dtype=np.int64, count=len(strings))
+    width = int(lengths.max()) if len(strings) else 0
+    codes = np.zeros((len(strings), width), dtype=np.uint32)
+    for row, s in enumerate(strings):
+        if s:
+            codes[row, :len(s)] = np.frombuffer(s.encode('utf-32-le'), dtype=np.uint32)
+    return codes, lengths
+
+
+def batch_levenshtein_distance(text, codes, lengths):
+    """
+    Levenshtein distance from text to every row of an encode_strings() matrix.
+    The DP runs one row per character of text over all targets at once; the
+    left-to-right deletion chain inside a row is a running minimum:
+    cur[j] = min_k(tmp[k] + j - k) = minimum.accumulate(tmp - j) + j
+    Padding never matters because a cell only depends on columns to its left.
+    """
+    count, width = codes.shape
+    columns = np.arange(width + 1, dtype=np.int64)
+    previous_row = np.broadcast_to(columns, (count, width + 1)).copy()
+    current_row = np.empty_like(previous_row)
+
+    text_codes = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32) if text else ()
+    for i, code in enumerate(text_codes, 1):
+        substitution_cost = (codes != code).astype(np.int64)
+        current_row[:, 0] = i
+        np.minimum(previous_row[:, 1:] + 1, previous_row[:, :-1] + substitution_cost, out=current_row[:, 1:])
+        current_row -= columns
+        np.minimum.accumulate(current_row, axis=1, out=current_row)
+        current_row += columns
+        previous_row, current_row = current_row, previous_row
+
+    return previous_row[np.arange(count), lengths]
+
+
+def batch_levenshtein_similarity(text, codes, lengths):
+    """Vectorized TextProcessor.levenshtein_similarity against every row"""
+    distances = batch_levenshtein_distance(text, codes, lengths)
+    max_lengths = np.maximum(lengths, len(text))
+    similarities = np.ones(len(lengths), dtype=np.float64)  # both empty -> 1.0
+    nonempty = max_lengths > 0
+    similarities[nonempty] = 1 - (distances[nonempty] / max_lengths[nonempty])
+    return similarities
+
+
+class BatchScorer:
+    """
+    NumPy version of TextProcessor.compiled_similarity for one input against
+    many compiled patterns. Patterns are turned into arrays once:
+    - a padded code-point matrix of the normalized phrases
+    - sparse (CSR-style) stem-id and token-id lists per pattern
+    - a padded code-point matrix of the token vocabulary
+    Scores are bit-for-bit the ones the scalar path returns.
+    """
+    def __init__(self, compiled_patterns):
+        if np is None:
+            raise ImportError("Batch scoring needs NumPy (pip install numpy)")
+
+        self.count = len(compiled_patterns)
+        self.phrase_codes, self.phrase_lengths = encode_strings(
+            [pattern.normalized for pattern in compiled_patterns]
+        )
+
+        self.stem_ids = {}
+        stem_rows, stem_columns = [], []
+        for row, pattern in enumerate(compiled_patterns):
+            for stem in pattern.stems:
+                stem_rows.append(row)
+                stem_columns.append(self.stem_ids.setdefault(stem, len(self.stem_ids)))
+        self.stem_rows = np.array(stem_rows, dtype=np.int64)
+        self.stem_columns = np.array(stem_columns, dtype=np.int64)
+        self.stem_counts = np.bincount(self.stem_rows, minlength=self.count)
+
+        self.vocabulary_ids = {}
+        token_columns = []
+        token_indptr = [0]
+        for pattern in compiled_patterns:
+            for token in pattern.tokens:
+                token_columns.append(self.vocabulary_ids.setdefault(token, len(self.vocabulary_ids)))
+            token_indptr.append(len(token_columns))
+        self.token_columns = np.array(token_columns, dtype=np.int64)
+        token_indptr = np.array(token_indptr, dtype=np.int64)
+        self.token_counts = np.diff(token_indptr)
+        self.token_rows_with_tokens = np.flatnonzero(self.token_counts)
+        self.token_starts = token_indptr[:-1][self.token_rows_with_tokens]
+        self.vocabulary_codes, self.vocabulary_lengths = encode_strings(list(self.vocabulary_ids))
+
+    def jaccard(self, compiled_input):
+        input_ids = [self.stem_ids[stem] for stem in compiled_input.stems if stem in self.stem_ids]
+        shared = np.isin(self.stem_columns, input_ids)
+        intersection = np.bincount(self.stem_rows[shared], minlength=self.count)
+        union = self.stem_counts + len(compiled_input.stems) - intersection
+        scores = np.zeros(self.count, dtype=np.float64)
+        valid = (self.stem_counts > 0) & (union > 0)
+        scores[valid] = intersection[valid] / union[valid]
+        return scores
+
+    def token_average(self, compiled_input):
+        scores = np.zeros(self.count, dtype=np.float64)
+        if not compiled_input.tokens or not len(self.token_rows_with_tokens):
+            return scores
+
+        vocabulary_similarities = {}
+        total = np.zeros(len(self.token_rows_with_tokens), dtype=np.float64)
+        for token in compiled_input.tokens:
+            if token not in vocabulary_similarities:
+                vocabulary_similarities[token] = batch_levenshtein_similarity(
+                    token, self.vocabulary_codes, self.vocabulary_lengths
+                )
+            # Best token of each pattern (rows without tokens were dropped from the starts)
+            best = np.maximum.reduceat(vocabulary_similarities[token][self.token_columns], self.token_starts)
+            total = total + best  # same left-to-right order as sum() over the tokens
+
+        scores[self.token_rows_with_tokens] = total / len(compiled_input.tokens)
+        return scores
+
+    def dp_cells(self, compiled_input, rows=None):
+        """DP cells scores() evaluates, padding included (for Instrumentation)"""
+        phrase_rows = self.count if rows is None else len(rows)
+        phrase_cells = len(compiled_input.normalized) * phrase_rows * self.phrase_codes.shape[1]
+        token_cells = sum(len(token) for token in set(compiled_input.tokens)) * self.vocabulary_codes.size
+        return phrase_cells + token_cells
+
+    def scores(self, compiled_input, rows=None):
+        """Similarity of the input to every pattern (or to the given rows only)"""
+        jaccard = self.jaccard(compiled_input)
+        token_average = self.token_average(compiled_input)
+
+        if rows is None:
+            phrase = batch_levenshtein_similarity(compiled_input.normalized, self.phrase_codes, self.phrase_lengths)
+            return np.maximum(np.maximum(jaccard, phrase), token_average)
+
+        rows = np.asarray(rows, dtype=np.int64)
+        phrase = batch_levenshtein_similarity(
+            compiled_input.normalized, self.phrase_codes[rows], self.phrase_lengths[rows]
+        )
+        return np.maximum(np.maximum(jaccard[rows], phrase), token_average[rows])
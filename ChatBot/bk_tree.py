@@ -0,0 +1,81 @@
+class BKTree:
+    """
+    Burkhard-Keller tree over a vocabulary, for any metric distance.
+    Children are keyed by their distance to the parent, so by the triangle
+    inequality a search within radius r only has to visit children keyed
+    between d - r and d + r.
+    """
+    def __init__(self, distance, words=()):
+        self.distance = distance  # callable(a, b) -> int
+        self.root = None          # (word, {distance: child})
+        self.size = 0
+
+        for word in words:
+            self.add(word)
+
+    def __len__(self):
+        return self.size
+
+    def add(self, word, owned=None):
+        """
+        owned: ids of the children dicts this tree may modify. If given, the
+        nodes on the way down are copied unless owned, so a tree made by
+        extended() never changes the nodes it shares.
+        """
+        if self.root is None:
+            self.root = (word, {})
+            self.size = 1
+            if owned is not None:
+                owned.add(id(self.root[1]))
+            return
+
+        if owned is not None and id(self.root[1]) not in owned:
+            self.root = (self.root[0], dict(self.root[1]))
+            owned.add(id(self.root[1]))
+        node_word, children = self.root
+        while True:
+            distance = self.distance(word, node_word)
+            if distance == 0:
+                return  # already in the tree
+            child = children.get(distance)
+            if child is None:
+                children[distance] = (word, {})
+                if owned is not None:
+                    owned.add(id(children[distance][1]))
+                self.size += 1
+                return
+            if owned is not None and id(child[1]) not in owned:
+                child = children[distance] = (child[0], dict(child[1]))
+                owned.add(id(child[1]))
+            node_word, children = child
+
+    def extended(self, words, distance=None):
+        """
+        A new tree holding this one's words plus words, measured with distance
+        (default: this tree's). This tree is left as it is; the new one shares
+        every node the additions don't pass through.
+        """
+        tree = BKTree(distance or self.distance)
+        tree.root, tree.size = self.root, self.size
+        owned = set()
+        for word in words:
+            tree.add(word, owned)
+        return tree
+
+    def search(self, word, max_distance):
+        """Return [(distance, vocabulary_word)] for every word within max_distance"""
+        results = []
+        if self.root is None:
+            return results
+
+        stack = [self.root]
+        while stack:
+            node_word, children = stack.pop()
+            distance = self.distance(word, node_word)
+            if distance <= max_distance:
+                results.append((distance, node_word))
+            for edge, child in children.items():
+                if abs(edge - distance) <= max_distance:
+                    stack.append(child)
+
+        return results
@@ -1,83 +1,149 @@
+import copy
+import json
+import os
 import random
 import re
+import threading
+import time
 from .sentiment_analyzer import GenZSentimentAnalyzer
 from .text_processor import TextProcessor 
 from .data_manager import DataManager
+from .compiled_index import load_compiled_index, write_compiled_index
+from .mapped_file import file_checksum, words_checksum
+from .instrumentation import NULL_INSTRUMENTATION
+from .intent_snapshot import IntentSnapshot
+
+
+def phrase_pattern(phrases):
+    """One regex that finds any of phrases, in a single scan instead of one per phrase"""
+    return re.compile('|'.join(re.escape(phrase) for phrase in phrases))
+
+
+# Matchers for the extraction stages, compiled once. They run on the lowercased message.
+WELLBEING_PHRASES = phrase_pattern([
+    "doing great", "doin great", "doing good", "doin good",
+    "doing fine", "doin fine", "doing well", "doin well",
+    "i'm good", "im good", "i'm fine", "im fine",
+    "i'm well", "im well", "i'm okay", "im okay",
+    "i'm feeling well", "im feeling well", "feeling well", 
+    "feeling good", "feeling great", "feeling fine"    
+])
+
+NON_NAME_WORDS = frozenset({
+    'also', 'just', 'really', 'very', 'quite', 'actually', 
+    'doing', 'feeling', 'good', 'great', 'well', 'fine',
+    'sad', 'happy', 'angry', 'excited', 'tired', 'bored',
+    'confused', 'stressed', 'worried', 'nervous', 'scared',
+    'disappointed', 'frustrated', 'annoyed', 'upset', 'mad',
+    'glad', 'pleased', 'thrilled', 'delighted', 'content'
+})
+
+# Emotion words that should NOT be treated as names
+EMOTION_WORDS = frozenset({
+    'sad', 'happy', 'angry', 'excited', 'tired', 'bored',
+    'confused', 'stressed', 'worried', 'nervous', 'scared',
+    'disappointed', 'frustrated', 'annoyed', 'upset', 'mad',
+    'glad', 'pleased', 'thrilled', 'delighted', 'content',
+    'fine', 'good', 'great', 'well', 'okay', 'alright'
+})
+
+# Every name pattern below needs one of these cues before the name, so a message
+# without one skips them all
+NAME_CUE = re.compile(r"(?:my name is|i'?m|i am|call me)\s+\w")
+
+USER_INFO_NAME_PATTERNS = [re.compile(pattern) for pattern in (
+    r"^(?:hi|hello|hey),?\s*(?:my name is|i'?m|i am)\s+(\w+)",
+    r"(?:my name is|i'?m|i am)\s+(\w+)(?:$|[\.,!?])",
+    r"call me\s+(\w+)"
+)]
+
+INTRODUCTION_NAME_PATTERNS = [re.compile(pattern) for pattern in (
+    r"(?:hi|hello|hey),?\s*(?:my name is|i'?m|i am)\s+(\w+)",
+    r"(?:my name is)\s+(\w+)",
+    r"(?:call me)\s+(\w+)",
+    r"^(?:i'?m|i am)\s+(\w+)(?:\s+and|$|[\.,!?])",
+)]
+
+NAME_QUESTION = phrase_pattern(["what is my name", "what's my name", "who am i", "do you know my name", "tell me my name", "my name"])
+GREETING = phrase_pattern(["hello", "hi"])
+HOW_ARE_YOU = phrase_pattern(["how are you", "what's up", "how's it going", "what's good"])
+RECALL_QUESTION = phrase_pattern(["what did i say", "what was i talking about", "before", "earlier"])
 
 class MeowBot:
-    def __init__(self, data_file=r'ChatBot\data\chatbot_data.json'):
-        self.data_manager = DataManager(data_file)
-        self.text_processor = TextProcessor()
-        self.sentiment_analyzer = GenZSentimentAnalyzer()
-        self.data = self.data_manager.load_data()
-        self.session_id = self.data_manager.start_new_session()
+    def __init__(self, data_file=r'ChatBot\data\chatbot_data.json', distance_backend='bitparallel',
+                 batch_scoring=False, start_session=True, data_manager=None, instrumentation=None,
+                 cache_size=1024, reload_interval=1.0, compiled_index=None, sentiment_lexicon=None):
+        # Pass a configured DataManager to pick the memory storage backend
+        self.data_manager = data_manager or DataManager(data_file)
+        self.text_processor = TextProcessor(distance_backend, batch_scoring=batch_scoring)
+        # Pass an Instrumentation to record per-stage timings and similarity work (see get_stats)
+        self.instrumentation = instrumentation or NULL_INSTRUMENTATION
+        if instrumentation is not None:
+            self.text_processor.instrumentation = instrumentation
+        # Extra slang lexicon file, compiled next to it and memory-mapped (see compiled_lexicon.py)
+        self.sentiment_analyzer = GenZSentimentAnalyzer(lexicon_file=sentiment_lexicon)
+        # Scoring results for repeated messages ("hi", "no cap"); cache_size=0 turns them off
+        self.cache_size = cache_size
+        # How often (seconds) to stat the intent file for edits; None never looks
+        self.reload_interval = reload_interval
+        self._reload_lock = threading.Lock()
+        self._next_reload_check = time.monotonic() + (reload_interval or 0)
+        # Compiled intent file (see compiled_index.py) to map at startup; rewritten if stale
+        self.compiled_index = compiled_index
+        self.snapshot = self.build_snapshot()
+        # Offline evaluation workers have no conversation, so they leave the memory file alone
+        self.session_id = self.data_manager.start_new_session() if start_session else None
      
-    def extract_user_info(self, user_input):
+    def extract_user_info(self, user_input, lower_input=None):
+        """lower_input: user_input.lower(), if the caller already has it"""
+        if lower_input is None:
+            lower_input = user_input.lower()
         user_context = {}
         
-        wellbeing_phrases = [
-            "doing great", "doin great", "doing good", "doin good",
-            "doing fine", "doin fine", "doing well", "doin well",
-            "i'm good", "im good", "i'm fine", "im fine",
-            "i'm well", "im well", "i'm okay", "im okay",
-            "i'm feeling well", "im feeling well", "feeling well", 
-            "feeling good", "feeling great", "feeling fine"    
-        ]
-        
-        non_name_words = {
-            'also', 'just', 'really', 'very', 'quite', 'actually', 
-            'doing', 'feeling', 'good', 'great', 'well', 'fine',
-            'sad', 'happy', 'angry', 'excited', 'tired', 'bored',
-            'confused', 'stressed', 'worried', 'nervous', 'scared',
-            'disappointed', 'frustrated', 'annoyed', 'upset', 'mad',
-            'glad', 'pleased', 'thrilled', 'delighted', 'content'
-        }
-        
-        lower_input = user_input.lower()
-        if any(phrase in lower_input for phrase in wellbeing_phrases):
+        if WELLBEING_PHRASES.search(lower_input):
             return user_context  
         
-        name_patterns = [
-            r"^(?:hi|hello|hey),?\s*(?:my name is|i'?m|i am)\s+(\w+)",
-            r"(?:my name is|i'?m|i am)\s+(\w+)(?:$|[\.,!?])",
-            r"call me\s+(\w+)"
-        ]
-        
-        
-        for pattern in name_patterns:
-            match = re.search(pattern, user_input, re.IGNORECASE)
-            if match:
-                possible_name = match.group(1).lower()
-                if (len(possible_name) > 2 and 
-                    possible_name not in non_name_words and
-                    possible_name.isalpha()):
-                    user_context["name"] = possible_name.capitalize()
-                    break
+        if NAME_CUE.search(lower_input):
+            for pattern in USER_INFO_NAME_PATTERNS:
+                match = pattern.search(lower_input)
+                if match:
+                    possible_name = match.group(1)
+                    if (len(possible_name) > 2 and 
+                        possible_name not in NON_NAME_WORDS and
+                        possible_name.isalpha()):
+                        user_context["name"] = possible_name.capitalize()
+                        break
         
         
         # preferences
-        if "i like" in user_input.lower():
-            preference = user_input.lower().split("i like")[1].strip()
+        if "i like" in lower_input:
+            preference = lower_input.split("i like")[1].strip()
             if "likes" not in user_context:
                 user_context["likes"] = []
             user_context["likes"].append(preference)
         
-        if "i hate" in user_input.lower() or "i don't like" in user_input.lower():
-            dislike = user_input.lower().replace("i hate", "").replace("i don't like", "").strip()
+        if "i hate" in lower_input or "i don't like" in lower_input:
+            dislike = lower_input.replace("i hate", "").replace("i don't like", "").strip()
             if "dislikes" not in user_context:
                 user_context["dislikes"] = []
             user_context["dislikes"].append(dislike)
         
         return user_context
     
-    def get_context_aware_response(self, user_input, base_response):
-        user_context = self.data_manager.get_user_context()
-        recent_conversations = self.data_manager.get_recent_conversations(5)
+    def get_context_aware_response(self, user_input, base_response, user_context=None, recent_conversations=None,
+                                   bot_data=None, lower_input=None):
+        if bot_data is None:
+            bot_data = self.data
+        if user_context is None:
+            user_context = self.data_manager.get_user_context()
+        if recent_conversations is None:
+            recent_conversations = self.data_manager.get_recent_conversations(5)
+        if lower_input is None:
+            lower_input = user_input.lower()
 
-        if any(phrase in user_input.lower() for phrase in ["what is my name", "what's my name", "who am i", "do you know my name", "tell me my name", "my name"]):
+        if NAME_QUESTION.search(lower_input):
             if "name" in user_context:
                 from random import choice
-                bot_data = self.data_manager.load_data()
                 user_name_intent = bot_data.get("user_name", {})
                 responses = user_name_intent.get("responses", [])
                 if responses:
@@ -89,9 +155,9 @@ class MeowBot:
                 
         if "name" in user_context:
             name = user_context["name"]
-            if "hello" in user_input.lower() or "hi" in user_input.lower():
+            if GREETING.search(lower_input):
                 return f"Hey {name}! {base_response}"
-            elif any(word in user_input.lower() for word in ["how are you", "what's up", "how's it going", "what's good"]):
+            elif HOW_ARE_YOU.search(lower_input):
                 return f"I'm doing great, {name}! {base_response}"
         
         # Reference previous topics if relevant
@@ -99,136 +165,268 @@ class MeowBot:
             last_conversation = recent_conversations[-1]
             
             # If user asks "what did I just say" or similar
-            if any(phrase in user_input.lower() for phrase in ["what did i say", "what was i talking about", "before", "earlier"]):
+            if RECALL_QUESTION.search(lower_input):
                 return f"You were saying: '{last_conversation['user_input']}'"
         
         return base_response
     
-    def find_best_intent_match(self, user_input, threshold=0.3):
+    # The current snapshot's parts, for code that doesn't need a consistent view across calls
+    @property
+    def data(self):
+        return self.snapshot.data
+    
+    @property
+    def intent_index(self):
+        return self.snapshot.intent_index
+    
+    @property
+    def typo_corrector(self):
+        return self.snapshot.typo_corrector
+    
+    def data_file_signature(self):
+        try:
+            stat = os.stat(self.data_manager.data_file)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+    
+    def build_snapshot(self, previous=None):
+        # Stat before reading, so an edit landing mid-read is still seen next time
+        signature = self.data_file_signature()
+        data_version = self.data_manager.data_version
+        extra_words = self.sentiment_analyzer.lexicon_words()
+        
+        # At startup, map the compiled index if it was built from this very file
+        source_checksum = None
+        if previous is None and self.compiled_index:
+            try:
+                source_checksum = file_checksum(self.data_manager.data_file)
+            except OSError:
+                pass
+        data = self.data_manager.load_data()
+        compiled = None
+        if source_checksum is not None:
+            compiled = load_compiled_index(self.compiled_index, source_checksum, words_checksum(extra_words))
+        
+        snapshot = IntentSnapshot(
+            data, self.text_processor, extra_words,
+            signature, data_version, self.cache_size, previous, compiled
+        )
+        if source_checksum is not None and compiled is None:
+            try:
+                write_compiled_index(self.compiled_index, snapshot, source_checksum, words_checksum(extra_words))
+            except OSError as e:
+                print(f"Could not write compiled index {self.compiled_index}: {e}")
+        return snapshot
+    
+    def reload_if_changed(self, force=False):
+        """
+        Swap in a new snapshot if the intent data changed: saved through the
+        DataManager, or the file edited on disk (mtime/size, checked at most every
+        reload_interval seconds). Only changed intents are recompiled; requests
+        already running finish on the snapshot they started with.
+        Returns True if a new snapshot was swapped in.
+        """
+        snapshot = self.snapshot
+        if not force and self.data_manager.data_version == snapshot.data_version:
+            if self.reload_interval is None:
+                return False
+            now = time.monotonic()
+            if now < self._next_reload_check:
+                return False
+            self._next_reload_check = now + self.reload_interval
+            signature = self.data_file_signature()
+            # A missing file is more likely mid-replace than deleted on purpose
+            if signature is None or signature == snapshot.signature:
+                return False
+        
+        if not self._reload_lock.acquire(blocking=False):
+            return False  # another thread is rebuilding; keep answering from the current snapshot
+        try:
+            try:
+                new_snapshot = self.build_snapshot(previous=self.snapshot)
+            except ValueError:
+                return False  # half-written JSON, try again on the next check
+            self.snapshot = new_snapshot
+        finally:
+            self._reload_lock.release()
+        return True
+    
+    def find_best_intent_match(self, user_input, threshold=0.3, snapshot=None):
         """Find the best matching intent using enhanced Levenshtein distance."""
-        best_matches = []
-        
-        # Collect all patterns with their intents and similarity scores
-        for intent, intent_data in self.data.items():
-            patterns = intent_data.get('patterns', [])
-            
-            # Use the enhanced similarity calculation
-            pattern_matches = self.text_processor.find_closest_matches(
-                user_input, patterns, threshold=threshold, top_n=1
-            )
-            
-            if pattern_matches:
-                best_pattern, best_score = pattern_matches[0]
-                best_matches.append((intent, best_pattern, best_score))
-        
-        if best_matches:
-            best_matches.sort(key=lambda x: x[2], reverse=True)
-            return best_matches[0]  # (intent, pattern, score)
-        
-        return (None, None, 0.0) 
+        snapshot = snapshot or self.snapshot
+        # Matching only sees the preprocessed text, so that is all the cache key needs
+        key = ('best', self.text_processor.preprocess(user_input), threshold)
+        match = snapshot.intent_cache.get(key)
+        if match is None:
+            # Patterns are precompiled in the intent index, only the input gets preprocessed here
+            match = snapshot.intent_index.find_best_match(user_input, threshold=threshold)  # (intent, pattern, score)
+            snapshot.intent_cache.put(key, match)
+        return match
+    
+    def find_closest_intent_patterns(self, user_input, threshold=0.15, top_n=2, snapshot=None):
+        """Suggestions for unmatched messages, cached like find_best_intent_match"""
+        snapshot = snapshot or self.snapshot
+        key = ('closest', self.text_processor.preprocess(user_input), threshold, top_n)
+        matches = snapshot.intent_cache.get(key)
+        if matches is None:
+            matches = snapshot.intent_index.find_closest_matches(user_input, threshold=threshold, top_n=top_n)
+            snapshot.intent_cache.put(key, matches)
+        return matches
+    
+    def analyze_sentiment(self, user_input, snapshot=None):
+        """
+        GenZSentimentAnalyzer.analyze_sentiment with the snapshot's typo
+        corrector, behind the snapshot's sentiment cache.
+        The key keeps emoji and punctuation (preprocess would drop them); ASCII
+        text is lowercased since the analyzer ignores case there anyway.
+        The result is shared between callers, so treat it as read-only.
+        """
+        snapshot = snapshot or self.snapshot
+        key = user_input.strip()
+        if key.isascii():
+            key = key.lower()
+        sentiment = snapshot.sentiment_cache.get(key)
+        if sentiment is None:
+            sentiment = self.sentiment_analyzer.analyze_sentiment(user_input, snapshot.typo_corrector)
+            snapshot.sentiment_cache.put(key, sentiment)
+        return sentiment
     
-    def handle_typos_and_variations(self, user_input):
+    def cache_stats(self):
+        snapshot = self.snapshot
+        return {'intent': snapshot.intent_cache.stats(), 'sentiment': snapshot.sentiment_cache.stats()}
+    
+    def handle_typos_and_variations(self, user_input, snapshot=None):
         """Handle common typos"""
-        common_phrases = [
-            "hello", "goodbye", "thank you", "how are you", "what's up",
-            "help me", "what can you do", "who are you", "what is your name"
-        ]
-        
-        # it tries to find the closest match using fuzzy matching
-        closest_match, similarity = self.text_processor.fuzzy_match(
-            user_input, common_phrases, threshold=0.6
-        )
-        
-        if closest_match and similarity > 0.7:
-            return closest_match
-        
-        return user_input  # Return original if no good match found
+        snapshot = snapshot or self.snapshot
+        # Each misspelled word is looked up in the precomputed deletion dictionary,
+        # so "hellooo" becomes "hello" without any phrase-level fuzzy matching; words
+        # the bot knows are left as typed, so a message without typos comes back unchanged
+        return snapshot.typo_corrector.correct_text(user_input)
     
-    def is_name_introduction(self, user_input):
+    def is_name_introduction(self, user_input, lower_input=None):
         """
         Check if the input is specifically a name introduction
         """
-        # Emotion words that should NOT be treated as names
-        emotion_words = {
-            'sad', 'happy', 'angry', 'excited', 'tired', 'bored',
-            'confused', 'stressed', 'worried', 'nervous', 'scared',
-            'disappointed', 'frustrated', 'annoyed', 'upset', 'mad',
-            'glad', 'pleased', 'thrilled', 'delighted', 'content',
-            'fine', 'good', 'great', 'well', 'okay', 'alright'
-        }
+        if lower_input is None:
+            lower_input = user_input.lower()
+        if not NAME_CUE.search(lower_input):
+            return None
         
-        name_patterns = [
-            r"(?:hi|hello|hey),?\s*(?:my name is|i'?m|i am)\s+(\w+)",
-            r"(?:my name is)\s+(\w+)",
-            r"(?:call me)\s+(\w+)",
-            r"^(?:i'?m|i am)\s+(\w+)(?:\s+and|$|[\.,!?])",  
-        ]
-        
-        for pattern in name_patterns:
-            match = re.search(pattern, user_input, re.IGNORECASE)
+        for pattern in INTRODUCTION_NAME_PATTERNS:
+            match = pattern.search(lower_input)
             if match:
-                possible_name = match.group(1).lower()
+                possible_name = match.group(1)
                 # Check if it's not an emotion word and is a valid name
                 if (len(possible_name) > 1 and 
-                    possible_name not in emotion_words and
+                    possible_name not in EMOTION_WORDS and
                     possible_name.isalpha() and
                     possible_name != 'not'):  # Exclude common words like 'not'
                     return possible_name.capitalize()
         
         return None
     
-    def get_response(self, user_input):
-        if not user_input.strip():
-            return "I didn't catch that. Could you say something?"
+    def analyze_message(self, user_input):
+        """
+        Everything about a message that does not depend on the conversation so far:
+        typo correction, user info, name introduction, sentiment, intent match and
+        fallback suggestions. The same text always gives the same analysis.
+        A name introduction is answered as such, so it stops there (sentiment None).
+        """
+        analysis = {
+            'corrected_input': user_input,
+            'context_update': {},
+            'introduced_name': None,
+            'sentiment': None,
+            'intent': None,
+            'pattern': None,
+            'score': 0.0,
+            'suggestions': [],
+            'snapshot': None,   # IntentSnapshot the message was analyzed against
+            'lower_input': user_input.lower()  # shared by the phrase matching stages
+        }
+        
+        stage = self.instrumentation.stage
+        
+        # Pick up intent file edits, then stick to one snapshot for the whole message
+        self.reload_if_changed()
+        snapshot = self.snapshot
+        analysis['snapshot'] = snapshot
         
         # Handle potential typos first
-        corrected_input = self.handle_typos_and_variations(user_input)
+        with stage('typo_correction'):
+            corrected_input = self.handle_typos_and_variations(user_input, snapshot)
+        analysis['corrected_input'] = corrected_input
         
         # Extract any user information from current input
-        user_context_update = self.extract_user_info(user_input)
+        with stage('user_info'):
+            analysis['context_update'] = self.extract_user_info(user_input, analysis['lower_input'])
 
         # Check for name introduction using the improved method
-        introduced_name = self.is_name_introduction(user_input)
+        with stage('name_detection'):
+            introduced_name = self.is_name_introduction(user_input, analysis['lower_input'])
         if introduced_name:
-            self.data_manager.add_message_to_memory(
-                user_input, 
-                f"Hey there, {introduced_name}!", 
-                user_context={"name": introduced_name}
-            )
-            return f"Hey there, {introduced_name}!"
+            analysis['introduced_name'] = introduced_name
+            return analysis
 
         # Analyze Gen Z sentiment
-        sentiment_analysis = self.sentiment_analyzer.analyze_sentiment(user_input)
+        with stage('sentiment'):
+            sentiment_analysis = self.analyze_sentiment(user_input, snapshot)
+        analysis['sentiment'] = sentiment_analysis
         
         # Find best matching intent using enhanced similarity with Levenshtein distance
-        match_result = self.find_best_intent_match(corrected_input, threshold=0.2)
+        with stage('intent_matching'):
+            match_result = self.find_best_intent_match(corrected_input, threshold=0.2, snapshot=snapshot)
         
         if match_result[0] is not None:  # Check if we found a match
-            best_intent, best_pattern, best_score = match_result
-        else:
-            best_intent, best_pattern, best_score = None, None, 0.0
+            analysis['intent'], analysis['pattern'], analysis['score'] = match_result
         
-        # Debug information (you can remove this in production)
-        if best_intent and best_score > 0:
-            print(f"🔍 Matched Word: '{best_pattern}' in '{best_intent}' with score {best_score:.3f}")
+        if not (analysis['intent'] and analysis['score'] >= 0.2) and \
+                not self.sentiment_analyzer.should_use_sentiment_response(sentiment_analysis, False):
+            # Suggest similar commands if no match found
+            with stage('suggestions'):
+                closest_patterns = self.find_closest_intent_patterns(
+                    user_input, threshold=0.15, top_n=2, snapshot=snapshot
+                )
+            analysis['suggestions'] = [pattern for pattern, _ in closest_patterns]
+        
+        return analysis
+    
+    def build_response(self, user_input, analysis, user_context, recent_conversations):
+        """
+        Turn an analyze_message() result into a reply, given what we know about the user.
+        Returns the structured result: user_input, intent, pattern, score, sentiment,
+        response and the context_update to remember.
+        """
+        result = {
+            'user_input': user_input,
+            'intent': analysis['intent'],
+            'pattern': analysis['pattern'],
+            'score': analysis['score'],
+            'sentiment': analysis['sentiment'],
+            'response': None,
+            'context_update': analysis['context_update']
+        }
+        
+        introduced_name = analysis['introduced_name']
+        if introduced_name:
+            result['response'] = f"Hey there, {introduced_name}!"
+            result['context_update'] = {"name": introduced_name}
+            return result
+        
+        best_intent, best_score = analysis['intent'], analysis['score']
+        sentiment_analysis = analysis['sentiment']
+        # Answer from the data the message was matched against, even if it was reloaded since
+        bot_data = (analysis.get('snapshot') or self.snapshot).data
         
         if best_intent and best_score >= 0.2:
-            responses = self.data[best_intent].get('responses', [])
+            responses = bot_data[best_intent].get('responses', [])
             base_response = random.choice(responses) if responses else "I understand, but I'm not sure how to respond."
         elif self.sentiment_analyzer.should_use_sentiment_response(sentiment_analysis, False):
              base_response = self.sentiment_analyzer.generate_sentiment_response(sentiment_analysis)
         else:
-            # Suggest similar commands if no match found
-            all_patterns = []
-            for intent_data in self.data.values():
-                all_patterns.extend(intent_data.get('patterns', []))
-            
-            closest_patterns = self.text_processor.find_closest_matches(
-                user_input, all_patterns, threshold=0.15, top_n=2
-            )
-            
-            if closest_patterns:
-                suggestions = [pattern for pattern, _ in closest_patterns]
+            suggestions = analysis['suggestions']
+            if suggestions:
                 base_response = f"I'm not sure about that. Did you mean something like: {' or '.join(suggestions)}?"
             else:
                 base_response = random.choice([
@@ -238,21 +436,93 @@ class MeowBot:
                     "I'm still learning. Can you try asking something else?"
                 ])
 
-        final_response = self.get_context_aware_response(user_input, base_response)
+        with self.instrumentation.stage('context_awareness'):
+            final_response = self.get_context_aware_response(
+                user_input, base_response, user_context, recent_conversations, bot_data,
+                analysis.get('lower_input')
+            )
         
         if sentiment_analysis['confidence'] > 0.5:
             sentiment_modifier = self.sentiment_analyzer.get_sentiment_response_modifier(sentiment_analysis)
             if sentiment_modifier:
                 final_response += f" {sentiment_modifier}"
         
-        # Save this conversation to memory
-        self.data_manager.add_message_to_memory(
-            user_input=user_input,
-            bot_response=final_response,
-            user_context=user_context_update if user_context_update else None
-        )
+        result['response'] = final_response
+        return result
+    
+    def get_response(self, user_input):
+        if not user_input.strip():
+            return "I didn't catch that. Could you say something?"
         
-        return final_response
+        with self.instrumentation.message():
+            analysis = self.analyze_message(user_input)
+            
+            # Debug information (you can remove this in production)
+            if analysis['intent'] and analysis['score'] > 0:
+                print(f"🔍 Matched Word: '{analysis['pattern']}' in '{analysis['intent']}' with score {analysis['score']:.3f}")
+            
+            with self.instrumentation.stage('response'):
+                result = self.build_response(
+                    user_input, analysis,
+                    self.data_manager.get_user_context(),
+                    self.data_manager.get_recent_conversations(5)
+                )
+            
+            # Save this conversation to memory
+            with self.instrumentation.stage('persistence'):
+                self.data_manager.add_message_to_memory(
+                    user_input=user_input,
+                    bot_response=result['response'],
+                    user_context=result['context_update'] if result['context_update'] else None
+                )
+        
+        return result['response']
+    
+    def get_responses(self, messages, session=None):
+        """
+        Answer a list of messages in one call, e.g. to replay logged conversations.
+        Repeated messages are analyzed once, nothing is printed, and memory is
+        written once at the end instead of once per message.
+        session: session id to store the exchanges under (defaults to the current session)
+        Returns a list of dicts: user_input, intent, pattern, score, sentiment, response, context_update.
+        Each result is the caller's own: repeated messages share their analysis, not the dicts built from it.
+        """
+        user_context = dict(self.data_manager.get_user_context())
+        recent_conversations = list(self.data_manager.get_recent_conversations(5))
+        session_id = self.session_id if session is None else session
+        
+        analyses = {}
+        exchanges = []
+        results = []
+        for user_input in messages:
+            if not user_input.strip():
+                results.append({
+                    'user_input': user_input, 'intent': None, 'pattern': None, 'score': 0.0,
+                    'sentiment': None, 'response': "I didn't catch that. Could you say something?",
+                    'context_update': {}
+                })
+                continue
+            
+            if user_input not in analyses:
+                analyses[user_input] = self.analyze_message(user_input)
+            result = copy.deepcopy(
+                self.build_response(user_input, analyses[user_input], user_context, recent_conversations)
+            )
+            results.append(result)
+            
+            # Keep the context the next message sees in step with what will be saved
+            if result['context_update']:
+                user_context.update(result['context_update'])
+            recent_conversations.append({"user_input": user_input, "bot_response": result['response']})
+            del recent_conversations[:-5]
+            exchanges.append((user_input, result['response'], result['context_update'] or None))
+        
+        self.data_manager.add_messages_to_memory(exchanges, session_id=session_id)
+        return results
+    
+    def get_stats(self):
+        """Per-stage timings and similarity counters, or None without instrumentation"""
+        return self.instrumentation.stats()
     
     def show_memory_stats(self):
         memory = self.data_manager.load_conversation_memory()
@@ -291,6 +561,10 @@ class MeowBot:
                     self.show_memory_stats()
                     continue
                 
+                if user_input.lower() == 'perf stats' and self.instrumentation.enabled:
+                    print(json.dumps(self.get_stats(), indent=2))
+                    continue
+                
                 if user_input.lower() == 'clear memory':
                     self.data_manager.save_conversation_memory({
                         "conversations": [],
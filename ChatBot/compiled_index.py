@@ -0,0 +1,368 @@
+import os
+
+from .bk_tree import BKTree
+from .intent_index import IntentIndex
+from .mapped_file import (CachedStrings, MappedFile, MappedPostings, MappedWordValues, SectionWriter,
+                          file_checksum, words_checksum)
+from .ngram_index import NGramIndex
+from .text_processor import CompiledText, TextProcessor
+from .typo_corrector import TypoCorrector
+
+MAGIC = b'MEOWIDX\x00'
+# Bump whenever the layout or TextProcessor.compile() output changes, so old files get rebuilt
+FORMAT_VERSION = 3
+
+
+def default_compiled_path(data_file):
+    return os.path.splitext(data_file)[0] + '.idx'
+
+
+# --- Writing -----------------------------------------------------------------
+
+def add_ngram_index(writer, name, ngram_index):
+    """NGramIndex whose item ids are 0..len - 1"""
+    grams = sorted(ngram_index.postings, key=lambda gram: gram.encode('utf-8', 'surrogatepass'))
+    writer.add_strings(name + '.grams', grams)
+    writer.add_rows(name + '.items', ([item_id for item_id, _ in ngram_index.postings[gram]] for gram in grams))
+    writer.add_rows(name + '.counts', ([count for _, count in ngram_index.postings[gram]] for gram in grams))
+    writer.add_array(name + '.lengths', 'I', (ngram_index.item_lengths[item_id] for item_id in range(len(ngram_index))))
+    lengths = list(ngram_index.length_buckets)
+    writer.add_array(name + '.bucket_lengths', 'I', lengths)
+    writer.add_rows(name + '.buckets', (ngram_index.length_buckets[length] for length in lengths))
+
+
+def write_compiled_index(path, snapshot, source_checksum, extra_words_checksum):
+    """
+    Serialize the IntentIndex and TypoCorrector of an IntentSnapshot built from
+    the source whose checksums are given: strings as UTF-8 tables, everything
+    else as flat integer arrays (pattern token ids, stem/phrase/token postings, n-gram
+    postings, the BK-tree's edges and the corrector's delete table).
+    Character masks are not stored; they are rebuilt from the strings on first use.
+    """
+    writer = SectionWriter()
+    intent_index = snapshot.intent_index
+    typo_corrector = snapshot.typo_corrector
+    entries = intent_index.entries
+
+    intents = list(intent_index.intent_ranges)
+    writer.add_strings('intents', intents)
+    writer.add_array('intent_starts', 'I',
+                     [intent_index.intent_ranges[intent][0] for intent in intents] + [len(entries)])
+
+    writer.add_strings('texts', (entry.text for entry in entries))
+    writer.add_strings('normalized', (entry.normalized for entry in entries))
+
+    vocabulary_ids = {token: vocabulary_id for vocabulary_id, token in enumerate(intent_index.vocabulary)}
+    writer.add_strings('vocabulary', intent_index.vocabulary)
+    writer.add_rows('entry_tokens', ([vocabulary_ids[token] for token in entry.tokens] for entry in entries))
+
+    stems = sorted(intent_index.stem_postings, key=lambda stem: stem.encode('utf-8', 'surrogatepass'))
+    stem_ids = {stem: stem_id for stem_id, stem in enumerate(stems)}
+    writer.add_strings('stems', stems)
+    writer.add_rows('entry_stems', (sorted(stem_ids[stem] for stem in entry.stems) for entry in entries))
+    writer.add_rows('stem_postings', (intent_index.stem_postings[stem] for stem in stems))
+
+    add_ngram_index(writer, 'phrase_grams', intent_index.phrase_grams)
+    writer.add_rows('phrase_postings', intent_index.phrase_postings)
+    add_ngram_index(writer, 'token_grams', intent_index.token_grams)
+    writer.add_rows('token_postings', intent_index.token_postings)
+
+    # BK-tree nodes are vocabulary ids; children keep their insertion order
+    children = [[] for _ in intent_index.vocabulary]
+    tree = intent_index.vocabulary_tree
+    stack = [tree.root] if tree.root is not None else []
+    root = [vocabulary_ids[tree.root[0]]] if tree.root is not None else []
+    while stack:
+        word, node_children = stack.pop()
+        for edge, child in node_children.items():
+            children[vocabulary_ids[word]].append((edge, vocabulary_ids[child[0]]))
+            stack.append(child)
+    writer.add_array('tree_root', 'I', root)
+    writer.add_rows('tree_edges', ([edge for edge, _ in row] for row in children))
+    writer.add_rows('tree_children', ([child for _, child in row] for row in children))
+
+    words = sorted(typo_corrector.word_counts, key=lambda word: word.encode('utf-8', 'surrogatepass'))
+    word_ids = {word: word_id for word_id, word in enumerate(words)}
+    writer.add_array('typo_max_edit_distance', 'I', [typo_corrector.max_edit_distance])
+    writer.add_strings('typo_words', words)
+    writer.add_array('typo_counts', 'I', (typo_corrector.word_counts[word] for word in words))
+    writer.add_array('typo_ranks', 'I', (typo_corrector.word_ranks[word] for word in words))
+    variants = sorted(typo_corrector.deletes, key=lambda variant: variant.encode('utf-8', 'surrogatepass'))
+    writer.add_strings('typo_deletes', variants)
+    writer.add_rows('typo_delete_words',
+                    ([word_ids[word] for word in typo_corrector.deletes[variant]] for variant in variants))
+
+    # The checksums tie the file to its sources: intent JSON, extra typo words, resulting typo word list
+    writer.write(path, MAGIC, FORMAT_VERSION, (source_checksum, extra_words_checksum, snapshot.typo_words_checksum))
+
+
+def compile_intents(data_file, path=None, extra_words=()):
+    """Compile an intent file from scratch; returns the path written"""
+    import json
+    from .intent_snapshot import IntentSnapshot
+
+    path = path or default_compiled_path(data_file)
+    source_checksum = file_checksum(data_file)
+    with open(data_file, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    snapshot = IntentSnapshot(data, TextProcessor(), extra_words, cache_size=0)
+    write_compiled_index(path, snapshot, source_checksum, words_checksum(extra_words))
+    return path
+
+
+def ensure_compiled_index(data_file, path=None, extra_words=()):
+    """Compile data_file unless path already holds a compiled file of exactly this version"""
+    path = path or default_compiled_path(data_file)
+    if load_compiled_index(path, file_checksum(data_file), words_checksum(extra_words)) is None:
+        compile_intents(data_file, path, extra_words)
+    return path
+
+
+# --- Reading -----------------------------------------------------------------
+
+class MappedNGramIndex(NGramIndex):
+    """NGramIndex over item ids 0..n - 1 whose postings stay in the mapped file"""
+    def __init__(self, compiled, name, q=3):
+        self.q = q
+        self.postings = MappedPostings(compiled.strings(name + '.grams'), compiled.rows(name + '.items'),
+                                       counts=compiled.rows(name + '.counts'))
+        self.item_lengths = compiled.array(name + '.lengths')
+        buckets = compiled.rows(name + '.buckets')
+        self.length_buckets = {
+            length: buckets[i] for i, length in enumerate(compiled.array(name + '.bucket_lengths'))
+        }
+
+    def candidates(self, text, threshold):
+        if threshold <= 0:
+            return set(range(len(self.item_lengths)))
+        return super().candidates(text, threshold)
+
+
+class MappedBKTree(BKTree):
+    """BK-tree whose nodes are vocabulary ids and whose edges stay in the mapped file"""
+    def __init__(self, distance, compiled, words):
+        self.distance = distance
+        self.words = words
+        root = compiled.array('tree_root')
+        self.root = root[0] if len(root) else None
+        self.edges = compiled.rows('tree_edges')
+        self.children = compiled.rows('tree_children')
+        self.size = len(words) if self.root is not None else 0
+
+    def add(self, word):
+        raise TypeError("A compiled BK-tree is read-only")
+
+    def search(self, word, max_distance):
+        results = []
+        if self.root is None:
+            return results
+
+        # Edges and children share their row offsets
+        words, offsets = self.words, self.edges.offsets
+        edges, children = self.edges.values, self.children.values
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            node_word = words[node]
+            distance = self.distance(word, node_word)
+            if distance <= max_distance:
+                results.append((distance, node_word))
+            start, end = offsets[node], offsets[node + 1]
+            for edge, child in zip(edges[start:end].tolist(), children[start:end].tolist()):
+                if abs(edge - distance) <= max_distance:
+                    stack.append(child)
+
+        return results
+
+
+class MappedEntries:
+    """The CompiledText of each pattern, built from the mapped tables the first time it is needed"""
+    def __init__(self, compiled, text_processor, vocabulary):
+        self.text_processor = text_processor
+        self.texts = compiled.strings('texts')
+        self.normalized = compiled.strings('normalized')
+        self.vocabulary = vocabulary
+        self.stems = compiled.strings('stems')
+        self.entry_tokens = compiled.rows('entry_tokens')
+        self.entry_stems = compiled.rows('entry_stems')
+        self.cache = [None] * len(self.texts)
+
+    def __len__(self):
+        return len(self.cache)
+
+    def __iter__(self):
+        for i in range(len(self.cache)):
+            yield self[i]
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self.cache)))]
+        entry = self.cache[i]
+        if entry is None:
+            entry = self.cache[i] = self.load(i)
+        return entry
+
+    def load(self, i):
+        normalized = self.normalized[i]
+        tokens = [self.vocabulary[token_id] for token_id in self.entry_tokens[i]]
+        stems = {self.stems[stem_id] for stem_id in self.entry_stems[i]}
+        if self.text_processor.distance_backend != 'bitparallel':
+            return CompiledText(self.texts[i], normalized, stems, tokens)
+        build_char_masks = self.text_processor.build_char_masks
+        return CompiledText(
+            self.texts[i], normalized, stems, tokens,
+            masks=build_char_masks(normalized),
+            token_masks=[build_char_masks(token) for token in tokens]
+        )
+
+
+class MappedLabels:
+    """Entry id -> intent name"""
+    def __init__(self, starts, names):
+        self.starts = starts
+        self.names = names
+
+    def __len__(self):
+        return self.starts[-1]
+
+    def __getitem__(self, entry_id):
+        if entry_id < 0:
+            entry_id += len(self)
+        # Intents are contiguous runs of entries: find the run holding entry_id
+        low, high = 0, len(self.names) - 1
+        while low < high:
+            middle = (low + high + 1) // 2
+            if self.starts[middle] <= entry_id:
+                low = middle
+            else:
+                high = middle - 1
+        return self.names[low]
+
+
+class MappedIntentIndex(IntentIndex):
+    """
+    IntentIndex answering from a compiled file. Candidate lookups read the
+    mapped postings in place; a pattern's CompiledText is only built when it
+    is first scored.
+    """
+    def __init__(self, compiled, text_processor=None):
+        self.text_processor = text_processor or TextProcessor()
+        self.compiled = compiled
+        self.vocabulary = CachedStrings(compiled.sections['vocabulary.text'], compiled.sections['vocabulary.offsets'])
+        self.entries = MappedEntries(compiled, self.text_processor, self.vocabulary)
+
+        intents = list(compiled.strings('intents'))
+        starts = compiled.array('intent_starts')
+        self.entry_intents = MappedLabels(starts, intents)
+        self.intent_ranges = {intent: (starts[i], starts[i + 1]) for i, intent in enumerate(intents)}
+        self._intent_patterns = None
+        self.recompiled_intents = 0
+
+        self.stem_postings = MappedPostings(compiled.strings('stems'), compiled.rows('stem_postings'))
+        self.phrase_ids = None       # a reload builds its phrase and vocabulary ids afresh
+        self.phrase_grams = MappedNGramIndex(compiled, 'phrase_grams')
+        self.phrase_postings = compiled.rows('phrase_postings')
+        self.vocabulary_ids = None
+        self.token_grams = MappedNGramIndex(compiled, 'token_grams')
+        self.token_postings = compiled.rows('token_postings')
+        self.vocabulary_masks = {}  # filled as the BK-tree visits words (bit-parallel backend)
+        self.vocabulary_tree = MappedBKTree(self.vocabulary_distance, compiled, self.vocabulary)
+        self.batch_scorer = None
+
+    @property
+    def intent_patterns(self):
+        """Only needed when a reload compares against this index, so read on demand"""
+        if self._intent_patterns is None:
+            texts = self.entries.texts
+            self._intent_patterns = {
+                intent: [texts[i] for i in range(start, end)] for intent, (start, end) in self.intent_ranges.items()
+            }
+        return self._intent_patterns
+
+    def vocabulary_distance(self, word, vocabulary_word):
+        masks = None
+        if self.text_processor.distance_backend == 'bitparallel':
+            masks = self.vocabulary_masks.get(vocabulary_word)
+            if masks is None:
+                masks = self.vocabulary_masks[vocabulary_word] = self.text_processor.build_char_masks(vocabulary_word)
+        return self.text_processor.levenshtein_distance(word, vocabulary_word, None, masks)
+
+
+class MappedTypoCorrector(TypoCorrector):
+    """TypoCorrector whose words and delete table stay in the mapped file"""
+    def __init__(self, compiled, text_processor=None, known_words=()):
+        self.max_edit_distance = compiled.array('typo_max_edit_distance')[0]
+        self.text_processor = text_processor or TextProcessor()
+        self.known_words = frozenset(known_words)
+        words = compiled.strings('typo_words')
+        self.word_counts = MappedWordValues(words, compiled.array('typo_counts'))
+        self.word_ranks = MappedWordValues(words, compiled.array('typo_ranks'))
+        self.deletes = MappedPostings(compiled.strings('typo_deletes'), compiled.rows('typo_delete_words'),
+                                      values=words)
+
+    def add_word(self, word):
+        raise TypeError("A compiled typo corrector is read-only")
+
+    def rebuilt(self, words):
+        return TypoCorrector(words, self.max_edit_distance, self.text_processor, self.known_words)
+
+
+class CompiledIntents(MappedFile):
+    """
+    A compiled intent file mapped read-only. The OS shares its pages between
+    every process mapping it, so workers start without compiling anything and
+    without each holding a copy of the indexes.
+    """
+    MAGIC = MAGIC
+    FORMAT_VERSION = FORMAT_VERSION
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.typo_words_checksum = self.checksums[2] if self.checksums else None
+
+    def intent_index(self, text_processor=None):
+        return MappedIntentIndex(self, text_processor)
+
+    def typo_corrector(self, text_processor=None, known_words=()):
+        return MappedTypoCorrector(self, text_processor, known_words)
+
+
+def load_compiled_index(path, source_checksum, extra_words_checksum):
+    """The compiled file at path if it was built from exactly this source, else None"""
+    try:
+        compiled = CompiledIntents(path)
+    except (OSError, ValueError):
+        return None
+    if not compiled.matches(source_checksum, extra_words_checksum):
+        return None
+    return compiled
+
+
+def main(argv=None):
+    import argparse
+    import time
+
+    from .sentiment_analyzer import GenZSentimentAnalyzer
+
+    parser = argparse.ArgumentParser(
+        description="Compile an intent file into a binary index that MeowBot can memory-map at startup"
+    )
+    parser.add_argument('data_file', help="intent data (chatbot_data.json format)")
+    parser.add_argument('output', nargs='?', help="compiled file (default: the data file with .idx)")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    path = compile_intents(args.data_file, args.output, GenZSentimentAnalyzer().lexicon_words())
+    compile_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    compiled = CompiledIntents(path)
+    compiled.intent_index()
+    compiled.typo_corrector()
+    load_seconds = time.perf_counter() - start
+    print(f"Wrote {path} ({os.path.getsize(path) / 1024:.0f} KB) in {compile_seconds:.2f}s; "
+          f"maps in {load_seconds * 1000:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
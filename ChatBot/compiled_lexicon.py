@@ -0,0 +1,168 @@
+import bisect
+import hashlib
+import json
+import os
+
+from .lexicon_automaton import LexiconAutomaton
+from .mapped_file import MappedFile, SectionWriter
+
+# On-disk sentiment lexicon. A JSON lexicon file is merged into the analyzer's
+# built-in one and compiled once into flat arrays (hashed string tables, the
+# LexiconAutomaton as CSR rows) that every analyzer then memory-maps, so a lexicon
+# of tens of thousands of terms costs no parsing, no dicts and, across worker
+# processes, a single copy of its pages.
+MAGIC = b'MEOWLEX\x00'
+FORMAT_VERSION = 1
+LEXICON_SECTIONS = ('positive', 'negative', 'emoji', 'modifiers', 'negations')
+KINDS = ('sentiment', 'modifier', 'negation')
+
+
+def default_compiled_lexicon_path(lexicon_file):
+    return os.path.splitext(lexicon_file)[0] + '.lex'
+
+
+def read_lexicon_file(path):
+    """
+    Load a lexicon file: a JSON object with any of "positive" and "negative"
+    ({phrase: score}), "emoji" ({emoji: score}), "modifiers" ({word: multiplier})
+    and "negations" ([word]).
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        lexicon = json.load(f)
+    unknown = set(lexicon) - set(LEXICON_SECTIONS)
+    if unknown:
+        raise ValueError(f"Unknown lexicon sections in {path}: {', '.join(sorted(unknown))}")
+    return lexicon
+
+
+def lexicon_checksum(analyzer):
+    """sha256 of an analyzer's in-memory lexicon, so editing the built-in one also invalidates compiled files"""
+    lexicon = [analyzer.sentiment_words, analyzer.emoji_sentiment, analyzer.intensity_modifiers,
+               sorted(analyzer.negation_words)]
+    return hashlib.sha256(json.dumps(lexicon, sort_keys=True, ensure_ascii=False).encode('utf-8')).digest()
+
+
+# --- Writing -----------------------------------------------------------------
+
+def write_compiled_lexicon(path, analyzer, checksums):
+    """Write the lexicon and automaton of an in-memory analyzer"""
+    automaton = analyzer.automaton
+    if not automaton.built:
+        automaton.build()
+    writer = SectionWriter()
+
+    for polarity in ('positive', 'negative'):
+        words = analyzer.sentiment_words[polarity]
+        writer.add_strings(polarity, list(words), hashed=True)
+        writer.add_array(polarity + '.values', 'd', words.values())
+    writer.add_strings('correctable', list(analyzer.correctable_words), hashed=True)
+    writer.add_strings('emoji', list(analyzer.emoji_sentiment))
+    writer.add_array('emoji.values', 'd', analyzer.emoji_sentiment.values())
+    writer.add_strings('modifiers', list(analyzer.intensity_modifiers))
+    writer.add_array('modifiers.values', 'd', analyzer.intensity_modifiers.values())
+    writer.add_strings('negations', sorted(analyzer.negation_words))
+
+    # Automaton: tokens become ids, transitions rows of (sorted token id, next state)
+    tokens = sorted({token for transitions in automaton.transitions for token in transitions})
+    token_ids = {token: token_id for token_id, token in enumerate(tokens)}
+    writer.add_strings('tokens', tokens, hashed=True)
+    root = [0] * len(tokens)  # the root has a transition for most tokens; index it directly
+    for token, state in automaton.transitions[0].items():
+        root[token_ids[token]] = state
+    writer.add_array('root', 'I', root)
+    rows = [sorted((token_ids[token], state) for token, state in transitions.items())
+            for transitions in automaton.transitions]
+    rows[0] = []
+    writer.add_rows('transitions', ([token_id for token_id, _ in row] for row in rows))
+    writer.add_rows('next_states', ([state for _, state in row] for row in rows))
+    writer.add_array('fail', 'I', automaton.fail)
+
+    entry_ids = {}
+    for entries in automaton.entries:
+        for entry in entries:
+            entry_ids[entry] = len(entry_ids)
+    writer.add_rows('outputs', ([entry_ids[entry] for entry in outputs] for outputs in automaton.outputs))
+    writer.add_strings('entries', [phrase for _, _, phrase, _ in entry_ids])
+    writer.add_array('entry_lengths', 'I', (length for length, _, _, _ in entry_ids))
+    writer.add_array('entry_kinds', 'B', (KINDS.index(kind) for _, kind, _, _ in entry_ids))
+    writer.add_array('entry_values', 'd', (float(value) for _, _, _, value in entry_ids))
+
+    writer.write(path, MAGIC, FORMAT_VERSION, checksums)
+
+
+# --- Reading -----------------------------------------------------------------
+
+class MappedLexiconAutomaton(LexiconAutomaton):
+    """LexiconAutomaton whose states, transitions and entries stay in the mapped file"""
+    def __init__(self, compiled):
+        self.tokens = compiled.strings('tokens')
+        self.root = compiled.array('root')
+        self.transition_offsets = compiled.array('transitions.offsets')
+        self.transition_tokens = compiled.array('transitions.values')
+        self.next_states = compiled.array('next_states.values')
+        self.fail = compiled.array('fail')
+        self.outputs = compiled.rows('outputs')
+        self.phrases = compiled.strings('entries')
+        self.lengths = compiled.array('entry_lengths')
+        self.kinds = compiled.array('entry_kinds')
+        self.values = compiled.array('entry_values')
+        self.built = True
+
+    def __len__(self):
+        return len(self.fail)
+
+    def add(self, phrase, kind, value):
+        raise TypeError("A compiled lexicon automaton is read-only")
+
+    def build(self):
+        pass
+
+    def next_state(self, state, token_id):
+        """State reached from state on token_id, or 0 if it has no such transition"""
+        if state == 0:
+            return self.root[token_id]
+        start, end = self.transition_offsets[state], self.transition_offsets[state + 1]
+        i = bisect.bisect_left(self.transition_tokens, token_id, start, end)
+        if i < end and self.transition_tokens[i] == token_id:
+            return self.next_states[i]
+        return 0
+
+    def scan(self, tokens):
+        fail, outputs = self.fail, self.outputs
+        state = 0
+        for position, token in enumerate(tokens):
+            token_id = self.tokens.find(token)
+            if token_id < 0:
+                state = 0  # no entry contains this token, so no match spans it
+                continue
+            next_state = self.next_state(state, token_id)
+            while state and not next_state:
+                state = fail[state]
+                next_state = self.next_state(state, token_id)
+            state = next_state
+            if state:
+                for entry_id in outputs[state]:
+                    length = self.lengths[entry_id]
+                    yield (position - length + 1, length, KINDS[self.kinds[entry_id]],
+                           self.phrases[entry_id], self.values[entry_id])
+
+
+class CompiledLexicon(MappedFile):
+    """A lexicon file written by write_compiled_lexicon(), mapped read-only"""
+    MAGIC = MAGIC
+    FORMAT_VERSION = FORMAT_VERSION
+
+    def automaton(self):
+        return MappedLexiconAutomaton(self)
+
+
+def load_compiled_lexicon(path, source_checksum, builtin_checksum):
+    """The compiled lexicon at path if it was built from exactly these lexicons, else None"""
+    try:
+        compiled = CompiledLexicon(path)
+    except (OSError, ValueError):
+        return None
+    if not compiled.matches(source_checksum, builtin_checksum):
+        return None
+    return compiled
+
@@ -1,69 +1,205 @@
+import atexit
+import copy
 import json
 import os
+import threading
 from datetime import datetime
+from .memory_storage import JsonMemoryStorage, JsonlMemoryStorage, SqliteMemoryStorage, apply_record
+
+def copy_memory(memory):
+    """
+    Copy of a memory dict that later changes to it can't reach: conversation
+    entries are never modified once added, so the list is copied but not them
+    """
+    return dict(memory, conversations=list(memory.get("conversations", [])),
+                user_context=copy.deepcopy(memory.get("user_context", {})))
+
 
 class DataManager:
-    def __init__(self, data_file=r'ChatBot\data\chatbot_data.json', memory_file=r'ChatBot\data\conversation_memory.json'):
+    def __init__(self, data_file=r'ChatBot\data\chatbot_data.json', memory_file=r'ChatBot\data\conversation_memory.json',
+                 flush_interval=2.0, flush_batch_size=50, storage='json', max_conversations=100):
+        """
+        Conversation memory is loaded once and kept in RAM. Changes are written
+        back by a background thread every flush_interval seconds, as soon as
+        flush_batch_size changes are waiting, and on close()/interpreter exit.
+        flush_interval=None writes every change straight away, like before.
+        storage: 'json' rewrites memory_file on each flush, 'jsonl' appends the
+        changes to a log next to it, 'sqlite' keeps them in a database next to it,
+        or pass any MemoryStorage instance (see memory_storage.py)
+        max_conversations: how many exchanges to keep in RAM (None keeps all of them);
+        with SQLite the full history stays on disk
+        """
         self.data_file = data_file
         self.memory_file = memory_file
+        self.flush_interval = flush_interval
+        self.flush_batch_size = flush_batch_size
+        self.max_conversations = max_conversations
+        
+        if storage == 'json':
+            storage = JsonMemoryStorage(memory_file)
+        elif storage == 'jsonl':
+            storage = JsonlMemoryStorage(memory_file)
+        elif storage == 'sqlite':
+            storage = SqliteMemoryStorage(os.path.splitext(memory_file)[0] + '.sqlite3', max_conversations)
+        self.storage = storage
+        
+        self._memory = None
+        self._pending_records = []            # changes not written yet, in order
+        self._lock = threading.RLock()        # guards _memory and _pending_records
+        self._write_lock = threading.Lock()   # one writer at a time, so changes land in order
+        self._flush_requested = threading.Event()
+        self._flush_thread = None
+        self._closed = False
+        # Bumped whenever the intent data is saved, so a MeowBot can tell its index is stale
+        self.data_version = 0
+        atexit.register(self.close)
+    
+    def read_conversation_memory(self):
+        """Read conversation history from storage"""
+        memory = self.storage.load()
+        self._trim(memory)
+        return memory
     
     def load_conversation_memory(self):
-        """Load conversation history from JSON"""
-        try:
-            with open(self.memory_file, 'r') as f:
-                return json.load(f)
-        except FileNotFoundError:
-            return {
-                "conversations": [],
-                "user_context": {},
-                "session_count": 0
-            }
+        """
+        Conversation history, read from disk on first use and served from RAM
+        afterwards. Returns a copy: change memory through the methods below.
+        """
+        with self._lock:
+            return copy_memory(self._loaded_memory())
+    
+    def _loaded_memory(self):
+        """The in-RAM memory dict itself, loaded on first use"""
+        with self._lock:
+            if self._memory is None:
+                self._memory = self.read_conversation_memory()
+            return self._memory
     
     def save_conversation_memory(self, memory_data):
-        """Save conversation history to JSON"""
-        with open(self.memory_file, 'w') as f:
-            json.dump(memory_data, f, indent=2)
+        """Replace conversation history and write it to disk right away"""
+        with self._lock:
+            self._memory = memory_data
+            # Written after the lock is released: queue a copy, not the dict that keeps changing
+            self._pending_records.append({"type": "reset", "memory": copy_memory(memory_data)})
+        self.flush()
     
-    def add_message_to_memory(self, user_input, bot_response, user_context=None):
-        """Add a message exchange to conversation memory"""
-        memory = self.load_conversation_memory()
+    def flush(self):
+        """Write pending memory changes to disk"""
+        with self._write_lock:
+            with self._lock:
+                if not self._pending_records:
+                    return
+                records = self._pending_records
+                self._pending_records = []
+                snapshot = None
+                if self.storage.needs_snapshot(len(records)):
+                    # Serialized outside the lock, so it must not share anything that can change
+                    snapshot = copy_memory(self._memory)
+            
+            self.storage.write(records, snapshot)
+    
+    def close(self):
+        """Stop the background writer and flush whatever is left"""
+        # The exit hook would otherwise keep this manager alive until the interpreter exits
+        atexit.unregister(self.close)
+        self._closed = True
+        self._flush_requested.set()
+        if self._flush_thread is not None and self._flush_thread is not threading.current_thread():
+            self._flush_thread.join()
+        self.flush()
+        self.storage.close()
+    
+    def _flush_loop(self):
+        while not self._closed:
+            self._flush_requested.wait(self.flush_interval)
+            self._flush_requested.clear()
+            self.flush()
+    
+    def _changed(self, records):
+        """Apply change records to the in-memory copy and schedule them for writing"""
+        self._schedule_flush(self._record(records))
+    
+    def _record(self, records):
+        with self._lock:
+            memory = self._loaded_memory()
+            for record in records:
+                apply_record(memory, record)
+            self._trim(memory)
+            self._pending_records.extend(records)
+            return len(self._pending_records)
+    
+    def _schedule_flush(self, pending):
+        # Never called with _lock held: flush() takes _write_lock before _lock
+        if not self.flush_interval or self._closed:
+            self.flush()
+            return
         
-        message_entry = {
-            "timestamp": datetime.now().isoformat(),
-            "user_input": user_input,
-            "bot_response": bot_response,
-            "session_id": memory.get("session_count", 0)
-        }
+        if self._flush_thread is None:
+            self._flush_thread = threading.Thread(target=self._flush_loop, name="memory-flush", daemon=True)
+            self._flush_thread.start()
+        if self.flush_batch_size and pending >= self.flush_batch_size:
+            self._flush_requested.set()
+    
+    def _trim(self, memory):
+        # Keep only the last max_conversations to prevent memory from getting too large
+        if self.max_conversations is not None and len(memory["conversations"]) > self.max_conversations:
+            memory["conversations"] = memory["conversations"][-self.max_conversations:]
+    
+    def add_message_to_memory(self, user_input, bot_response, user_context=None, session_id=None):
+        """Add a message exchange to conversation memory"""
+        return self.add_messages_to_memory([(user_input, bot_response, user_context)], session_id)
+    
+    def add_messages_to_memory(self, exchanges, session_id=None):
+        """
+        Add several (user_input, bot_response, user_context) exchanges at once.
+        """
+        records = []
+        if session_id is None:
+            session_id = self._loaded_memory().get("session_count", 0)
         
-        memory["conversations"].append(message_entry)
+        for user_input, bot_response, user_context in exchanges:
+            message_entry = {
+                "timestamp": datetime.now().isoformat(),
+                "user_input": user_input,
+                "bot_response": bot_response,
+                "session_id": session_id
+            }
+            records.append({"type": "message", "entry": message_entry})
+            
+            # Update user context if provided (a copy: the record is written later, outside any lock)
+            if user_context:
+                records.append({"type": "context", "update": copy.deepcopy(user_context)})
         
-        # Update user context if provided
-        if user_context:
-            memory["user_context"].update(user_context)
+        self._changed(records)
+        return self.load_conversation_memory()
+    
+    def get_recent_conversations(self, limit=5, session_id=None):
+        """Get recent conversation history, optionally for one session"""
+        memory = self._loaded_memory()
+        conversations = memory["conversations"]
+        window_full = self.max_conversations is not None and len(conversations) >= self.max_conversations
         
-        # Keep only last 100 conversations to prevent file from getting too large
-        if len(memory["conversations"]) > 100:
-            memory["conversations"] = memory["conversations"][-100:]
+        if self.storage.queryable and (session_id is not None or (limit > len(conversations) and window_full)):
+            # Older exchanges (or a single session's) may only be on disk: indexed tail query
+            self.flush()
+            return self.storage.recent_conversations(limit, session_id)
         
-        self.save_conversation_memory(memory)
-        return memory
-    
-    def get_recent_conversations(self, limit=5):
-        """Get recent conversation history"""
-        memory = self.load_conversation_memory()
-        return memory["conversations"][-limit:]
+        if session_id is not None:
+            conversations = [entry for entry in conversations if entry.get("session_id") == session_id]
+        return conversations[-limit:]
     
     def get_user_context(self):
-        """Get stored user context (name, preferences, etc.)"""
-        memory = self.load_conversation_memory()
-        return memory.get("user_context", {})
+        """Get stored user context (name, preferences, etc.), as a copy"""
+        with self._lock:
+            return copy.deepcopy(self._loaded_memory().get("user_context", {}))
     
     def start_new_session(self):
         """Start a new conversation session"""
-        memory = self.load_conversation_memory()
-        memory["session_count"] = memory.get("session_count", 0) + 1
-        self.save_conversation_memory(memory)
-        return memory["session_count"]
+        with self._lock:
+            session_count = self._loaded_memory().get("session_count", 0) + 1
+            pending = self._record([{"type": "session", "session_count": session_count}])
+        self._schedule_flush(pending)
+        return session_count
     
     def load_data(self):
         try:
@@ -78,6 +214,7 @@ class DataManager:
     def save_data(self, data):
         with open(self.data_file, 'w') as f:
             json.dump(data, f, indent=2)
+        self.data_version += 1
     
     #need to fix the sup and homie(name)
     def get_default_data(self): 
@@ -0,0 +1,66 @@
+import re
+
+try:
+    import regex
+except ImportError:  # fall back to an approximation of grapheme clusters
+    regex = None
+
+# Every emoji lies inside one of these (except keycaps, which start with an ASCII digit
+# and are not scored). Spelled out rather than [^\x00-\x7f]+, which re matches slower.
+NON_ASCII_RUN = re.compile(r'[^\x00-\x7f][^\x00-\x7f]*')
+
+if regex is not None:
+    GRAPHEME = regex.compile(r'\X')
+else:
+    # Extended grapheme clusters as far as emoji go: flag pairs, and a character with
+    # its combining marks, variation selectors, skin tones, tags and ZWJ-joined parts
+    _EXTEND = r'[\u0300-\u036f\u200c\u20d0-\u20ff\ufe00-\ufe0f\U0001f3fb-\U0001f3ff\U000e0020-\U000e007f]'
+    GRAPHEME = re.compile(rf'[\U0001f1e6-\U0001f1ff]{{2}}|.{_EXTEND}*(?:\u200d.{_EXTEND}*)*', re.DOTALL)
+
+# Presentation selectors and skin tones: '❤' and '❤️', '👍' and '👍🏽' score alike
+VARIANTS = re.compile(r'[\ufe0e\ufe0f\U0001f3fb-\U0001f3ff]')
+
+
+def normalize_emoji(cluster):
+    return VARIANTS.sub('', cluster) or cluster
+
+
+class EmojiIndex:
+    """
+    Scores the emoji in a text by whole grapheme cluster, so multi-codepoint
+    emoji ('❤️', '👍🏽', ZWJ sequences) match their lexicon entry. Only non-ASCII
+    runs are looked at (pure ASCII text costs nothing) and each distinct run is
+    scored once, then cached.
+    """
+    def __init__(self, emoji_sentiment, cache_size=4096):
+        self.emoji_sentiment = emoji_sentiment
+        self.normalized = {}
+        for emoji, score in emoji_sentiment.items():
+            self.normalized.setdefault(normalize_emoji(emoji), score)
+        # Distinct run -> score. A plain dict, emptied when full: the lookup is on
+        # the path of every message, and dict reads need no lock.
+        self.run_scores = {}
+        self.cache_size = cache_size
+
+    def cluster_score(self, cluster):
+        score = self.emoji_sentiment.get(cluster)
+        if score is None:
+            score = self.normalized.get(normalize_emoji(cluster))
+        if score is None:
+            # Unknown sequence: its known parts still count, as single characters always did
+            score = sum(self.emoji_sentiment.get(char, 0) for char in cluster if char != '\u200d')
+        return score
+
+    def run_score(self, run):
+        score = self.run_scores.get(run)
+        if score is None:
+            score = sum(self.cluster_score(cluster) for cluster in GRAPHEME.findall(run))
+            if len(self.run_scores) >= self.cache_size:
+                self.run_scores.clear()
+            self.run_scores[run] = score
+        return score
+
+    def score(self, text):
+        if text.isascii():
+            return 0
+        return sum(self.run_score(run) for run in NON_ASCII_RUN.findall(text))
@@ -0,0 +1,181 @@
+import json
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from itertools import islice
+
+from .chatbot import MeowBot
+from .compiled_index import ensure_compiled_index
+from .sentiment_analyzer import GenZSentimentAnalyzer
+
+# Set in each worker process by init_worker, so the bot is built once per process
+# instead of being pickled with every task
+_worker_bot = None
+
+
+def init_worker(data_file, distance_backend, batch_scoring, compiled_index=None, sentiment_lexicon=None):
+    global _worker_bot
+    _worker_bot = MeowBot(data_file, distance_backend, batch_scoring=batch_scoring, start_session=False,
+                          compiled_index=compiled_index, sentiment_lexicon=sentiment_lexicon)
+
+
+def evaluate_message(bot, user_input):
+    """Stateless evaluation of one utterance: what it corrects to, matches and feels like"""
+    if not user_input.strip():
+        return {'user_input': user_input, 'corrected_input': user_input, 'intent': None,
+                'pattern': None, 'score': 0.0, 'sentiment': None, 'sentiment_score': 0.0}
+
+    analysis = bot.analyze_message(user_input)
+    sentiment = analysis['sentiment']  # None for a name introduction
+    return {
+        'user_input': user_input,
+        'corrected_input': analysis['corrected_input'],
+        'intent': analysis['intent'],
+        'pattern': analysis['pattern'],
+        'score': analysis['score'],
+        'sentiment': sentiment['overall'] if sentiment else None,
+        'sentiment_score': sentiment['score'] if sentiment else 0.0
+    }
+
+
+def evaluate_chunk(messages):
+    """Runs in a worker: returns (pid, seconds spent, results)"""
+    start = time.perf_counter()
+    seen = {}
+    results = []
+    for user_input in messages:
+        if user_input not in seen:
+            seen[user_input] = evaluate_message(_worker_bot, user_input)
+        results.append(seen[user_input])
+    return os.getpid(), time.perf_counter() - start, results
+
+
+def chunked(messages, chunk_size):
+    iterator = iter(messages)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class ParallelEvaluator:
+    """
+    Evaluates large replay corpora across a process pool.
+    Input is read lazily and sharded into chunks; results stream back in input order.
+    At most window chunks (2 per process by default) are in flight at once, so a
+    huge or endless input isn't read far ahead of the consumer.
+
+        with ParallelEvaluator('ChatBot/data/chatbot_data.json') as evaluator:
+            for result in evaluator.evaluate(messages):
+                ...
+            print(evaluator.throughput_report())
+
+    With compiled_index, the intent file is compiled once here (if the file
+    there is stale) and every worker maps it instead of compiling its own copy.
+    A sentiment_lexicon file is likewise compiled here and mapped by the workers.
+    """
+    def __init__(self, data_file, processes=None, chunk_size=500,
+                 distance_backend='bitparallel', batch_scoring=False, compiled_index=None,
+                 sentiment_lexicon=None, window=None):
+        self.processes = processes or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.window = window or 2 * self.processes
+        if compiled_index or sentiment_lexicon:
+            analyzer = GenZSentimentAnalyzer(lexicon_file=sentiment_lexicon)
+            if compiled_index:
+                ensure_compiled_index(data_file, compiled_index, analyzer.lexicon_words())
+        self.pool = multiprocessing.Pool(
+            self.processes,
+            initializer=init_worker,
+            initargs=(data_file, distance_backend, batch_scoring, compiled_index, sentiment_lexicon)
+        )
+        self.worker_stats = {}  # pid -> {'messages': n, 'seconds': busy time}
+        self.wall_time = 0.0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        self.pool.close()
+        self.pool.join()
+
+    def evaluate(self, messages):
+        """Yield one result dict per message, in order"""
+        start = time.perf_counter()
+        # Pool.imap would drain the whole input up front; this keeps a bounded window
+        chunks = chunked(messages, self.chunk_size)
+        in_flight = deque(
+            self.pool.apply_async(evaluate_chunk, (chunk,)) for chunk in islice(chunks, self.window)
+        )
+        try:
+            while in_flight:
+                pid, seconds, results = in_flight.popleft().get()
+                for chunk in islice(chunks, 1):
+                    in_flight.append(self.pool.apply_async(evaluate_chunk, (chunk,)))
+                stats = self.worker_stats.setdefault(pid, {'messages': 0, 'seconds': 0.0})
+                stats['messages'] += len(results)
+                stats['seconds'] += seconds
+                yield from results
+        finally:
+            self.wall_time += time.perf_counter() - start
+
+    def throughput_report(self):
+        """Per-worker and overall messages per second"""
+        workers = {
+            pid: {
+                'messages': stats['messages'],
+                'seconds': round(stats['seconds'], 3),
+                'messages_per_second': round(stats['messages'] / stats['seconds'], 1) if stats['seconds'] else 0.0
+            }
+            for pid, stats in self.worker_stats.items()
+        }
+        total = sum(stats['messages'] for stats in self.worker_stats.values())
+        return {
+            'processes': self.processes,
+            'messages': total,
+            'wall_seconds': round(self.wall_time, 3),
+            'messages_per_second': round(total / self.wall_time, 1) if self.wall_time else 0.0,
+            'workers': workers
+        }
+
+
+def read_messages(path):
+    """One utterance per line; JSON lines use their user_input field"""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.rstrip('\n')
+            if line.startswith('{'):
+                yield json.loads(line).get('user_input', '')
+            else:
+                yield line
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Evaluate logged utterances against the intent data in parallel")
+    parser.add_argument('data_file', help="intent data (chatbot_data.json format)")
+    parser.add_argument('messages', help="text file with one utterance per line, or JSON lines with user_input")
+    parser.add_argument('--processes', type=int, default=None)
+    parser.add_argument('--chunk-size', type=int, default=500)
+    parser.add_argument('--batch-scoring', action='store_true', help="score with NumPy")
+    parser.add_argument('--compiled-index', help="compiled intent file shared by the workers (built if stale)")
+    parser.add_argument('--sentiment-lexicon', help="extra sentiment lexicon JSON, compiled once for all workers")
+    args = parser.parse_args(argv)
+
+    with ParallelEvaluator(args.data_file, args.processes, args.chunk_size,
+                           batch_scoring=args.batch_scoring, compiled_index=args.compiled_index,
+                           sentiment_lexicon=args.sentiment_lexicon) as evaluator:
+        for result in evaluator.evaluate(read_messages(args.messages)):
+            sys.stdout.write(json.dumps(result) + '\n')
+        print(json.dumps(evaluator.throughput_report(), indent=2), file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,169 @@
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+logger = logging.getLogger(__name__)
+
+
+class Instrumentation:
+    """
+    Opt-in hot-path statistics for MeowBot.
+    Records wall time per stage of get_response (typo correction, sentiment,
+    intent matching, ...) and counters of the work done inside them:
+    similarity computations, Levenshtein distance calls and DP cells evaluated
+    (for the bit-parallel and NumPy backends, the cells their columns cover).
+    stats() returns a snapshot; with log_file set, a JSON line covering the
+    messages since the previous line is appended every log_interval seconds.
+    """
+    enabled = True
+
+    def __init__(self, log_file=None, log_interval=60.0):
+        self.log_interval = log_interval
+        self._lock = threading.Lock()
+        self.reset()
+
+        self.log_handler = None
+        if log_file:
+            self.log_handler = logging.FileHandler(log_file, encoding='utf-8')
+            self.log_handler.setFormatter(logging.Formatter('%(asctime)s %(message)s'))
+            logger.addHandler(self.log_handler)
+            logger.setLevel(logging.INFO)
+
+    def reset(self):
+        with self._lock:
+            self.messages = 0
+            self.stages = {}     # stage -> [calls, total seconds, max seconds]
+            self.counters = {}   # counter -> total
+            self.started = time.time()
+            self._logged = self.totals()
+            self._last_log = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                stage = self.stages.get(name)
+                if stage is None:
+                    self.stages[name] = [1, elapsed, elapsed]
+                else:
+                    stage[0] += 1
+                    stage[1] += elapsed
+                    if elapsed > stage[2]:
+                        stage[2] = elapsed
+
+    @contextmanager
+    def message(self):
+        """Wraps the handling of one whole message (stage 'total')"""
+        with self.stage('total'):
+            yield
+        with self._lock:
+            self.messages += 1
+        if self.log_handler is not None and time.perf_counter() - self._last_log >= self.log_interval:
+            self.log()
+
+    def count(self, name, amount=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def count_distance(self, cells):
+        """One Levenshtein distance computation that evaluated this many DP cells"""
+        with self._lock:
+            counters = self.counters
+            counters['distance_computations'] = counters.get('distance_computations', 0) + 1
+            counters['dp_cells'] = counters.get('dp_cells', 0) + cells
+
+    def totals(self):
+        """Raw cumulative numbers (call with _lock held)"""
+        return {
+            'messages': self.messages,
+            'stages': {name: (calls, seconds) for name, (calls, seconds, _) in self.stages.items()},
+            'counters': dict(self.counters)
+        }
+
+    def summarize(self, messages, stages, counters):
+        stage_stats = {}
+        for name, (calls, seconds) in stages.items():
+            stage_stats[name] = {
+                'calls': calls,
+                'total_ms': round(seconds * 1000, 3),
+                'mean_ms': round(seconds * 1000 / calls, 4) if calls else 0.0
+            }
+        return {
+            'messages': messages,
+            'stages': stage_stats,
+            'counters': counters,
+            'per_message': {name: round(value / messages, 1) for name, value in counters.items()} if messages else {}
+        }
+
+    def stats(self):
+        """Everything recorded since the last reset()"""
+        with self._lock:
+            totals = self.totals()
+            max_ms = {name: round(stage[2] * 1000, 3) for name, stage in self.stages.items()}
+        summary = self.summarize(totals['messages'], totals['stages'], totals['counters'])
+        for name, stage in summary['stages'].items():
+            stage['max_ms'] = max_ms[name]
+        summary['since'] = self.started
+        return summary
+
+    def log(self):
+        """Append one line with the stats of the messages since the previous line"""
+        with self._lock:
+            totals = self.totals()
+            previous, self._logged = self._logged, totals
+            self._last_log = time.perf_counter()
+
+        stages = {}
+        for name, (calls, seconds) in totals['stages'].items():
+            before_calls, before_seconds = previous['stages'].get(name, (0, 0.0))
+            if calls > before_calls:
+                stages[name] = (calls - before_calls, seconds - before_seconds)
+        counters = {
+            name: value - previous['counters'].get(name, 0)
+            for name, value in totals['counters'].items()
+            if value != previous['counters'].get(name, 0)
+        }
+        summary = self.summarize(totals['messages'] - previous['messages'], stages, counters)
+        logger.info(json.dumps(summary))
+
+    def close(self):
+        if self.log_handler is not None:
+            self.log()
+            logger.removeHandler(self.log_handler)
+            self.log_handler.close()
+            self.log_handler = None
+
+
+class NullInstrumentation:
+    """Stand-in when instrumentation is off: every hook is a no-op"""
+    enabled = False
+
+    def stage(self, name):
+        return nullcontext()
+
+    def message(self):
+        return nullcontext()
+
+    def count(self, name, amount=1):
+        pass
+
+    def count_distance(self, cells):
+        pass
+
+    def stats(self):
+        return None
+
+    def reset(self):
+        pass
+
+    def close(self):
+        pass
+
+
+NULL_INSTRUMENTATION = NullInstrumentation()
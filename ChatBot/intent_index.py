@@ -0,0 +1,259 @@
+from .bk_tree import BKTree
+from .ngram_index import NGramIndex
+from .text_processor import TextProcessor, TokenMatches
+
+
+class IntentIndex:
+    """
+    Intent patterns compiled once from DataManager.load_data().
+    Each pattern is preprocessed, tokenized and stemmed up front so matching a
+    message only has to preprocess the message itself.
+    Given the index of an earlier version of the data, intents whose patterns
+    did not change reuse its compiled entries instead of compiling them again.
+    """
+    def __init__(self, data, text_processor=None, previous=None):
+        self.text_processor = text_processor or TextProcessor()
+        self.entries = []           # CompiledText for every pattern, in data order
+        self.entry_intents = []     # intent name of each entry
+        self.intent_ranges = {}     # intent -> (start, end) slice into entries
+        self.intent_patterns = {}   # intent -> its pattern list, to spot changes on reload
+        self.recompiled_intents = 0
+
+        if previous is not None and previous.text_processor is not self.text_processor:
+            previous = None  # compiled for another backend
+        for intent, intent_data in data.items():
+            start = len(self.entries)
+            patterns = list(intent_data.get('patterns', []))
+            self.intent_patterns[intent] = patterns
+            if previous is not None and previous.intent_patterns.get(intent) == patterns:
+                old_start, old_end = previous.intent_ranges[intent]
+                self.entries.extend(previous.entries[old_start:old_end])
+            else:
+                self.entries.extend(self.text_processor.compile(pattern) for pattern in patterns)
+                self.recompiled_intents += 1
+            self.entry_intents.extend([intent] * len(patterns))
+            self.intent_ranges[intent] = (start, len(self.entries))
+
+        self.build_candidate_indexes(previous)
+
+    def build_candidate_indexes(self, previous=None):
+        """
+        Inverted indexes used to shortlist entries before full scoring.
+        The trigram indexes and the BK-tree are over distinct strings (normalized
+        patterns, pattern tokens), so given the index of an earlier version they
+        are extended with the strings it lacks rather than built again. Strings
+        no pattern uses any more keep their id, with no postings, until they are
+        a quarter of all ids; then that part is rebuilt. Postings are always
+        rebuilt, being only a pass over the entries.
+        """
+        phrases = {}   # normalized pattern -> entry ids
+        tokens = {}    # pattern token -> (entry ids, its masks)
+        self.stem_postings = {}            # stem -> entry ids (Jaccard)
+        for entry_id, entry in enumerate(self.entries):
+            for stem in entry.stems:
+                self.stem_postings.setdefault(stem, []).append(entry_id)
+            phrases.setdefault(entry.normalized, []).append(entry_id)
+            for position, token in enumerate(entry.tokens):
+                postings = tokens.get(token)
+                if postings is None:
+                    postings = tokens[token] = ([], entry.token_masks[position] if entry.token_masks else None)
+                if not postings[0] or postings[0][-1] != entry_id:
+                    postings[0].append(entry_id)
+
+        if previous is not None and previous.phrase_ids is not None and \
+                self.reusable(previous.phrases, previous.phrase_ids, phrases):
+            self.phrases = list(previous.phrases)        # distinct normalized patterns
+            self.phrase_ids = dict(previous.phrase_ids)
+            self.phrase_grams = previous.phrase_grams.extended(
+                (self.add_string(self.phrases, self.phrase_ids, phrase), phrase)
+                for phrase in phrases if phrase not in self.phrase_ids
+            )
+        else:
+            self.phrases, self.phrase_ids = [], {}
+            self.phrase_grams = NGramIndex()   # trigrams of normalized patterns (phrase Levenshtein)
+            for phrase in phrases:
+                self.phrase_grams.add(self.add_string(self.phrases, self.phrase_ids, phrase), phrase)
+        self.phrase_postings = [phrases.get(phrase, []) for phrase in self.phrases]
+
+        if previous is not None and previous.vocabulary_ids is not None and \
+                self.reusable(previous.vocabulary, previous.vocabulary_ids, tokens):
+            self.vocabulary = list(previous.vocabulary)  # distinct pattern tokens
+            self.vocabulary_ids = dict(previous.vocabulary_ids)
+            self.vocabulary_masks = dict(previous.vocabulary_masks)
+            added = [token for token in tokens if token not in self.vocabulary_ids]
+            self.token_grams = previous.token_grams.extended(
+                (self.add_string(self.vocabulary, self.vocabulary_ids, token), token) for token in added
+            )
+        else:
+            self.vocabulary, self.vocabulary_ids, self.vocabulary_masks = [], {}, {}
+            added = list(tokens)
+            self.token_grams = NGramIndex()    # trigrams of vocabulary tokens (token Levenshtein)
+            for token in added:
+                self.token_grams.add(self.add_string(self.vocabulary, self.vocabulary_ids, token), token)
+            previous = None
+        for token in added:
+            if tokens[token][1]:
+                self.vocabulary_masks[token] = tokens[token][1]  # vocabulary token -> bit masks (bit-parallel backend)
+        # vocabulary id -> entry ids containing it
+        self.token_postings = [tokens[token][0] if token in tokens else [] for token in self.vocabulary]
+
+        # Metric tree for the nearest vocabulary words of each input token
+        if previous is not None:
+            self.vocabulary_tree = previous.vocabulary_tree.extended(added, self.vocabulary_distance)
+        else:
+            self.vocabulary_tree = BKTree(self.vocabulary_distance, self.vocabulary)
+
+        # NumPy arrays for the batch scoring mode, built on first use
+        self.batch_scorer = None
+
+    @staticmethod
+    def add_string(strings, string_ids, string):
+        string_ids[string] = len(strings)
+        strings.append(string)
+        return string_ids[string]
+
+    @staticmethod
+    def reusable(strings, string_ids, live):
+        """Whether ids given out before can be kept: those of dead strings stay under a quarter"""
+        total = len(strings) + sum(1 for string in live if string not in string_ids)
+        return (total - len(live)) * 4 < total
+
+    def vocabulary_distance(self, word, vocabulary_word):
+        return self.text_processor.levenshtein_distance(
+            word, vocabulary_word, None, self.vocabulary_masks.get(vocabulary_word)
+        )
+
+    def __len__(self):
+        return len(self.entries)
+
+    def compile_input(self, user_input, threshold=0):
+        """
+        Preprocess an incoming message once for all pattern comparisons.
+        Each input token also gets its nearby vocabulary words from the BK-tree,
+        so the token-level score is worked out per message instead of per pattern.
+        """
+        compiled_input = self.text_processor.compile(user_input)
+        if self.text_processor.batch_scoring:
+            return compiled_input  # the BatchScorer does its own token pass
+
+        token_matches = {}
+        for token in compiled_input.tokens:
+            if token in token_matches:
+                continue
+            # Radius at which a same-length word would still reach the threshold
+            radius = int((1 - min(max(threshold, 0), 1.0)) * len(token) + 1e-9)
+            similarities = {}
+            for distance, word in self.vocabulary_tree.search(token, radius):
+                similarities[word] = 1 - (distance / max(len(token), len(word)))
+            # Words outside the radius are at least radius + 1 edits away; the best
+            # such word is radius + 1 characters longer than the token
+            ceiling = 1 - ((radius + 1) / (len(token) + radius + 1))
+            token_matches[token] = TokenMatches(similarities, ceiling)
+
+        compiled_input.token_matches = [token_matches[token] for token in compiled_input.tokens]
+        return compiled_input
+
+    def candidates(self, compiled_input, threshold):
+        """
+        Entry ids that may score at least threshold, in data order.
+        calculate_similarity is the max of three scores, so an entry can only
+        reach the threshold if one of them does:
+        - Jaccard needs at least one shared stem
+        - phrase Levenshtein has to pass the trigram count filter
+        - the token average needs some input token close enough to one of the
+          pattern's tokens, which the token trigram filter finds
+        These are exact, so only entries scoring below the threshold are dropped.
+        At the thresholds MeowBot matches with (0.2, 0.15) most entries do reach
+        them and nearly all are kept; the scoring work is then cut by the ceiling
+        bound in matched_token_similarity. The shortlist pays off from about 0.7.
+        """
+        if threshold <= 0:
+            return range(len(self.entries))
+
+        shortlist = set()
+        for stem in compiled_input.stems:
+            shortlist.update(self.stem_postings.get(stem, ()))
+
+        for phrase_id in self.phrase_grams.candidates(compiled_input.normalized, threshold):
+            shortlist.update(self.phrase_postings[phrase_id])
+
+        for token in set(compiled_input.tokens):
+            for vocabulary_id in self.token_grams.candidates(token, threshold):
+                shortlist.update(self.token_postings[vocabulary_id])
+
+        return sorted(shortlist)
+
+    def batch_scores(self, compiled_input, entry_ids):
+        """Scores of the given entries computed in one go by the BatchScorer"""
+        if self.batch_scorer is None:
+            from .batch_scorer import BatchScorer
+            self.batch_scorer = BatchScorer(self.entries)
+        instrumentation = self.text_processor.instrumentation
+        if instrumentation is not None:
+            instrumentation.count('similarity_computations', len(entry_ids))
+            instrumentation.count('dp_cells', self.batch_scorer.dp_cells(compiled_input, entry_ids))
+        return self.batch_scorer.scores(compiled_input, entry_ids).tolist()
+
+    def score_entries(self, compiled_input, entry_ids, threshold):
+        """Yield (entry_id, score) for every entry scoring at or above the threshold"""
+        if self.text_processor.batch_scoring:
+            entry_ids = list(entry_ids)
+            for entry_id, score in zip(entry_ids, self.batch_scores(compiled_input, entry_ids)):
+                if score >= threshold:
+                    yield entry_id, score
+            return
+
+        entries = self.entries
+        similarity = self.text_processor.compiled_similarity
+        for entry_id in entry_ids:
+            score = similarity(compiled_input, entries[entry_id], threshold)
+            if score >= threshold:
+                yield entry_id, float(score)
+
+    def find_best_match(self, user_input, threshold=0.3):
+        """
+        Find the best matching pattern across all intents.
+        Ties go to the earliest intent/pattern, like the per-intent scan did.
+        Returns: (intent, pattern, score) or (None, None, 0.0)
+        """
+        compiled_input = self.compile_input(user_input, threshold)
+
+        entries = self.entries
+        similarity = self.text_processor.compiled_similarity
+
+        best_id, best_score = None, None
+        if self.text_processor.batch_scoring:
+            # All shortlisted entries are scored at once, so there is no bound to raise
+            for entry_id, score in self.score_entries(
+                compiled_input, self.candidates(compiled_input, threshold), threshold
+            ):
+                if best_score is None or score > best_score:
+                    best_id, best_score = entry_id, score
+        else:
+            for entry_id in self.candidates(compiled_input, threshold):
+                # Anything that cannot beat the current best may stop its DP early
+                bound = threshold if best_score is None else max(threshold, best_score)
+                score = similarity(compiled_input, entries[entry_id], bound)
+                if score >= threshold and (best_score is None or score > best_score):
+                    best_id, best_score = entry_id, float(score)
+
+        if best_id is None:
+            return (None, None, 0.0)
+        return (self.entry_intents[best_id], self.entries[best_id].text, best_score)
+
+    def find_closest_matches(self, user_input, threshold=0.3, top_n=3):
+        """
+        Find the closest patterns across all intents.
+        Returns a list of tuples: (pattern, similarity_score)
+        """
+        compiled_input = self.compile_input(user_input, threshold)
+
+        matches = [
+            (self.entries[entry_id].text, score)
+            for entry_id, score in self.score_entries(
+                compiled_input, self.candidates(compiled_input, threshold), threshold
+            )
+        ]
+
+        matches.sort(key=lambda x: x[1], reverse=True)
+        return matches[:top_n]
@@ -0,0 +1,57 @@
+from .mapped_file import words_checksum
+from .intent_index import IntentIndex
+from .lru_cache import LRUCache
+from .typo_corrector import TypoCorrector, load_common_words
+
+
+class IntentSnapshot:
+    """
+    Everything MeowBot derives from one version of the intent data: the data
+    itself, the compiled IntentIndex, the TypoCorrector and the score caches.
+    Snapshots are never modified once built. A reload builds a new one next to
+    the old and swaps it in with a single assignment, so a request that picked
+    up a snapshot keeps a consistent view until it is done.
+    Given the previous snapshot, only what changed is rebuilt: unchanged
+    intents keep their compiled patterns, the candidate indexes and the
+    corrector are extended rather than rebuilt, and when the pattern tokens are
+    all the same (say only responses were edited) the corrector and caches carry over.
+    Given a CompiledIntents already checked against this data, the index and
+    corrector are mapped from it instead of being built.
+    """
+    def __init__(self, data, text_processor, extra_words=(), signature=None, data_version=0,
+                 cache_size=1024, previous=None, compiled=None):
+        self.data = data
+        self.signature = signature        # (mtime_ns, size) of the intent file when it was read
+        self.data_version = data_version  # DataManager.data_version when it was read
+
+        if compiled is not None:
+            self.intent_index = compiled.intent_index(text_processor)
+            self.intent_cache = LRUCache(cache_size)
+            self.typo_words_checksum = compiled.typo_words_checksum
+            self.typo_corrector = compiled.typo_corrector(text_processor, load_common_words())
+            self.sentiment_cache = LRUCache(cache_size)
+            return
+
+        if previous is not None and list(previous.intent_index.intent_patterns.items()) == [
+                (intent, list(intent_data.get('patterns', []))) for intent, intent_data in data.items()]:
+            # Same patterns in the same order: the index and its match cache still hold
+            self.intent_index = previous.intent_index
+            self.intent_cache = previous.intent_cache
+        else:
+            self.intent_index = IntentIndex(data, text_processor, previous.intent_index if previous else None)
+            self.intent_cache = LRUCache(cache_size)
+
+        # Typo corrector over every pattern token plus the extra (slang lexicon) words
+        typo_words = [token for entry in self.intent_index.entries for token in entry.tokens]
+        typo_words.extend(extra_words)
+        self.typo_words_checksum = words_checksum(typo_words)
+        if previous is not None and previous.typo_words_checksum == self.typo_words_checksum:
+            self.typo_corrector = previous.typo_corrector
+            self.sentiment_cache = previous.sentiment_cache
+        elif previous is not None:
+            self.typo_corrector = previous.typo_corrector.rebuilt(typo_words)
+            self.sentiment_cache = LRUCache(cache_size)
+        else:
+            self.typo_corrector = TypoCorrector(typo_words, max_edit_distance=2, text_processor=text_processor,
+                                                known_words=load_common_words())
+            self.sentiment_cache = LRUCache(cache_size)
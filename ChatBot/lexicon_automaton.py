@@ -0,0 +1,111 @@
+import re
+from collections import deque
+
+# Dropped from every token before matching, as the analyzer always did per word
+PUNCTUATION = re.compile(r'[^\w\s]')
+
+
+def tokenize(text):
+    """
+    Lowercased whitespace tokens of text with punctuation removed. A token made
+    only of punctuation becomes '' but keeps its position.
+    """
+    words = text.lower().split()
+    if not words:
+        return []
+    # No word contains a space, so one substitution over the joined words splits back into the same positions
+    return PUNCTUATION.sub('', ' '.join(words)).split(' ')
+
+
+class LexiconAutomaton:
+    """
+    Aho-Corasick automaton whose alphabet is tokens rather than characters.
+    Entries are phrases of one or more tokens, each tagged with a kind
+    ('sentiment', 'modifier', 'negation') and a value. scan() follows one
+    transition per token of a message and reports every entry occurrence, so
+    matching costs the same however many entries the lexicon has.
+    """
+    def __init__(self):
+        self.transitions = [{}]  # state -> {token: next state}; state 0 is the root
+        self.fail = [0]          # state -> longest proper suffix state
+        self.entries = [[]]      # state -> [(token count, kind, phrase, value)] spelled by this state
+        self.outputs = [[]]      # state -> entries ending in this state, suffixes included (set by build)
+        self.built = True
+
+    def __len__(self):
+        return len(self.transitions)
+
+    def add(self, phrase, kind, value):
+        tokens = tokenize(phrase)
+        if not tokens or '' in tokens:
+            return  # nothing a message could match
+
+        state = 0
+        for token in tokens:
+            next_state = self.transitions[state].get(token)
+            if next_state is None:
+                next_state = len(self.transitions)
+                self.transitions[state][token] = next_state
+                self.transitions.append({})
+                self.entries.append([])
+            state = next_state
+        self.entries[state].append((len(tokens), kind, phrase, value))
+        self.built = False
+
+    def build(self):
+        """Failure links, worked out breadth first once all entries are added"""
+        transitions = self.transitions
+        fail = self.fail = [0] * len(transitions)
+        outputs = self.outputs = [list(entries) for entries in self.entries]
+        queue = deque(transitions[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, next_state in transitions[state].items():
+                queue.append(next_state)
+                fallback = fail[state]
+                while fallback and token not in transitions[fallback]:
+                    fallback = fail[fallback]
+                fail[next_state] = transitions[fallback].get(token, 0)
+                # Entries ending at the suffix state end here too (it is shallower, so already complete)
+                outputs[next_state].extend(outputs[fail[next_state]])
+        self.built = True
+
+    def scan(self, tokens):
+        """Yield (start, token count, kind, phrase, value) for every entry occurrence in tokens"""
+        if not self.built:
+            self.build()
+        transitions, fail, outputs = self.transitions, self.fail, self.outputs
+        state = 0
+        for position, token in enumerate(tokens):
+            while state and token not in transitions[state]:
+                state = fail[state]
+            state = transitions[state].get(token, 0)
+            for length, kind, phrase, value in outputs[state]:
+                yield position - length + 1, length, kind, phrase, value
+
+    def units(self, tokens):
+        """
+        Split tokens into units: the longest entry starting at each position
+        (leftmost first, never overlapping), or a single unmatched token.
+        Returns [(text, {kind: (phrase, value)} or None)].
+        """
+        longest = {}  # start -> (token count, {kind: (phrase, value)})
+        for start, length, kind, phrase, value in self.scan(tokens):
+            found = longest.get(start)
+            if found is None or length > found[0]:
+                longest[start] = (length, {kind: (phrase, value)})
+            elif length == found[0]:
+                found[1][kind] = (phrase, value)
+
+        units = []
+        position = 0
+        while position < len(tokens):
+            found = longest.get(position)
+            if found is None:
+                units.append((tokens[position], None))
+                position += 1
+            else:
+                length, entries = found
+                units.append((' '.join(tokens[position:position + length]), entries))
+                position += length
+        return units
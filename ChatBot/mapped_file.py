@@ -0,0 +1,340 @@
+import array
+import hashlib
+import mmap
+import os
+import struct
+import sys
+import zlib
+
+# magic, format version, section count, checksum count, byte order of the arrays;
+# then checksum count sha256 digests and the section table
+HEADER = struct.Struct('<8sIII1s3x')
+CHECKSUM_SIZE = 32
+SECTION = struct.Struct('<32s1s7xQQ')  # name, array typecode, offset, byte length
+ALIGNMENT = 8
+
+
+def file_checksum(path):
+    """sha256 of a file's bytes"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.digest()
+
+
+def words_checksum(words):
+    digest = hashlib.sha256()
+    for word in words:
+        digest.update(word.encode('utf-8', 'surrogatepass') + b'\x00')
+    return digest.digest()
+
+
+def encode(string):
+    return string.encode('utf-8', 'surrogatepass')
+
+
+def hash_slots(strings):
+    """Open addressing table for HashedStrings: slot -> string id + 1, 0 when empty"""
+    size = 8
+    while size < 2 * len(strings):
+        size *= 2
+    slots = array.array('I', bytes(4 * size))
+    for string_id, string in enumerate(strings):
+        slot = zlib.crc32(encode(string)) & (size - 1)
+        while slots[slot]:
+            slot = (slot + 1) & (size - 1)
+        slots[slot] = string_id + 1
+    return slots
+
+
+class CorruptMappedFile(ValueError):
+    """A mapped file whose section table doesn't fit the file, e.g. one cut short"""
+
+
+# --- Writing -----------------------------------------------------------------
+
+class SectionWriter:
+    """Collects named arrays and writes them behind a header and section table"""
+    def __init__(self):
+        self.sections = []  # (name, typecode, bytes)
+
+    def add_array(self, name, typecode, values):
+        self.sections.append((name, typecode, array.array(typecode, values).tobytes()))
+
+    def add_strings(self, name, strings, hashed=False):
+        """
+        UTF-8 blob plus len(strings) + 1 offsets into it; hashed adds the slots
+        HashedStrings looks strings up with
+        """
+        blob = bytearray()
+        offsets = array.array('I', [0])
+        for string in strings:
+            blob += encode(string)
+            offsets.append(len(blob))
+        self.sections.append((name + '.text', 'B', bytes(blob)))
+        self.sections.append((name + '.offsets', 'I', offsets.tobytes()))
+        if hashed:
+            self.sections.append((name + '.slots', 'I', hash_slots(strings).tobytes()))
+
+    def add_rows(self, name, rows, typecode='I'):
+        """Rows of integers stored flat (CSR): row i is values[offsets[i]:offsets[i + 1]]"""
+        offsets = array.array('I', [0])
+        values = array.array(typecode)
+        for row in rows:
+            values.extend(row)
+            offsets.append(len(values))
+        self.sections.append((name + '.offsets', 'I', offsets.tobytes()))
+        self.sections.append((name + '.values', typecode, values.tobytes()))
+
+    def write(self, path, magic, version, checksums):
+        """Write atomically, so a process mapping the old file never sees a half-written one"""
+        position = HEADER.size + CHECKSUM_SIZE * len(checksums) + SECTION.size * len(self.sections)
+        table = []
+        for name, typecode, data in self.sections:
+            position += -position % ALIGNMENT
+            table.append((SECTION.pack(encode(name), typecode.encode('ascii'), position, len(data)), position))
+            position += len(data)
+
+        temp_path = f'{path}.{os.getpid()}.tmp'
+        with open(temp_path, 'wb') as f:
+            f.write(HEADER.pack(magic, version, len(self.sections), len(checksums), sys.byteorder[0].encode('ascii')))
+            f.write(b''.join(checksums))
+            f.write(b''.join(entry for entry, _ in table))
+            for (_, _, data), (_, offset) in zip(self.sections, table):
+                f.write(b'\x00' * (offset - f.tell()))
+                f.write(data)
+        os.replace(temp_path, path)
+
+
+# --- Reading -----------------------------------------------------------------
+
+class MappedStrings:
+    """Read-only string table inside a mapped file"""
+    def __init__(self, text, offsets):
+        self.text = text
+        self.offsets = offsets
+        self.ids = {}  # found strings -> id, so repeated lookups skip the binary search
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return str(self.text[self.offsets[i]:self.offsets[i + 1]], 'utf-8', 'surrogatepass')
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def __contains__(self, string):
+        return self.find(string) >= 0
+
+    def find(self, string):
+        """Id of string in a table written in sorted (UTF-8 byte) order, or -1"""
+        found = self.ids.get(string)
+        if found is not None:
+            return found
+
+        key = encode(string)
+        text, offsets = self.text, self.offsets
+        low, high = 0, len(offsets) - 1
+        while low < high:
+            middle = (low + high) // 2
+            if text[offsets[middle]:offsets[middle + 1]].tobytes() < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < len(offsets) - 1 and text[offsets[low]:offsets[low + 1]] == key:
+            self.ids[string] = low
+            return low
+        return -1
+
+
+class HashedStrings(MappedStrings):
+    """
+    String table found through its hash slots instead of a binary search, so a
+    miss (most words of a message, for a lexicon) costs one crc32 and a probe or two
+    """
+    def __init__(self, text, offsets, slots):
+        super().__init__(text, offsets)
+        self.slots = slots
+        self.mask = len(slots) - 1
+
+    def find(self, string):
+        key = encode(string)
+        text, offsets, slots, mask = self.text, self.offsets, self.slots, self.mask
+        slot = zlib.crc32(key) & mask
+        while slots[slot]:
+            string_id = slots[slot] - 1
+            if text[offsets[string_id]:offsets[string_id + 1]] == key:
+                return string_id
+            slot = (slot + 1) & mask
+        return -1
+
+
+class CachedStrings(MappedStrings):
+    """
+    String table that hands out the same str object every time. Token similarity
+    lookups are keyed by these strings, and identical objects compare fastest.
+    """
+    def __init__(self, text, offsets):
+        super().__init__(text, offsets)
+        self.decoded = [None] * len(self)
+
+    def __getitem__(self, i):
+        string = self.decoded[i]
+        if string is None:
+            string = self.decoded[i] = super().__getitem__(i)
+        return string
+
+
+class MappedRows:
+    """Read-only CSR rows; each row comes back as a list of ints"""
+    def __init__(self, offsets, values):
+        self.offsets = offsets
+        self.values = values
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return self.values[self.offsets[i]:self.offsets[i + 1]].tolist()
+
+
+class MappedPostings:
+    """String-keyed rows, with the dict.get() the in-memory indexes call"""
+    def __init__(self, keys, rows, counts=None, values=None):
+        self.keys = keys
+        self.rows = rows
+        self.counts = counts  # parallel rows, making every posting an (id, count) pair
+        self.values = values  # table the row ids point into, to return strings instead of ids
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __iter__(self):
+        return iter(self.keys)
+
+    def get(self, key, default=None):
+        key_id = self.keys.find(key)
+        if key_id < 0:
+            return default
+        if self.counts is not None:
+            return zip(self.rows[key_id], self.counts[key_id])
+        if self.values is not None:
+            return [self.values[value_id] for value_id in self.rows[key_id]]
+        return self.rows[key_id]
+
+
+class MappedWordValues:
+    """Read-only word -> number mapping over a searchable string table"""
+    def __init__(self, words, values):
+        self.words = words
+        self.values = values
+
+    def __len__(self):
+        return len(self.words)
+
+    def __iter__(self):
+        return iter(self.words)
+
+    def __contains__(self, word):
+        return self.words.find(word) >= 0
+
+    def __getitem__(self, word):
+        word_id = self.words.find(word)
+        if word_id < 0:
+            raise KeyError(word)
+        return self.values[word_id]
+
+    def get(self, word, default=None):
+        word_id = self.words.find(word)
+        return self.values[word_id] if word_id >= 0 else default
+
+    def items(self):
+        return zip(self.words, self.values)
+
+
+class MappedFile:
+    """
+    A file of named arrays written by SectionWriter, mapped read-only. The OS
+    shares its pages between every process mapping it.
+    Subclasses set MAGIC and FORMAT_VERSION; a file written by another format
+    version or on a machine with the other byte order maps no sections.
+    Raises CorruptMappedFile if a section or string/row offsets reach past the
+    end of the file, so callers rebuild it rather than read garbage.
+    """
+    MAGIC = None
+    FORMAT_VERSION = None
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.path = path
+        self.view = memoryview(self.mmap)
+
+        if len(self.mmap) < HEADER.size:
+            raise ValueError(f"Not a {type(self).__name__} file: {path}")
+        magic, version, section_count, checksum_count, byte_order = HEADER.unpack_from(self.mmap)
+        if magic != self.MAGIC:
+            raise ValueError(f"Not a {type(self).__name__} file: {path}")
+        self.version = version
+        self.byte_order = byte_order.decode('ascii')
+
+        self.checksums = ()
+        self.sections = {}
+        if not self.usable():
+            return
+        position = HEADER.size
+        table_end = position + CHECKSUM_SIZE * checksum_count + SECTION.size * section_count
+        if table_end > len(self.mmap):
+            raise CorruptMappedFile(f"Section table runs past the end of {path}")
+        self.checksums = tuple(
+            self.mmap[position + i * CHECKSUM_SIZE:position + (i + 1) * CHECKSUM_SIZE] for i in range(checksum_count)
+        )
+        position += CHECKSUM_SIZE * checksum_count
+        for i in range(section_count):
+            name, typecode, offset, length = SECTION.unpack_from(self.mmap, position + i * SECTION.size)
+            try:
+                name = name.rstrip(b'\x00').decode('ascii')
+                typecode = typecode.decode('ascii')
+                item_size = array.array(typecode).itemsize
+            except ValueError:  # UnicodeDecodeError included
+                raise CorruptMappedFile(f"Bad section table entry {i} in {path}") from None
+            if offset < table_end or offset + length > len(self.mmap) or length % item_size:
+                raise CorruptMappedFile(f"Section {name} lies outside {path}")
+            section = self.view[offset:offset + length]
+            if typecode != 'B':
+                section = section.cast(typecode)
+            self.sections[name] = section
+
+        # String tables and rows: their last offset has to stay inside the data they index
+        for name, offsets in self.sections.items():
+            if name.endswith('.offsets'):
+                base = name[:-len('.offsets')]
+                data = self.sections.get(base + '.text', self.sections.get(base + '.values'))
+                if data is None or not len(offsets) or offsets[-1] > len(data):
+                    raise CorruptMappedFile(f"Section {name} points past its data in {path}")
+
+    def usable(self):
+        """Written by this format version on a machine with the same byte order"""
+        return self.version == self.FORMAT_VERSION and self.byte_order == sys.byteorder[0]
+
+    def matches(self, *checksums):
+        """Built from exactly the sources with these checksums"""
+        return self.usable() and self.checksums[:len(checksums)] == checksums
+
+    def array(self, name):
+        return self.sections[name]
+
+    def strings(self, name):
+        if name + '.slots' in self.sections:
+            return HashedStrings(self.sections[name + '.text'], self.sections[name + '.offsets'],
+                                 self.sections[name + '.slots'])
+        return MappedStrings(self.sections[name + '.text'], self.sections[name + '.offsets'])
+
+    def rows(self, name):
+        return MappedRows(self.sections[name + '.offsets'], self.sections[name + '.values'])
+
+    def word_values(self, name):
+        return MappedWordValues(self.strings(name), self.sections[name + '.values'])
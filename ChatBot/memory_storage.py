@@ -0,0 +1,276 @@
+import abc
+import json
+import os
+import sqlite3
+import threading
+
+
+def empty_memory():
+    return {
+        "conversations": [],
+        "user_context": {},
+        "session_count": 0
+    }
+
+
+def apply_record(memory, record):
+    """Replay one change record (see DataManager) onto a memory dict"""
+    kind = record["type"]
+    if kind == "message":
+        memory["conversations"].append(record["entry"])
+    elif kind == "context":
+        memory["user_context"].update(record["update"])
+    elif kind == "session":
+        memory["session_count"] = record["session_count"]
+    elif kind == "reset":
+        memory.clear()
+        memory.update(record["memory"])
+
+
+def write_json_atomically(path, text):
+    """Write next to the file and swap it in, so a crash never leaves half a file"""
+    temp_file = path + '.tmp'
+    with open(temp_file, 'w') as f:
+        f.write(text)
+    os.replace(temp_file, path)
+
+
+class MemoryStorage(abc.ABC):
+    """
+    Where DataManager persists conversation memory.
+    load() returns the memory dict ("conversations", "user_context", "session_count").
+    write() receives the change records (see apply_record) in the order they
+    happened, plus a full snapshot of memory when needs_snapshot() asked for one.
+    Storages that set queryable also define recent_conversations(limit, session_id=None),
+    the last limit exchanges straight from storage, so the in-RAM copy only needs
+    the latest exchanges.
+    """
+    queryable = False
+
+    @abc.abstractmethod
+    def load(self):
+        pass
+
+    def needs_snapshot(self, pending_records):
+        return False
+
+    @abc.abstractmethod
+    def write(self, records, snapshot):
+        pass
+
+    def close(self):
+        pass
+
+
+class JsonMemoryStorage(MemoryStorage):
+    """The whole conversation memory as one JSON document, rewritten on every flush"""
+    def __init__(self, memory_file):
+        self.memory_file = memory_file
+
+    def load(self):
+        try:
+            with open(self.memory_file, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return empty_memory()
+
+    def needs_snapshot(self, pending_records):
+        return True
+
+    def write(self, records, snapshot):
+        write_json_atomically(self.memory_file, json.dumps(snapshot, indent=2))
+
+
+class JsonlMemoryStorage(MemoryStorage):
+    """
+    Append-only JSON Lines log of memory changes on top of a JSON snapshot.
+    Every flush appends one line per change, so writing costs O(changes), not
+    O(history). Every compact_every records the snapshot is rebuilt from the
+    in-memory state and the log is emptied.
+    Records carry a sequence number and the snapshot remembers the last one it
+    includes, so a crash between writing the snapshot and emptying the log
+    never replays a change twice.
+    """
+    def __init__(self, snapshot_file, log_file=None, compact_every=1000):
+        self.snapshot_file = snapshot_file
+        self.log_file = log_file or os.path.splitext(snapshot_file)[0] + '.log.jsonl'
+        self.compact_every = compact_every
+        self.last_seq = 0
+        self.records_since_compaction = 0
+
+    def load(self):
+        try:
+            with open(self.snapshot_file, 'r') as f:
+                memory = json.load(f)
+        except FileNotFoundError:
+            memory = empty_memory()
+        snapshot_seq = memory.pop("last_seq", 0)
+        self.last_seq = snapshot_seq
+        self.records_since_compaction = 0
+
+        try:
+            with open(self.log_file, 'r') as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            lines = []
+
+        for line_number, line in enumerate(lines):
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # Torn last line from a crash mid-append: drop it so new lines start clean
+                with open(self.log_file, 'w') as f:
+                    f.writelines(lines[:line_number])
+                break
+            self.records_since_compaction += 1
+            if record["seq"] <= snapshot_seq:
+                continue
+            apply_record(memory, record)
+            self.last_seq = record["seq"]
+
+        return memory
+
+    def needs_snapshot(self, pending_records):
+        """Time to compact once these records are written?"""
+        return bool(self.compact_every) and \
+            self.records_since_compaction + pending_records >= self.compact_every
+
+    def write(self, records, snapshot):
+        if records:
+            lines = []
+            for record in records:
+                self.last_seq += 1
+                lines.append(json.dumps(dict(record, seq=self.last_seq)))
+            with open(self.log_file, 'a') as f:
+                f.write('\n'.join(lines) + '\n')
+            self.records_since_compaction += len(records)
+
+        if snapshot is not None:
+            self.compact(snapshot)
+
+    def compact(self, snapshot):
+        """Fold the log into the snapshot; snapshot must include every record written so far"""
+        write_json_atomically(self.snapshot_file, json.dumps(dict(snapshot, last_seq=self.last_seq), indent=2))
+        open(self.log_file, 'w').close()
+        self.records_since_compaction = 0
+
+
+class SqliteMemoryStorage(MemoryStorage):
+    """
+    Conversation memory in SQLite, for full history across many sessions.
+    Runs in WAL mode so reads don't block the writer. Exchanges are indexed by
+    (session_id, timestamp) and inserted in batches inside one transaction per
+    flush. load() only brings the last recent_window exchanges into RAM (all of
+    them when recent_window is None); older ones are fetched with recent_conversations().
+    """
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS conversations (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            session_id INTEGER,
+            timestamp TEXT,
+            user_input TEXT,
+            bot_response TEXT
+        );
+        CREATE INDEX IF NOT EXISTS conversations_session_time ON conversations (session_id, timestamp);
+        CREATE TABLE IF NOT EXISTS user_context (key TEXT PRIMARY KEY, value TEXT);
+        CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER);
+    """
+    INSERT_CONVERSATION = ("INSERT INTO conversations (session_id, timestamp, user_input, bot_response) "
+                           "VALUES (?, ?, ?, ?)")
+    UPSERT_CONTEXT = "INSERT OR REPLACE INTO user_context (key, value) VALUES (?, ?)"
+    UPSERT_META = "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)"
+    SELECT_COLUMNS = "SELECT timestamp, user_input, bot_response, session_id FROM conversations"
+    queryable = True
+
+    def __init__(self, db_file, recent_window=100):
+        self.db_file = db_file
+        self.recent_window = recent_window
+        # Used from the flush thread and the caller's thread, one at a time
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(db_file, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(self.SCHEMA)
+
+    def rows_to_conversations(self, rows):
+        return [
+            {"timestamp": timestamp, "user_input": user_input, "bot_response": bot_response,
+             "session_id": session_id}
+            for timestamp, user_input, bot_response, session_id in rows
+        ]
+
+    def load(self):
+        with self._lock:
+            row = self.connection.execute("SELECT value FROM meta WHERE key = 'session_count'").fetchone()
+            user_context = {
+                key: json.loads(value)
+                for key, value in self.connection.execute("SELECT key, value FROM user_context")
+            }
+        return {
+            "conversations": self.recent_conversations(self.recent_window),
+            "user_context": user_context,
+            "session_count": row[0] if row else 0
+        }
+
+    def write(self, records, snapshot):
+        with self._lock, self.connection:
+            batch = []
+            for record in records:
+                kind = record["type"]
+                if kind == "message":
+                    entry = record["entry"]
+                    batch.append((entry["session_id"], entry["timestamp"], entry["user_input"], entry["bot_response"]))
+                    continue
+
+                # Keep the order: flush the run of messages before anything else
+                if batch:
+                    self.connection.executemany(self.INSERT_CONVERSATION, batch)
+                    batch = []
+                if kind == "context":
+                    self.connection.executemany(
+                        self.UPSERT_CONTEXT,
+                        [(key, json.dumps(value)) for key, value in record["update"].items()]
+                    )
+                elif kind == "session":
+                    self.connection.execute(self.UPSERT_META, ("session_count", record["session_count"]))
+                elif kind == "reset":
+                    self.replace_all(record["memory"])
+            if batch:
+                self.connection.executemany(self.INSERT_CONVERSATION, batch)
+
+    def replace_all(self, memory):
+        self.connection.execute("DELETE FROM conversations")
+        self.connection.execute("DELETE FROM user_context")
+        self.connection.executemany(self.INSERT_CONVERSATION, [
+            (entry.get("session_id", 0), entry.get("timestamp"), entry.get("user_input"), entry.get("bot_response"))
+            for entry in memory.get("conversations", [])
+        ])
+        self.connection.executemany(self.UPSERT_CONTEXT, [
+            (key, json.dumps(value)) for key, value in memory.get("user_context", {}).items()
+        ])
+        self.connection.execute(self.UPSERT_META, ("session_count", memory.get("session_count", 0)))
+
+    def recent_conversations(self, limit, session_id=None):
+        """Tail query on the primary key (or the session index), oldest first; limit=None returns all"""
+        if limit is None:
+            limit = -1  # SQLite reads a negative LIMIT as no limit
+        with self._lock:
+            if session_id is None:
+                rows = self.connection.execute(
+                    self.SELECT_COLUMNS + " ORDER BY id DESC LIMIT ?", (limit,)
+                ).fetchall()
+            else:
+                rows = self.connection.execute(
+                    self.SELECT_COLUMNS + " WHERE session_id = ? ORDER BY timestamp DESC, id DESC LIMIT ?",
+                    (session_id, limit)
+                ).fetchall()
+        rows.reverse()
+        return self.rows_to_conversations(rows)
+
+    def close(self):
+        """Close the database; closing it again does nothing"""
+        with self._lock:
+            if self.connection is None:
+                return
+            self.connection.close()
+            self.connection = None
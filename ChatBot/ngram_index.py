@@ -0,0 +1,98 @@
+from collections import Counter
+
+
+class NGramIndex:
+    """
+    Character n-gram inverted index over short strings.
+    candidates() uses the q-gram count filter: two strings within edit distance k
+    of each other share at least max(len1, len2) + q - 1 - k * q padded q-grams,
+    so anything returned is a superset of what a full scan would accept.
+    """
+    START_PAD = '\x02'
+    END_PAD = '\x03'
+
+    def __init__(self, q=3):
+        self.q = q
+        self.postings = {}        # gram -> list of (item_id, count)
+        self.item_lengths = {}    # item_id -> length of its string
+        self.length_buckets = {}  # length -> list of item_ids
+
+    def grams(self, text):
+        """Count the padded q-grams of text"""
+        padded = self.START_PAD * (self.q - 1) + text + self.END_PAD * (self.q - 1)
+        return Counter(padded[i:i + self.q] for i in range(len(padded) - self.q + 1))
+
+    def add(self, item_id, text):
+        for gram, count in self.grams(text).items():
+            self.postings.setdefault(gram, []).append((item_id, count))
+        self.item_lengths[item_id] = len(text)
+        self.length_buckets.setdefault(len(text), []).append(item_id)
+
+    def extended(self, items):
+        """
+        A new index holding this one's items plus (item_id, text) items. This one
+        is left as it is: the new index shares every posting list the new items
+        don't add to.
+        """
+        index = NGramIndex(self.q)
+        index.postings = dict(self.postings)
+        index.item_lengths = dict(self.item_lengths)
+        index.length_buckets = dict(self.length_buckets)
+        copied_grams, copied_lengths = set(), set()
+        for item_id, text in items:
+            for gram, count in self.grams(text).items():
+                if gram not in copied_grams:
+                    index.postings[gram] = list(index.postings.get(gram, ()))
+                    copied_grams.add(gram)
+                index.postings[gram].append((item_id, count))
+            index.item_lengths[item_id] = len(text)
+            if len(text) not in copied_lengths:
+                index.length_buckets[len(text)] = list(index.length_buckets.get(len(text), ()))
+                copied_lengths.add(len(text))
+            index.length_buckets[len(text)].append(item_id)
+        return index
+
+    def __len__(self):
+        return len(self.item_lengths)
+
+    def candidates(self, text, threshold):
+        """
+        Return the set of item ids whose Levenshtein similarity to text may reach
+        threshold (same rounding as TextProcessor.levenshtein_similarity).
+        Lengths for which the filter needs no shared gram at all are kept whole.
+        """
+        if threshold <= 0:
+            return set(self.item_lengths)
+
+        text_length = len(text)
+        q = self.q
+
+        # Minimum shared grams per item length; lengths that need none keep everything
+        result = set()
+        required_by_length = {}
+        for length, item_ids in self.length_buckets.items():
+            max_length = max(text_length, length)
+            max_distance = int((1 - min(threshold, 1.0)) * max_length + 1e-9)
+            if abs(text_length - length) > max_distance:
+                continue
+            required = max_length + q - 1 - max_distance * q
+            if required <= 0:
+                result.update(item_ids)
+            else:
+                required_by_length[length] = required
+
+        if not required_by_length:
+            return result
+
+        shared = {}
+        for gram, count in self.grams(text).items():
+            for item_id, item_count in self.postings.get(gram, ()):
+                shared[item_id] = shared.get(item_id, 0) + min(count, item_count)
+
+        item_lengths = self.item_lengths
+        for item_id, shared_count in shared.items():
+            required = required_by_length.get(item_lengths[item_id])
+            if required is not None and shared_count >= required:
+                result.add(item_id)
+
+        return result
@@ -1,9 +1,21 @@
-import re
 import random
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple
+from .compiled_lexicon import (CompiledLexicon, default_compiled_lexicon_path, lexicon_checksum,
+                               load_compiled_lexicon, read_lexicon_file, write_compiled_lexicon)
+from .emoji_index import EmojiIndex
+from .lexicon_automaton import LexiconAutomaton, tokenize
+from .mapped_file import file_checksum
+
+try:
+    import numpy as np
+except ImportError:  # only analyze_batch needs it
+    np = None
 
 class GenZSentimentAnalyzer:
-    def __init__(self):
+    def __init__(self, typo_corrector=None, lexicon_file=None, compiled_lexicon=None):
+        # Optional TypoCorrector used for words missing from the lexicon ("slayy", "bussinn")
+        self.typo_corrector = typo_corrector
+        
         self.sentiment_words = {
             'positive': {
                 # Standard positive
@@ -42,51 +54,140 @@ class GenZSentimentAnalyzer:
         }
         
         self.negation_words = {'not', 'never', 'no', "don't", "isn't", "won't", "can't", "shouldn't"}
+        
+        if lexicon_file is not None:
+            self.load_lexicon(lexicon_file, compiled_lexicon)
+        else:
+            # Words a typo may be corrected to
+            self.correctable_words = set(self.lexicon_words())
+            self.build_automaton()
+            self.emoji_index = EmojiIndex(self.emoji_sentiment)
     
-    def preprocess_text(self, text: str) -> str:
-        """Handle multi-word Gen Z phrases"""
-        text = re.sub(r'\bno cap\b', 'NOCAP_POSITIVE', text, flags=re.IGNORECASE)
-        text = re.sub(r'\bhits different\b', 'HITSDIFFERENT_POSITIVE', text, flags=re.IGNORECASE)
-        text = re.sub(r'\bgoes hard\b', 'GOESHARD_POSITIVE', text, flags=re.IGNORECASE)
-        return text
+    def extend_lexicon(self, lexicon: Dict) -> None:
+        """Add the sections of a lexicon file (see read_lexicon_file) to the in-memory lexicon"""
+        self.sentiment_words['positive'].update(lexicon.get('positive', {}))
+        self.sentiment_words['negative'].update(lexicon.get('negative', {}))
+        self.emoji_sentiment.update(lexicon.get('emoji', {}))
+        self.intensity_modifiers.update(lexicon.get('modifiers', {}))
+        self.negation_words.update(lexicon.get('negations', []))
+        self.correctable_words = set(self.lexicon_words())
+        self.build_automaton()
+        self.emoji_index = EmojiIndex(self.emoji_sentiment)
     
-    def analyze_sentiment(self, text: str) -> Dict:
-        """Analyze sentiment with chatbot-friendly output"""
-        processed_text = self.preprocess_text(text)
-        words = processed_text.lower().split()
-        
+    def load_lexicon(self, lexicon_file: str, compiled_lexicon: Optional[str] = None) -> None:
+        """
+        Add a lexicon file to the built-in lexicon through its compiled form
+        (compiled_lexicon.py, default path: lexicon_file with a .lex suffix).
+        An up-to-date compiled file is memory-mapped as is; a missing or stale
+        one is compiled first.
+        """
+        compiled_lexicon = compiled_lexicon or default_compiled_lexicon_path(lexicon_file)
+        checksums = (file_checksum(lexicon_file), lexicon_checksum(self))
+        compiled = load_compiled_lexicon(compiled_lexicon, *checksums)
+        if compiled is None:
+            self.extend_lexicon(read_lexicon_file(lexicon_file))
+            try:
+                write_compiled_lexicon(compiled_lexicon, self, checksums)
+            except OSError as e:
+                print(f"Could not write compiled lexicon {compiled_lexicon}: {e}")
+                return  # keep the in-memory lexicon
+            compiled = CompiledLexicon(compiled_lexicon)
+        self.use_compiled_lexicon(compiled)
+    
+    def use_compiled_lexicon(self, compiled: CompiledLexicon) -> None:
+        """Read the lexicon from a mapped CompiledLexicon instead of dicts"""
+        self.compiled_lexicon = compiled
+        self.sentiment_words = {
+            'positive': compiled.word_values('positive'),
+            'negative': compiled.word_values('negative')
+        }
+        self.correctable_words = compiled.strings('correctable')
+        # Few enough to keep as dicts; emoji_score looks up every character
+        self.emoji_sentiment = dict(compiled.word_values('emoji').items())
+        self.intensity_modifiers = dict(compiled.word_values('modifiers').items())
+        self.negation_words = set(compiled.strings('negations'))
+        self.automaton = compiled.automaton()
+        self.emoji_index = EmojiIndex(self.emoji_sentiment)
+    
+    def build_automaton(self):
+        """
+        Compile the lexicon, modifiers and negations into one LexiconAutomaton.
+        Call again after changing any of them.
+        """
+        automaton = LexiconAutomaton()
+        # A phrase listed under both polarities counts as positive, as it always did
+        lexicon = {**self.sentiment_words['negative'], **self.sentiment_words['positive']}
+        for phrase, score in lexicon.items():
+            automaton.add(phrase, 'sentiment', score)
+        for word, modifier in self.intensity_modifiers.items():
+            automaton.add(word, 'modifier', modifier)
+        for word in self.negation_words:
+            automaton.add(word, 'negation', True)
+        automaton.build()
+        self.automaton = automaton
+    
+    def lexicon_words(self) -> List[str]:
+        """Single-word entries of the sentiment lexicon"""
+        return [
+            word
+            for polarity in ('positive', 'negative')
+            for word in self.sentiment_words[polarity]
+            if ' ' not in word
+        ]
+    
+    def emoji_score(self, text: str) -> float:
+        """Sum of the emoji scores in text, by whole emoji ('❤️', '👍🏽'), see EmojiIndex"""
+        return self.emoji_index.score(text)
+    
+    def corrected_score(self, word: str, typo_corrector=None) -> Tuple[Optional[str], Optional[float]]:
+        """Lexicon word a misspelled word ("slayy") corrects to, and its score"""
+        if typo_corrector is None:
+            typo_corrector = self.typo_corrector
+        if typo_corrector is None or not word:
+            return None, None
+        correction, _ = typo_corrector.lookup(word, accept=self.correctable_words)
+        if correction is None:
+            return None, None
+        return correction, self.sentiment_words['positive'].get(
+            correction, self.sentiment_words['negative'].get(correction)
+        )
+    
+    def analyze_sentiment(self, text: str, typo_corrector=None) -> Dict:
+        """
+        Analyze sentiment with chatbot-friendly output.
+        typo_corrector, if given, is used instead of the analyzer's own for this text.
+        """
         sentiment_score = 0.0
         found_words = []
         
         # Check emojis
-        emoji_score = sum(self.emoji_sentiment.get(char, 0) for char in text)
+        emoji_score = self.emoji_score(text)
         sentiment_score += emoji_score
         
-        # Analyze words with context
-        for i, word in enumerate(words):
-            # Clean word
-            clean_word = re.sub(r'[^\w\s]', '', word)
-            
+        # One pass of the automaton splits the message into lexicon phrases
+        # ("no cap", "hits different"), modifiers, negations and other words
+        units = self.automaton.units(tokenize(text))
+        for i, (word, entries) in enumerate(units):
             # Check for sentiment
             word_score = None
-            if clean_word in self.sentiment_words['positive']:
-                word_score = self.sentiment_words['positive'][clean_word]
-            elif clean_word in self.sentiment_words['negative']:
-                word_score = self.sentiment_words['negative'][clean_word]
-            elif clean_word == 'nocap_positive':
-                word_score = 0.8
-            elif clean_word in ['hitsdifferent_positive', 'goeshard_positive']:
-                word_score = 0.8
+            if entries is not None and 'sentiment' in entries:
+                word, word_score = entries['sentiment']
+            else:
+                # Misspelled slang, e.g. "slayy" -> "slay"
+                correction, word_score = self.corrected_score(word, typo_corrector)
+                if correction is not None:
+                    word = correction
             
             if word_score is not None:
                 # Check for intensity modifiers
                 modifier = 1.0
-                if i > 0 and words[i-1] in self.intensity_modifiers:
-                    modifier = self.intensity_modifiers[words[i-1]]
+                previous = units[i-1][1] if i > 0 else None
+                if previous is not None and 'modifier' in previous:
+                    modifier = previous['modifier'][1]
                 
                 # Check for negation
                 negated = False
-                if i > 0 and any(words[j] in self.negation_words for j in range(max(0, i-2), i)):
+                if any(units[j][1] is not None and 'negation' in units[j][1] for j in range(max(0, i-2), i)):
                     negated = True
                     word_score *= -0.7
                 
@@ -94,7 +195,7 @@ class GenZSentimentAnalyzer:
                 sentiment_score += final_score
                 
                 found_words.append({
-                    'word': clean_word,
+                    'word': word,
                     'score': final_score,
                     'negated': negated,
                     'modifier': modifier
@@ -117,6 +218,91 @@ class GenZSentimentAnalyzer:
             'confidence': min(1.0, abs(sentiment_score) / 2.0)
         }
     
+    def analyze_batch(self, texts: Sequence[str], typo_corrector=None) -> Dict:
+        """
+        Sentiment of many texts at once, as NumPy columns in input order:
+        score, overall, intensity, confidence, emoji_score and word_count
+        (how many words_found analyze_sentiment would list). Every value equals
+        what analyze_sentiment returns for the same text.
+        Each distinct word or phrase is looked up (and typo-corrected) once per
+        call; pass a few thousand texts per call rather than millions.
+        typo_corrector is as for analyze_sentiment.
+        """
+        if np is None:
+            raise ImportError("analyze_batch needs NumPy (pip install numpy)")
+        
+        # Texts become runs of unit ids (a unit is a word or a lexicon phrase)
+        unit_ids = {}
+        unit_entries = []
+        flat_ids = []
+        lengths = []
+        emoji_scores = []
+        for text in texts:
+            emoji_scores.append(self.emoji_score(text))
+            units = self.automaton.units(tokenize(text))
+            lengths.append(len(units))
+            for word, entries in units:
+                unit_id = unit_ids.get(word)
+                if unit_id is None:
+                    unit_id = unit_ids[word] = len(unit_entries)
+                    unit_entries.append(entries)
+                flat_ids.append(unit_id)
+        
+        # Per-unit lookup tables: lexicon (or typo-corrected) score, modifier, negation
+        unit_scores = np.full(len(unit_entries), np.nan)
+        unit_modifiers = np.ones(len(unit_entries))
+        unit_negations = np.zeros(len(unit_entries), dtype=bool)
+        for unit_id, (word, entries) in enumerate(zip(unit_ids, unit_entries)):
+            if entries is not None:
+                if 'modifier' in entries:
+                    unit_modifiers[unit_id] = entries['modifier'][1]
+                unit_negations[unit_id] = 'negation' in entries
+            if entries is not None and 'sentiment' in entries:
+                unit_scores[unit_id] = entries['sentiment'][1]
+            else:
+                _, score = self.corrected_score(word, typo_corrector)
+                if score is not None:
+                    unit_scores[unit_id] = score
+        
+        count = len(lengths)
+        ids = np.array(flat_ids, dtype=np.int64)
+        lengths = np.array(lengths, dtype=np.int64)
+        message = np.repeat(np.arange(count), lengths)
+        position = np.arange(len(ids)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        
+        # The modifier of the unit before, and negations among the two units before
+        modifiers = np.ones(len(ids))
+        modifiers[1:] = np.where(position[1:] >= 1, unit_modifiers[ids[:-1]], 1.0)
+        negations = unit_negations[ids]
+        negated = np.zeros(len(ids), dtype=bool)
+        negated[1:] |= negations[:-1] & (position[1:] >= 1)
+        negated[2:] |= negations[:-2] & (position[2:] >= 2)
+        
+        scores = unit_scores[ids]
+        scored = np.flatnonzero(~np.isnan(scores))
+        final_scores = np.where(negated[scored], scores[scored] * -0.7, scores[scored]) * modifiers[scored]
+        
+        # Lay each text's word scores out in a row and add them column by column,
+        # the same order analyze_sentiment adds them in, so the floats match exactly
+        rows = message[scored]
+        columns = np.arange(len(scored)) - np.searchsorted(rows, rows)
+        word_count = np.bincount(rows, minlength=count)
+        table = np.zeros((count, int(word_count.max()) if len(scored) else 0))
+        table[rows, columns] = final_scores
+        totals = 0.0 + np.array(emoji_scores, dtype=np.float64)
+        for column in range(table.shape[1]):
+            totals += table[:, column]
+        
+        # Python's round, which rounds the exact decimal value unlike np.round
+        return {
+            'score': np.array([round(total, 2) for total in totals.tolist()]),
+            'overall': np.where(totals > 0.4, 'positive', np.where(totals < -0.4, 'negative', 'neutral')),
+            'intensity': np.array([round(abs(total), 2) for total in totals.tolist()]),
+            'confidence': np.minimum(1.0, np.abs(totals) / 2.0),
+            'emoji_score': np.array([round(score, 2) for score in emoji_scores], dtype=np.float64),
+            'word_count': word_count
+        }
+    
     def get_sentiment_response_modifier(self, sentiment_result: Dict) -> str:
         """Get response modifier based on sentiment - perfect for your chatbot"""
         overall = sentiment_result['overall']
@@ -0,0 +1,416 @@
+import asyncio
+import base64
+import hashlib
+import itertools
+import json
+import struct
+import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+from .chatbot import MeowBot
+from .instrumentation import Instrumentation
+from .session_manager import DEFAULT_SESSION_DIR, SessionManager
+
+WEBSOCKET_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+MAX_HEADER_BYTES = 16 * 1024
+MAX_BODY_BYTES = 64 * 1024
+
+STATUS_TEXT = {
+    200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+    413: 'Payload Too Large', 503: 'Service Unavailable'
+}
+
+# WebSocket opcodes
+CONTINUATION, TEXT, BINARY, CLOSE, PING, PONG = 0x0, 0x1, 0x2, 0x8, 0x9, 0xA
+# WebSocket close statuses: a frame breaking RFC 6455, a message over MAX_BODY_BYTES
+PROTOCOL_ERROR = 1002
+MESSAGE_TOO_BIG = 1009
+
+
+class LatencyTracker:
+    """Reply latencies over the last window requests, summarized as percentiles"""
+    def __init__(self, window=10000):
+        self.samples = deque(maxlen=window)
+        self.count = 0
+
+    def record(self, seconds):
+        self.samples.append(seconds)
+        self.count += 1
+
+    def percentile(self, sorted_samples, fraction):
+        index = min(len(sorted_samples) - 1, int(fraction * len(sorted_samples)))
+        return sorted_samples[index]
+
+    def report(self):
+        if not self.samples:
+            return {'requests': self.count, 'p50_ms': None, 'p99_ms': None, 'max_ms': None}
+        samples = sorted(self.samples)
+        return {
+            'requests': self.count,
+            'p50_ms': round(self.percentile(samples, 0.50) * 1000, 3),
+            'p99_ms': round(self.percentile(samples, 0.99) * 1000, 3),
+            'max_ms': round(samples[-1] * 1000, 3)
+        }
+
+
+class ServerBusy(Exception):
+    """Every executor slot is taken and the request can't wait"""
+    pass
+
+
+def unmask(payload, mask):
+    """XOR a client frame with its 4-byte mask, as one big-int operation"""
+    if not payload:
+        return payload
+    key = (mask * (len(payload) // 4 + 1))[:len(payload)]
+    value = int.from_bytes(payload, 'big') ^ int.from_bytes(key, 'big')
+    return value.to_bytes(len(payload), 'big')
+
+
+def encode_frame(opcode, payload):
+    """Server-to-client frames are never masked"""
+    length = len(payload)
+    if length < 126:
+        header = struct.pack('!BB', 0x80 | opcode, length)
+    elif length < 1 << 16:
+        header = struct.pack('!BBH', 0x80 | opcode, 126, length)
+    else:
+        header = struct.pack('!BBQ', 0x80 | opcode, 127, length)
+    return header + payload
+
+
+class FrameTooLarge(ValueError):
+    """A WebSocket frame longer than MAX_BODY_BYTES"""
+    pass
+
+
+class UnmaskedFrame(ValueError):
+    """A client frame without a mask, which RFC 6455 section 5.1 forbids"""
+    pass
+
+
+async def read_frame(reader):
+    """Returns (opcode, fin, payload) of one frame"""
+    first, second = await reader.readexactly(2)
+    fin, opcode = first & 0x80, first & 0x0F
+    length = second & 0x7F
+    if length == 126:
+        length, = struct.unpack('!H', await reader.readexactly(2))
+    elif length == 127:
+        length, = struct.unpack('!Q', await reader.readexactly(8))
+    if length > MAX_BODY_BYTES:
+        raise FrameTooLarge(length)
+    if not second & 0x80:
+        raise UnmaskedFrame()
+    mask = await reader.readexactly(4)
+    payload = await reader.readexactly(length)
+    return opcode, fin, unmask(payload, mask)
+
+
+class ChatServer:
+    """
+    Local asyncio server exposing MeowBot over HTTP and WebSocket, stdlib only.
+
+        POST /chat   {"message": "...", "user_id": "..."} -> {"response": ..., "intent": ..., ...}
+        GET  /stats  latency percentiles, sessions and executor load
+        GET  /ws     WebSocket: send text (or {"message": ...} JSON), receive JSON replies
+
+    Scoring runs on a bounded thread pool so the event loop never waits on
+    Levenshtein. At most max_pending messages are queued for it: HTTP requests
+    beyond that get 503, WebSocket connections simply stop being read until a
+    slot frees up. Every connection gets its own session unless it names a
+    user_id (JSON field or ?user_id= on the WebSocket URL).
+    """
+    def __init__(self, session_manager=None, host='127.0.0.1', port=8765,
+                 max_workers=4, max_pending=64, keep_alive_timeout=60):
+        self.sessions = session_manager or SessionManager()
+        self.host = host
+        self.port = port
+        self.executor = ThreadPoolExecutor(max_workers, thread_name_prefix='meowbot')
+        self.max_pending = max_pending
+        self.slots = asyncio.Semaphore(max_pending)
+        self.keep_alive_timeout = keep_alive_timeout
+        self.latency = LatencyTracker()  # arrival to reply, queueing included
+        self.queue_wait = LatencyTracker()  # arrival to getting a slot
+        self.connection_ids = itertools.count(1)
+        self.connections = set()  # writers of open connections, closed on shutdown
+        self.all_closed = asyncio.Event()
+        self.pending = 0
+        self.rejected = 0
+        self.server = None
+
+    async def start(self):
+        self.server = await asyncio.start_server(
+            self.handle_connection, self.host, self.port, limit=MAX_HEADER_BYTES, backlog=1024
+        )
+        self.port = self.server.sockets[0].getsockname()[1]  # when started on port 0
+        return self.server
+
+    async def serve_forever(self):
+        if self.server is None:
+            await self.start()
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            # Closing the sockets lets every handler finish on its own instead of being cancelled
+            for writer in list(self.connections):
+                writer.close()
+            if self.connections:
+                await self.all_closed.wait()
+            await self.server.wait_closed()
+        self.executor.shutdown(wait=True)
+        self.sessions.close()
+
+    def stats(self):
+        return {
+            'latency': self.latency.report(),
+            'queue_wait': self.queue_wait.report(),
+            'open_connections': len(self.connections),
+            'pending': self.pending,
+            'max_pending': self.max_pending,
+            'rejected': self.rejected,
+            'sessions': self.sessions.stats(),
+            'instrumentation': self.sessions.bot.get_stats()
+        }
+
+    async def reply(self, user_id, message, wait=True):
+        """Answer one message on the executor; wait=False raises ServerBusy instead of queueing"""
+        if not wait and self.slots.locked():
+            self.rejected += 1
+            raise ServerBusy()
+
+        arrived = time.perf_counter()
+        self.pending += 1
+        try:
+            async with self.slots:
+                self.queue_wait.record(time.perf_counter() - arrived)
+                if message.strip():
+                    result = await asyncio.get_running_loop().run_in_executor(
+                        self.executor, self.sessions.get_result, user_id, message
+                    )
+                else:
+                    result = {'intent': None, 'score': 0.0, 'sentiment': None,
+                              'response': "I didn't catch that. Could you say something?"}
+                self.latency.record(time.perf_counter() - arrived)
+        finally:
+            self.pending -= 1
+
+        return {
+            'user_id': user_id,
+            'response': result['response'],
+            'intent': result['intent'],
+            'score': result['score'],
+            'sentiment': result['sentiment']['overall'] if result['sentiment'] else None
+        }
+
+    async def handle_connection(self, reader, writer):
+        connection_user = f"connection-{next(self.connection_ids)}"
+        self.connections.add(writer)
+        self.all_closed.clear()
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(self.read_request(reader), self.keep_alive_timeout)
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                    return
+                except ValueError as error:
+                    await self.send_json(writer, 400, {'error': str(error)}, keep_alive=False)
+                    return
+                if request is None:
+                    return
+
+                method, target, headers, body = request
+                url = urlsplit(target)
+                if headers.get('upgrade', '').lower() == 'websocket' and url.path == '/ws':
+                    user_id = parse_qs(url.query).get('user_id', [connection_user])[0]
+                    await self.websocket_session(reader, writer, headers, user_id)
+                    return
+
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                status, payload = await self.route(method, url.path, body, connection_user)
+                await self.send_json(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    return
+        finally:
+            # Anonymous connections don't outlive their socket
+            self.sessions.end_session(connection_user, save=False)
+            writer.close()
+            self.connections.discard(writer)
+            if not self.connections:
+                self.all_closed.set()
+
+    async def read_request(self, reader):
+        """(method, target, headers, body) of the next HTTP request, or None on a clean EOF"""
+        try:
+            head = await reader.readuntil(b'\r\n\r\n')
+        except asyncio.IncompleteReadError as error:
+            if not error.partial:
+                return None
+            raise
+        except asyncio.LimitOverrunError:
+            raise ValueError("headers too large")
+
+        lines = head.decode('latin-1').split('\r\n')
+        try:
+            method, target, _ = lines[0].split(' ', 2)
+        except ValueError:
+            raise ValueError("malformed request line")
+        headers = {}
+        for line in lines[1:]:
+            if ':' in line:
+                name, value = line.split(':', 1)
+                headers[name.strip().lower()] = value.strip()
+
+        length = int(headers.get('content-length', 0) or 0)
+        if length > MAX_BODY_BYTES:
+            raise ValueError("body too large")
+        body = await reader.readexactly(length) if length else b''
+        return method.upper(), target, headers, body
+
+    async def route(self, method, path, body, connection_user):
+        if path == '/stats':
+            if method != 'GET':
+                return 405, {'error': 'use GET'}
+            return 200, self.stats()
+
+        if path == '/chat':
+            if method != 'POST':
+                return 405, {'error': 'use POST'}
+            try:
+                request = json.loads(body or b'{}')
+                message = str(request['message'])
+            except (ValueError, KeyError, TypeError):
+                return 400, {'error': 'expected JSON like {"message": "hi"}'}
+            user_id = str(request.get('user_id') or connection_user)
+            try:
+                return 200, await self.reply(user_id, message, wait=False)
+            except ServerBusy:
+                return 503, {'error': 'busy, try again'}
+
+        return 404, {'error': 'not found'}
+
+    async def send_json(self, writer, status, payload, keep_alive=True):
+        body = json.dumps(payload).encode('utf-8')
+        headers = [
+            f"HTTP/1.1 {status} {STATUS_TEXT[status]}",
+            "Content-Type: application/json; charset=utf-8",
+            f"Content-Length: {len(body)}",
+            "Connection: keep-alive" if keep_alive else "Connection: close"
+        ]
+        if status == 503:
+            headers.append("Retry-After: 1")
+        writer.write(('\r\n'.join(headers) + '\r\n\r\n').encode('latin-1') + body)
+        await writer.drain()
+
+    async def close_websocket(self, writer, status, reason):
+        writer.write(encode_frame(CLOSE, struct.pack('!H', status) + reason.encode('utf-8')))
+        await writer.drain()
+
+    async def websocket_session(self, reader, writer, headers, user_id):
+        key = headers.get('sec-websocket-key')
+        if not key:
+            await self.send_json(writer, 400, {'error': 'missing Sec-WebSocket-Key'}, keep_alive=False)
+            return
+        accept = base64.b64encode(hashlib.sha1((key + WEBSOCKET_GUID).encode('ascii')).digest()).decode('ascii')
+        writer.write((
+            "HTTP/1.1 101 Switching Protocols\r\n"
+            "Upgrade: websocket\r\n"
+            "Connection: Upgrade\r\n"
+            f"Sec-WebSocket-Accept: {accept}\r\n\r\n"
+        ).encode('latin-1'))
+        await writer.drain()
+
+        fragments = []
+        message_bytes = 0
+        while True:
+            try:
+                opcode, fin, payload = await read_frame(reader)
+            except FrameTooLarge:
+                await self.close_websocket(writer, MESSAGE_TOO_BIG, 'message too big')
+                return
+            except UnmaskedFrame:
+                await self.close_websocket(writer, PROTOCOL_ERROR, 'client frames must be masked')
+                return
+            except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+                return
+
+            if opcode == CLOSE:
+                writer.write(encode_frame(CLOSE, payload[:2]))
+                await writer.drain()
+                return
+            if opcode == PING:
+                writer.write(encode_frame(PONG, payload))
+                await writer.drain()
+                continue
+            if opcode == PONG:
+                continue
+
+            # Every frame is within MAX_BODY_BYTES, but a message can have any number of them
+            message_bytes += len(payload)
+            if message_bytes > MAX_BODY_BYTES:
+                await self.close_websocket(writer, MESSAGE_TOO_BIG, 'message too big')
+                return
+            fragments.append(payload)
+            if not fin:
+                continue
+            text = b''.join(fragments).decode('utf-8', 'replace')
+            fragments = []
+            message_bytes = 0
+
+            message = text
+            if text.startswith('{'):
+                try:
+                    message = str(json.loads(text).get('message', ''))
+                except (ValueError, AttributeError):
+                    pass
+            # Waits for a free executor slot; meanwhile this socket isn't read
+            reply = await self.reply(user_id, message)
+            writer.write(encode_frame(TEXT, json.dumps(reply).encode('utf-8')))
+            await writer.drain()
+
+
+def parse_args(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve MeowBot over HTTP and WebSocket")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--workers', type=int, default=4, help="threads scoring messages")
+    parser.add_argument('--max-pending', type=int, default=64, help="messages queued before HTTP gets 503")
+    parser.add_argument('--max-sessions', type=int, default=1000, help="sessions kept in RAM")
+    parser.add_argument('--session-dir', default=DEFAULT_SESSION_DIR)
+    parser.add_argument('--log-file', help="record per-stage timings and log them here every minute")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    async def run():
+        instrumentation = Instrumentation(args.log_file) if args.log_file else None
+        bot = MeowBot(start_session=False, instrumentation=instrumentation)
+        sessions = SessionManager(bot, session_dir=args.session_dir, max_active_sessions=args.max_sessions)
+        server = ChatServer(sessions, args.host, args.port, args.workers, args.max_pending)
+        await server.start()
+        print(f"🐱 MeowBot listening on http://{server.host}:{server.port} (WebSocket at /ws)")
+        try:
+            await server.serve_forever()
+        finally:
+            print(json.dumps(server.stats(), indent=2), file=sys.stderr)
+            await server.close()
+            bot.instrumentation.close()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
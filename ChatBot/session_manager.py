@@ -0,0 +1,226 @@
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict, deque
+from urllib.parse import quote
+
+from .chatbot import MeowBot
+from .memory_storage import write_json_atomically
+
+DEFAULT_SESSION_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'sessions')
+
+logger = logging.getLogger(__name__)
+
+
+class UserSession:
+    """
+    One user's conversation: what we know about them and their last few exchanges.
+    Kept small on purpose (slots, a bounded deque) so thousands can stay in RAM.
+    """
+    __slots__ = ('user_id', 'user_context', 'recent_conversations', 'message_count', 'lock', 'in_use')
+
+    def __init__(self, user_id, user_context=None, recent_conversations=(), message_count=0, history_size=5):
+        self.user_id = user_id
+        self.user_context = dict(user_context or {})
+        self.recent_conversations = deque(recent_conversations, maxlen=history_size)
+        self.message_count = message_count
+        self.lock = threading.Lock()  # one message at a time per user
+        self.in_use = 0               # messages being answered; such sessions are never evicted
+
+    def to_dict(self):
+        return {
+            "user_id": self.user_id,
+            "user_context": self.user_context,
+            "recent_conversations": list(self.recent_conversations),
+            "message_count": self.message_count
+        }
+
+    @classmethod
+    def from_dict(cls, data, history_size=5):
+        return cls(data["user_id"], data.get("user_context"), data.get("recent_conversations", ()),
+                   data.get("message_count", 0), history_size)
+
+
+class SessionManager:
+    """
+    Hosts many independent conversations in one process.
+    Every user gets their own context and recent-history ring buffer, while the
+    compiled intent index, typo corrector and sentiment lexicon live once in a
+    shared MeowBot that is only read from. At most max_active_sessions stay in
+    RAM; the least recently used ones are written to session_dir and read back
+    the next time that user says something.
+
+        sessions = SessionManager(MeowBot(start_session=False))
+        reply = sessions.get_response('alice', 'hi, my name is alice')
+    """
+    def __init__(self, bot=None, session_dir=DEFAULT_SESSION_DIR, max_active_sessions=1000, history_size=5):
+        self.bot = bot or MeowBot(start_session=False)
+        self.session_dir = session_dir
+        self.max_active_sessions = max_active_sessions
+        self.history_size = history_size
+        self.sessions = OrderedDict()  # user_id -> UserSession, least recently used first
+        self.evicting = {}             # user_id -> [UserSession, writes still in flight]
+        self.loading = {}              # user_id -> Event set once its session file has been read
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self.restores = 0
+        os.makedirs(session_dir, exist_ok=True)
+
+    def session_file(self, user_id):
+        return os.path.join(self.session_dir, quote(str(user_id), safe='') + '.json')
+
+    def get_session(self, user_id, pin=False):
+        """
+        The user's session, restored from disk or created if it isn't in RAM.
+        pin=True marks it in use until release_session(), so it can't be evicted
+        (and then updated after being written out) while a reply is being built.
+        """
+        with self._lock:
+            session = self.sessions.get(user_id)
+            if session is not None:
+                self.sessions.move_to_end(user_id)
+                session.in_use += pin
+                return session
+
+            # Coming back while its eviction is still being written: take it as is
+            pending = self.evicting.get(user_id)
+            if pending:
+                session = pending[0]
+                loaded = None
+            else:
+                # Read the file without holding the lock, so a slow disk only delays this user;
+                # anyone else asking for the same user meanwhile waits for this read
+                loaded = self.loading.get(user_id)
+                if loaded is not None:
+                    waiting = True
+                else:
+                    loaded = self.loading[user_id] = threading.Event()
+                    waiting = False
+            if pending:
+                session.in_use += pin
+                self.sessions[user_id] = session
+                evicted = self.evict_cold_sessions()
+
+        if not pending:
+            if waiting:
+                loaded.wait()
+                return self.get_session(user_id, pin)
+            try:
+                session = self.restore_session(user_id)
+            finally:
+                with self._lock:
+                    del self.loading[user_id]
+                    if session is not None:
+                        session.in_use += pin
+                        self.sessions[user_id] = session
+                        evicted = self.evict_cold_sessions()
+                loaded.set()
+
+        for cold in evicted:
+            self.save_session(cold)
+            with self._lock:
+                pending = self.evicting[cold.user_id]
+                pending[1] -= 1
+                if not pending[1]:
+                    del self.evicting[cold.user_id]
+        return session
+
+    def release_session(self, session):
+        with self._lock:
+            session.in_use -= 1
+
+    def evict_cold_sessions(self):
+        """Drop least recently used sessions over the limit (call with _lock held); returns them for saving"""
+        evicted = []
+        excess = len(self.sessions) - self.max_active_sessions
+        if excess <= 0:
+            return evicted
+        for user_id, session in list(self.sessions.items()):
+            if session.in_use:
+                continue  # busy sessions may push us over the limit for a moment
+            del self.sessions[user_id]
+            self.evicting.setdefault(user_id, [session, 0])[1] += 1
+            evicted.append(session)
+            if len(evicted) == excess:
+                break
+        self.evictions += len(evicted)
+        return evicted
+
+    def restore_session(self, user_id):
+        """
+        The user's session as saved in session_dir, or a fresh one. A file that
+        can't be read back (cut short, corrupt) is moved aside to <file>.corrupt
+        and the user starts over instead of failing on every message.
+        """
+        path = self.session_file(user_id)
+        try:
+            with open(path, 'r') as f:
+                session = UserSession.from_dict(json.load(f), self.history_size)
+        except FileNotFoundError:
+            return UserSession(user_id, history_size=self.history_size)
+        except (OSError, ValueError, KeyError, TypeError, AttributeError) as error:
+            logger.warning("Unreadable session file %s (%s), starting a new session", path, error)
+            try:
+                os.replace(path, path + '.corrupt')
+            except OSError:
+                pass
+            return UserSession(user_id, history_size=self.history_size)
+        self.restores += 1
+        return session
+
+    def save_session(self, session):
+        # Holding the lock keeps a half-updated session off disk and orders writes of the same user
+        with session.lock:
+            write_json_atomically(self.session_file(session.user_id), json.dumps(session.to_dict(), indent=2))
+
+    def get_result(self, user_id, user_input):
+        """Structured reply for one user's message (see MeowBot.build_response)"""
+        instrumentation = self.bot.instrumentation
+        with instrumentation.message():
+            session = self.get_session(user_id, pin=True)
+            try:
+                # The analysis only reads the shared index, so users don't wait on each other
+                analysis = self.bot.analyze_message(user_input)
+
+                with session.lock, instrumentation.stage('response'):
+                    result = self.bot.build_response(
+                        user_input, analysis, session.user_context, list(session.recent_conversations)
+                    )
+                    if result['context_update']:
+                        session.user_context.update(result['context_update'])
+                    session.recent_conversations.append({"user_input": user_input, "bot_response": result['response']})
+                    session.message_count += 1
+            finally:
+                self.release_session(session)
+        return result
+
+    def get_response(self, user_id, user_input):
+        if not user_input.strip():
+            return "I didn't catch that. Could you say something?"
+        return self.get_result(user_id, user_input)['response']
+
+    def end_session(self, user_id, save=True):
+        """Drop the user's session from RAM, writing it to disk first unless save=False"""
+        with self._lock:
+            session = self.sessions.get(user_id)
+            if session is not None and not session.in_use:
+                del self.sessions[user_id]
+        if session is not None and save:
+            self.save_session(session)
+
+    def close(self):
+        """Write every active session to disk"""
+        with self._lock:
+            sessions = list(self.sessions.values())
+        for session in sessions:
+            self.save_session(session)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'active_sessions': len(self.sessions),
+                'max_active_sessions': self.max_active_sessions,
+                'evictions': self.evictions,
+                'restores': self.restores
+            }
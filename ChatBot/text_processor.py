@@ -1,8 +1,45 @@
 import re
 
+
+class CompiledText:
+    """Preprocessed form of a text so it can be compared without redoing the work"""
+    def __init__(self, text, normalized, stems, tokens, masks=None, token_masks=None):
+        self.text = text
+        self.normalized = normalized  # preprocess() output
+        self.stems = stems            # set of stemmed tokens (Jaccard)
+        self.tokens = tokens          # list of raw tokens (token-level Levenshtein)
+        self.masks = masks                # character bit masks of normalized (bit-parallel backend)
+        self.token_masks = token_masks    # character bit masks of each token (bit-parallel backend)
+        self.token_matches = None         # TokenMatches per token, set on inputs by IntentIndex
+
+
+class TokenMatches:
+    """Known similarities between one input token and vocabulary tokens, shared by all patterns of a message"""
+    def __init__(self, similarities, ceiling):
+        self.similarities = similarities  # vocabulary token -> exact levenshtein_similarity
+        self.ceiling = ceiling            # any token missing from similarities scores at most this
+
+
 class TextProcessor:
-    def __init__(self):
-        pass
+    DISTANCE_BACKENDS = ('dp', 'bitparallel')
+    
+    def __init__(self, distance_backend='dp', batch_scoring=False):
+        """
+        distance_backend: 'dp' for the row-by-row dynamic programming table,
+        'bitparallel' for Myers' bit-vector algorithm
+        batch_scoring: score many patterns at once with NumPy (see batch_scorer.py)
+        """
+        if distance_backend not in self.DISTANCE_BACKENDS:
+            raise ValueError(f"Unknown distance backend: {distance_backend}")
+        if batch_scoring:
+            from .batch_scorer import np
+            if np is None:
+                raise ImportError("Batch scoring needs NumPy (pip install numpy)")
+        self.distance_backend = distance_backend
+        self.batch_scoring = batch_scoring
+        # Optional Instrumentation counting similarity computations and DP cells
+        # (trivial distances decided by the lengths alone are not counted)
+        self.instrumentation = None
     
     def preprocess(self, text):
         """Clean and preprocess the input text"""
@@ -36,16 +73,42 @@ class TextProcessor:
         
         return stemmed_tokens
     
-    def levenshtein_distance(self, s1, s2):
+    def compile(self, text):
+        """Preprocess, tokenize and stem a text once for repeated comparisons"""
+        normalized = self.preprocess(text)
+        stems = set(self.tokenize_and_stem(normalized))
+        tokens = normalized.split()
+        if self.distance_backend != 'bitparallel':
+            return CompiledText(text, normalized, stems, tokens)
+        
+        # Patterns compiled for the bit-parallel backend carry their masks along
+        return CompiledText(
+            text, normalized, stems, tokens,
+            masks=self.build_char_masks(normalized),
+            token_masks=[self.build_char_masks(token) for token in tokens]
+        )
+    
+    def levenshtein_distance(self, s1, s2, max_distance=None, s2_masks=None):
         """
         Calculate the Levenshtein distance between two strings.
         Returns the minimum number of single-character edits needed to transform s1 into s2.
+        With max_distance, stops early and returns max_distance + 1 once the
+        distance is known to be larger than max_distance.
+        s2_masks are precomputed build_char_masks(s2), used by the bit-parallel backend.
         """
+        if self.distance_backend == 'bitparallel':
+            return self.bit_parallel_distance(s2, s1, max_distance, s2_masks)
+        
         if len(s1) < len(s2):
-            return self.levenshtein_distance(s2, s1)
+            return self.levenshtein_distance(s2, s1, max_distance)
+        
+        if max_distance is not None:
+            return self.bounded_levenshtein_distance(s1, s2, max_distance)
         
         if len(s2) == 0:
             return len(s1)
+        if self.instrumentation is not None:
+            self.instrumentation.count_distance(len(s1) * len(s2))
         
         # store distances
         previous_row = list(range(len(s2) + 1))
@@ -62,16 +125,135 @@ class TextProcessor:
         
         return previous_row[-1]
     
-    def levenshtein_similarity(self, s1, s2):
+    def bounded_levenshtein_distance(self, s1, s2, max_distance):
+        """
+        Levenshtein distance restricted to a diagonal band of width max_distance (Ukkonen).
+        s1 must be the longer string. Returns max_distance + 1 as soon as
+        every cell of a row is over the limit.
+        """
+        over_limit = max_distance + 1
+        len1, len2 = len(s1), len(s2)
+        
+        # The length difference alone already needs that many insertions
+        if len1 - len2 > max_distance:
+            return over_limit
+        if len2 == 0:
+            return len1
+        
+        # Cells outside the band can never lead back under the limit
+        previous_row = [j if j <= max_distance else over_limit for j in range(len2 + 1)]
+        cells = 0
+        
+        for i, c1 in enumerate(s1, 1):
+            start = max(1, i - max_distance)
+            end = min(len2, i + max_distance)
+            cells += end - start + 1
+            
+            current_row = [over_limit] * (len2 + 1)
+            current_row[0] = row_min = i if i <= max_distance else over_limit
+            
+            for j in range(start, end + 1):
+                insertions = previous_row[j] + 1
+                deletions = current_row[j - 1] + 1
+                substitutions = previous_row[j - 1] + (c1 != s2[j - 1])
+                cost = min(insertions, deletions, substitutions, over_limit)
+                current_row[j] = cost
+                if cost < row_min:
+                    row_min = cost
+            
+            # Distances never shrink from one row to the next, so give up here
+            if row_min > max_distance:
+                break
+            previous_row = current_row
+        
+        if self.instrumentation is not None:
+            self.instrumentation.count_distance(cells)
+        if row_min > max_distance:
+            return over_limit
+        return previous_row[-1]
+    
+    def build_char_masks(self, pattern):
+        """Bit mask of the positions of each character in pattern (Myers' Peq table)"""
+        masks = {}
+        bit = 1
+        for char in pattern:
+            masks[char] = masks.get(char, 0) | bit
+            bit <<= 1
+        return masks
+    
+    def bit_parallel_distance(self, pattern, text, max_distance=None, masks=None):
+        """
+        Levenshtein distance using Myers' bit-vector algorithm (Hyyro's global variant).
+        One column of the DP table is kept as bit vectors, so each character of
+        text costs a handful of integer operations instead of a row of cells.
+        Python ints are unbounded, so patterns over 64 characters work too.
+        Same max_distance contract as levenshtein_distance.
+        """
+        pattern_length, text_length = len(pattern), len(text)
+        
+        if max_distance is not None and abs(pattern_length - text_length) > max_distance:
+            return max_distance + 1
+        if pattern_length == 0:
+            return text_length
+        
+        if masks is None:
+            masks = self.build_char_masks(pattern)
+        
+        full = (1 << pattern_length) - 1
+        last_bit = 1 << (pattern_length - 1)
+        plus_vertical, minus_vertical = full, 0
+        score = pattern_length
+        remaining = text_length
+        
+        for char in text:
+            eq = masks.get(char, 0)
+            x_vertical = eq | minus_vertical
+            x_horizontal = (((eq & plus_vertical) + plus_vertical) ^ plus_vertical) | eq
+            plus_horizontal = minus_vertical | (~(x_horizontal | plus_vertical) & full)
+            minus_horizontal = plus_vertical & x_horizontal
+            
+            if plus_horizontal & last_bit:
+                score += 1
+            elif minus_horizontal & last_bit:
+                score -= 1
+            
+            # The first row of the table grows by one per column
+            plus_horizontal = ((plus_horizontal << 1) | 1) & full
+            minus_horizontal = (minus_horizontal << 1) & full
+            plus_vertical = minus_horizontal | (~(x_vertical | plus_horizontal) & full)
+            minus_vertical = plus_horizontal & x_vertical
+            
+            if max_distance is not None:
+                # The score can drop by at most one per remaining character
+                remaining -= 1
+                if score - remaining > max_distance:
+                    if self.instrumentation is not None:
+                        self.instrumentation.count_distance(pattern_length * (text_length - remaining))
+                    return max_distance + 1
+        
+        if self.instrumentation is not None:
+            self.instrumentation.count_distance(pattern_length * text_length)
+        return score
+    
+    def levenshtein_similarity(self, s1, s2, threshold=None, s2_masks=None):
         """
         Convert Levenshtein distance to a similarity score between 0 and 1.
         Higher scores indicate more similar strings.
+        With a threshold, the score is only exact when it reaches the threshold;
+        otherwise some value below the threshold is returned without finishing the DP.
         """
         max_length = max(len(s1), len(s2))
         if max_length == 0:
             return 1.0  # Both strings are empty
         
-        distance = self.levenshtein_distance(s1, s2)
+        max_distance = None
+        if threshold is not None and threshold > 0:
+            # similarity >= threshold  <=>  distance <= (1 - threshold) * max_length
+            max_distance = int((1 - min(threshold, 1.0)) * max_length + 1e-9)
+            if max_distance >= max_length:
+                max_distance = None  # the bound cannot cut anything off
+        
+        distance = self.levenshtein_distance(s1, s2, max_distance, s2_masks)
         similarity = 1 - (distance / max_length)
         return similarity
     
@@ -83,13 +265,21 @@ class TextProcessor:
         3. Token-level Levenshtein for individual words
         Returns the highest similarity score found.
         """
-        # Preprocess both texts
-        processed_input = self.preprocess(user_input)
-        processed_pattern = self.preprocess(pattern)
+        return self.compiled_similarity(self.compile(user_input), self.compile(pattern))
+    
+    def compiled_similarity(self, compiled_input, compiled_pattern, threshold=None):
+        """
+        Same as calculate_similarity, but on texts already passed through compile().
+        With a threshold, scores below it may be underestimated (they stay below it).
+        """
+        if self.instrumentation is not None:
+            self.instrumentation.count('similarity_computations')
+        processed_input = compiled_input.normalized
+        processed_pattern = compiled_pattern.normalized
         
         # Method 1: Original Jaccard similarity with stemming
-        user_tokens = set(self.tokenize_and_stem(processed_input))
-        pattern_tokens = set(self.tokenize_and_stem(processed_pattern))
+        user_tokens = compiled_input.stems
+        pattern_tokens = compiled_pattern.stems
         
         jaccard_similarity = 0
         if pattern_tokens:
@@ -98,22 +288,28 @@ class TextProcessor:
             if union:
                 jaccard_similarity = len(intersection) / len(union)
         
-        # Method 2: Direct Levenshtein similarity on full phrases
-        phrase_similarity = self.levenshtein_similarity(processed_input, processed_pattern)
-        
         # Method 3: Token-level Levenshtein similarity
         # Find best matching tokens between input and pattern
-        input_tokens = processed_input.split()
-        pattern_tokens_list = processed_pattern.split()
+        input_tokens = compiled_input.tokens
+        pattern_tokens_list = compiled_pattern.tokens
+        token_masks = compiled_pattern.token_masks
         
         token_similarities = []
-        if input_tokens and pattern_tokens_list:
+        if input_tokens and pattern_tokens_list and compiled_input.token_matches is not None:
+            avg_token_similarity = self.matched_token_similarity(
+                compiled_input, compiled_pattern, max(threshold or 0, jaccard_similarity)
+            )
+        elif input_tokens and pattern_tokens_list:
             for input_token in input_tokens:
-                best_token_match = max(
-                    (self.levenshtein_similarity(input_token, pattern_token) 
-                     for pattern_token in pattern_tokens_list),
-                    default=0
-                )
+                # Only a better token than the current best matters, so bound the DP by it
+                best_token_match = 0
+                for position, pattern_token in enumerate(pattern_tokens_list):
+                    similarity = self.levenshtein_similarity(
+                        input_token, pattern_token, best_token_match,
+                        token_masks[position] if token_masks else None
+                    )
+                    if similarity > best_token_match:
+                        best_token_match = similarity
                 token_similarities.append(best_token_match)
             
             # Average of best token matches
@@ -121,9 +317,67 @@ class TextProcessor:
         else:
             avg_token_similarity = 0
         
+        # Method 2: Direct Levenshtein similarity on full phrases
+        # It only changes the result if it beats the threshold and the other two scores
+        phrase_threshold = max(threshold or 0, jaccard_similarity, avg_token_similarity)
+        phrase_similarity = self.levenshtein_similarity(
+            processed_input, processed_pattern, phrase_threshold, compiled_pattern.masks
+        )
+        
         # Return the highest similarity score from all methods
         return max(jaccard_similarity, phrase_similarity, avg_token_similarity)
     
+    def matched_token_similarity(self, compiled_input, compiled_pattern, threshold):
+        """
+        Token-level score (Method 3) using the per-message TokenMatches of the input.
+        Similarities are looked up or computed once per vocabulary token and kept,
+        so every other pattern using the same token gets them for free.
+        If even the ceilings cannot reach threshold, returns 0 without computing anything.
+        """
+        pattern_tokens = compiled_pattern.tokens
+        token_masks = compiled_pattern.token_masks
+        
+        # First pass: dictionary lookups only
+        known_best = []
+        unknown_positions = []
+        upper_bound_total = 0
+        for matches in compiled_input.token_matches:
+            similarities = matches.similarities
+            best = 0
+            unknown = []
+            for position, pattern_token in enumerate(pattern_tokens):
+                similarity = similarities.get(pattern_token)
+                if similarity is None:
+                    unknown.append(position)
+                elif similarity > best:
+                    best = similarity
+            if matches.ceiling <= best:
+                unknown = []  # nothing unknown can beat what we already have
+            known_best.append(best)
+            unknown_positions.append(unknown)
+            upper_bound_total += matches.ceiling if unknown else best
+        
+        if threshold > 0 and upper_bound_total / len(known_best) < threshold:
+            return 0
+        
+        # Second pass: compute (and remember) the similarities that could still matter
+        token_similarities = []
+        for input_token, matches, best, unknown in zip(
+                compiled_input.tokens, compiled_input.token_matches, known_best, unknown_positions):
+            for position in unknown:
+                pattern_token = pattern_tokens[position]
+                similarity = matches.similarities.get(pattern_token)
+                if similarity is None:
+                    similarity = self.levenshtein_similarity(
+                        input_token, pattern_token, None, token_masks[position] if token_masks else None
+                    )
+                    matches.similarities[pattern_token] = similarity
+                if similarity > best:
+                    best = similarity
+            token_similarities.append(best)
+        
+        return sum(token_similarities) / len(token_similarities)
+    
     def find_closest_matches(self, user_input, patterns, threshold=0.3, top_n=3):
         """
         Find the closest matching patterns using Levenshtein distance.
@@ -131,9 +385,16 @@ class TextProcessor:
         Always returns float scores, never tuples.
         """
         matches = []
+        compiled_input = self.compile(user_input)
+        
+        if self.batch_scoring:
+            scores = self.batch_similarity(compiled_input, patterns)
+            matches = [(pattern, score) for pattern, score in zip(patterns, scores) if score >= threshold]
+            matches.sort(key=lambda x: x[1], reverse=True)
+            return matches[:top_n]
         
         for pattern in patterns:
-            similarity = self.calculate_similarity(user_input, pattern)
+            similarity = self.compiled_similarity(compiled_input, self.compile(pattern), threshold)
             # Ensure similarity is always a float
             if isinstance(similarity, (int, float)) and similarity >= threshold:
                 matches.append((pattern, float(similarity)))
@@ -142,6 +403,22 @@ class TextProcessor:
         matches.sort(key=lambda x: x[1], reverse=True)
         return matches[:top_n]
     
+    def batch_similarity(self, user_input, patterns):
+        """
+        calculate_similarity of one input against a list of patterns, vectorized with NumPy.
+        Accepts raw strings or compile() results; returns a list of float scores.
+        """
+        from .batch_scorer import BatchScorer
+        
+        compiled_input = user_input if isinstance(user_input, CompiledText) else self.compile(user_input)
+        compiled_patterns = [
+            pattern if isinstance(pattern, CompiledText) else self.compile(pattern)
+            for pattern in patterns
+        ]
+        if not compiled_patterns:
+            return []
+        return BatchScorer(compiled_patterns).scores(compiled_input).tolist()
+    
     def fuzzy_match(self, user_input, target_phrases, threshold=0.6):
         """
         Perform fuzzy matching using Levenshtein distance.
@@ -155,7 +432,9 @@ class TextProcessor:
         
         for phrase in target_phrases:
             processed_phrase = self.preprocess(phrase)
-            similarity = self.levenshtein_similarity(processed_input, processed_phrase)
+            similarity = self.levenshtein_similarity(
+                processed_input, processed_phrase, max(threshold, best_score)
+            )
             
             # Ensure similarity is a float
             similarity = float(similarity) if isinstance(similarity, (int, float)) else 0.0
@@ -0,0 +1,170 @@
+import functools
+import os
+import re
+
+from .text_processor import TextProcessor
+
+COMMON_WORDS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'common_words.txt')
+
+# Whitespace-separated words of a message, and what preprocess() strips from them
+WORD = re.compile(r'\S+')
+PUNCTUATION = re.compile(r'[^\w\s]')
+# A word's leading punctuation, the word itself and its trailing punctuation
+AFFIXES = re.compile(r'([^\w\s]*)(.*?)([^\w\s]*)', re.DOTALL)
+
+
+@functools.lru_cache(maxsize=None)
+def load_common_words(path=COMMON_WORDS_FILE):
+    """Everyday English words (one per line, lowercase, no apostrophes) that are never typos"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return frozenset(line.strip() for line in f if line.strip())
+
+
+class TypoCorrector:
+    """
+    Symmetric delete spelling correction (SymSpell).
+    Every vocabulary word is stored under all the strings reachable from it by
+    up to max_edit_distance deletions. Two words within edit distance d always
+    share such a delete, so a lookup only has to generate the deletes of the
+    input and verify the few words filed under them.
+    Words in the vocabulary or in known_words (correctly spelled words that are
+    no suggestion themselves, e.g. load_common_words()) are never corrected.
+    """
+    def __init__(self, words=(), max_edit_distance=2, text_processor=None, known_words=()):
+        self.max_edit_distance = max_edit_distance
+        self.text_processor = text_processor or TextProcessor()
+        self.known_words = frozenset(known_words)
+        self.word_counts = {}   # word -> how often it was added (ties go to the more common word)
+        self.word_ranks = {}    # word -> insertion order (then to the word added first)
+        self.deletes = {}       # delete variant -> words it came from
+
+        for word in words:
+            self.add_word(word)
+
+    def generate_deletes(self, word, max_edit_distance):
+        """All strings reachable from word by up to max_edit_distance deletions (word included)"""
+        deletes = {word}
+        frontier = {word}
+        for _ in range(max_edit_distance):
+            next_frontier = set()
+            for variant in frontier:
+                for i in range(len(variant)):
+                    next_frontier.add(variant[:i] + variant[i + 1:])
+            next_frontier -= deletes
+            deletes |= next_frontier
+            frontier = next_frontier
+        return deletes
+
+    def add_word(self, word):
+        if word in self.word_counts:
+            self.word_counts[word] += 1
+            return
+        self.word_counts[word] = 1
+        self.word_ranks[word] = len(self.word_ranks)
+        for variant in self.generate_deletes(word, self.max_edit_distance):
+            self.deletes.setdefault(variant, []).append(word)
+
+    def rebuilt(self, words):
+        """
+        A corrector like this one over words, the way TypoCorrector(words) would
+        build it, except that only the deletes of words added or dropped are
+        generated: the other delete lists are shared. This corrector is left as it is.
+        """
+        corrector = TypoCorrector((), self.max_edit_distance, self.text_processor, self.known_words)
+        for word in words:
+            if word in corrector.word_counts:
+                corrector.word_counts[word] += 1
+            else:
+                corrector.word_counts[word] = 1
+                corrector.word_ranks[word] = len(corrector.word_ranks)
+
+        deletes = corrector.deletes = dict(self.deletes)
+        copied = set()  # variants whose list belongs to the new corrector
+        for word in self.word_counts:
+            if word not in corrector.word_counts:
+                for variant in self.generate_deletes(word, self.max_edit_distance):
+                    remaining = [other for other in deletes[variant] if other != word]
+                    if remaining:
+                        deletes[variant] = remaining
+                        copied.add(variant)
+                    else:
+                        del deletes[variant]
+        for word in corrector.word_counts:
+            if word not in self.word_counts:
+                for variant in self.generate_deletes(word, self.max_edit_distance):
+                    candidates = deletes.get(variant)
+                    if candidates is None or variant not in copied:
+                        candidates = deletes[variant] = list(candidates or ())
+                        copied.add(variant)
+                    candidates.append(word)
+        return corrector
+
+    def is_known(self, word):
+        return word in self.word_counts or word in self.known_words
+
+    def max_distance_for(self, word):
+        """
+        Short words get less slack: one edit turns most four-letter words into
+        another word ('have' -> 'hate', 'mind' -> 'mid'), so only four-letter
+        words that aren't real words get one edit ('helo' -> 'hello'), and
+        shorter ones none
+        """
+        if len(word) < 4 or (len(word) == 4 and self.is_known(word)):
+            return 0
+        if len(word) <= 6:
+            return min(1, self.max_edit_distance)
+        return self.max_edit_distance
+
+    def lookup(self, word, max_edit_distance=None, accept=None):
+        """
+        Find the closest vocabulary word within max_edit_distance.
+        accept optionally restricts suggestions to a set of words.
+        Returns: (suggestion, distance) or (None, None)
+        """
+        if max_edit_distance is None:
+            max_edit_distance = self.max_distance_for(word)
+        max_edit_distance = min(max_edit_distance, self.max_edit_distance)
+
+        if self.is_known(word):
+            # A real word is no typo, even if accept rules it out ('fine' is not a misspelled 'fire')
+            return (word, 0) if accept is None or word in accept else (None, None)
+
+        best_word, best_key = None, None
+        checked = set()
+        for variant in self.generate_deletes(word, max_edit_distance):
+            for candidate in self.deletes.get(variant, ()):
+                if candidate in checked or (accept is not None and candidate not in accept):
+                    continue
+                checked.add(candidate)
+
+                distance = self.text_processor.levenshtein_distance(word, candidate, max_edit_distance)
+                if distance > max_edit_distance:
+                    continue
+                key = (distance, -self.word_counts[candidate], self.word_ranks[candidate])
+                if best_key is None or key < best_key:
+                    best_word, best_key = candidate, key
+
+        return (best_word, best_key[0]) if best_word else (None, None)
+
+    def correct_word(self, match):
+        word = PUNCTUATION.sub('', match.group().lower())
+        suggestion, _ = self.lookup(word) if word else (None, None)
+        if suggestion is None or suggestion == word:
+            return match.group()
+
+        leading, written, trailing = AFFIXES.fullmatch(match.group()).groups()
+        if len(written) > 1 and written.isupper():
+            suggestion = suggestion.upper()
+        elif written[:1].isupper():
+            suggestion = suggestion[:1].upper() + suggestion[1:]
+        return leading + suggestion + trailing
+
+    def correct_text(self, text):
+        """
+        Replace each misspelled word of text with its closest vocabulary word.
+        Words are looked up lowercased without punctuation, as preprocess() leaves
+        them. A correction keeps the punctuation around the word and its
+        capitalisation ('Helloo!' -> 'Hello!', 'SLAYY' -> 'SLAY'); everything
+        else comes back exactly as written.
+        """
+        return WORD.sub(self.correct_word, text)
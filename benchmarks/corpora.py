@@ -0,0 +1,63 @@
+import json
+import random
+
+SLANG = ['no cap', 'fr', 'lowkey', 'bussin', 'slay', 'mid', 'sus', 'periodt', 'hits different', 'goes hard']
+EMOJIS = ['🔥', '✨', '💯', '😭', '💀', '😊', '🙄', '❤️']
+FILLERS = ['hey', 'so', 'like', 'ok', 'bro', 'tbh', 'honestly', 'wait']
+
+
+def conversation_log_messages(path):
+    """user_input of every exchange in a conversation_memory.json file"""
+    with open(path, 'r', encoding='utf-8') as f:
+        memory = json.load(f)
+    return [entry['user_input'] for entry in memory.get('conversations', []) if entry.get('user_input')]
+
+
+def jsonl_messages(path):
+    """user_input of each JSON line; lines without one (e.g. request logs) give their title and body"""
+    messages = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if 'user_input' in record:
+                messages.append(record['user_input'])
+            else:
+                messages.extend(str(record[key]) for key in ('title', 'body') if record.get(key))
+    return messages
+
+
+def add_typo(word, rng):
+    """Drop, double or swap one character"""
+    if len(word) < 3:
+        return word
+    i = rng.randrange(len(word) - 1)
+    kind = rng.randrange(3)
+    if kind == 0:
+        return word[:i] + word[i + 1:]
+    if kind == 1:
+        return word[:i] + word[i] + word[i:]
+    return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+
+
+def synthetic_messages(data, count, seed=0, typo_rate=0.15):
+    """
+    Messages shaped like real traffic: intent patterns with typos, slang,
+    fillers and emoji mixed in. The same seed always gives the same corpus.
+    """
+    rng = random.Random(seed)
+    patterns = [pattern for intent in data.values() for pattern in intent.get('patterns', [])]
+    messages = []
+    for _ in range(count):
+        words = rng.choice(patterns).split()
+        words = [add_typo(word, rng) if rng.random() < typo_rate else word for word in words]
+        if rng.random() < 0.3:
+            words.insert(0, rng.choice(FILLERS))
+        if rng.random() < 0.3:
+            words.append(rng.choice(SLANG))
+        if rng.random() < 0.2:
+            words.append(rng.choice(EMOJIS))
+        message = ' '.join(words)
+        messages.append(message.capitalize() if rng.random() < 0.3 else message)
+    return messages
@@ -0,0 +1,94 @@
+import json
+import random
+
+from .corpora import SLANG, add_typo
+
+TOPIC_WORDS = [
+    'music', 'movie', 'game', 'song', 'food', 'pizza', 'coffee', 'school', 'class', 'exam', 'work', 'job',
+    'weekend', 'party', 'friend', 'sister', 'brother', 'mom', 'dad', 'cat', 'dog', 'weather', 'rain',
+    'summer', 'trip', 'beach', 'phone', 'laptop', 'outfit', 'shoes', 'show', 'episode', 'book', 'gym',
+    'sleep', 'dinner', 'lunch', 'breakfast', 'concert', 'team', 'match', 'city', 'bus', 'train', 'money'
+]
+VERBS = ['like', 'love', 'hate', 'want', 'need', 'watch', 'play', 'eat', 'buy', 'miss', 'try', 'find',
+         'see', 'get', 'make', 'know', 'tell', 'recommend', 'plan', 'book']
+FRAMES = [
+    '{verb} {topic}', 'i {verb} {topic}', 'do you {verb} {topic}', 'can you {verb} a {topic}',
+    'what {topic} should i {verb}', 'tell me about {topic}', '{topic}', 'my {topic} is {slang}',
+    'that {topic} was {slang}', 'where can i {verb} {topic}', 'any {topic} ideas', '{slang} {topic}',
+    'how do i {verb} my {topic} with the {topic2}', 'best {topic} for a {topic2}'
+]
+CONSONANTS = 'bcdfghjklmnprstvwz'
+VOWELS = 'aeiou'
+
+
+def pseudo_word(rng):
+    """Pronounceable made-up word, so big corpora get a vocabulary that grows like a real one"""
+    return ''.join(rng.choice(CONSONANTS) + rng.choice(VOWELS) for _ in range(rng.randint(2, 4)))
+
+
+def generate_pattern(rng, topics, typo_rate):
+    frame = rng.choice(FRAMES)
+    pattern = frame.format(
+        verb=rng.choice(VERBS), topic=rng.choice(topics), topic2=rng.choice(topics), slang=rng.choice(SLANG)
+    )
+    words = [add_typo(word, rng) if rng.random() < typo_rate else word for word in pattern.split()]
+    return ' '.join(words)
+
+
+def generate_intents(pattern_count, patterns_per_intent=8, seed=0, typo_rate=0.05, base_data=None):
+    """
+    Intent data in chatbot_data.json format with pattern_count generated patterns
+    (plus base_data's, if given). Each intent draws from its own handful of topic
+    words, half of them made up, so intents stay distinguishable as the corpus grows.
+    The same arguments always give the same corpus.
+    """
+    rng = random.Random(seed)
+    data = dict(base_data or {})
+    intent_number = 0
+    remaining = pattern_count
+    while remaining > 0:
+        topics = rng.sample(TOPIC_WORDS, 2) + [pseudo_word(rng) for _ in range(2)]
+        count = min(remaining, rng.randint(max(1, patterns_per_intent // 2), patterns_per_intent * 3 // 2))
+        patterns = list(dict.fromkeys(generate_pattern(rng, topics, typo_rate) for _ in range(count)))
+        name = f"synthetic_{intent_number}_{topics[0]}"
+        data[name] = {
+            "patterns": patterns,
+            "responses": [f"Let's talk about {topics[0]}!", f"Ooh, {topics[1]}? Tell me more!"]
+        }
+        intent_number += 1
+        remaining -= count
+    return data
+
+
+def write_intents(path, data):
+    """One intent per line, so a million patterns never sit in one giant string"""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('{\n')
+        for i, (name, intent) in enumerate(data.items()):
+            f.write(('  ' if i == 0 else ',\n  ') + json.dumps(name) + ': ' + json.dumps(intent))
+        f.write('\n}\n')
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Generate a synthetic intent file in chatbot_data.json format")
+    parser.add_argument('output')
+    parser.add_argument('--patterns', type=int, default=10000, help="how many patterns to generate")
+    parser.add_argument('--patterns-per-intent', type=int, default=8)
+    parser.add_argument('--typo-rate', type=float, default=0.05)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--base', help="intent file to extend, e.g. ChatBot/data/chatbot_data.json")
+    args = parser.parse_args(argv)
+
+    base_data = None
+    if args.base:
+        with open(args.base, 'r', encoding='utf-8') as f:
+            base_data = json.load(f)
+    data = generate_intents(args.patterns, args.patterns_per_intent, args.seed, args.typo_rate, base_data)
+    write_intents(args.output, data)
+    print(f"Wrote {len(data)} intents to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,204 @@
+import contextlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+from ChatBot.chatbot import MeowBot
+from ChatBot.data_manager import DataManager
+from ChatBot.sentiment_analyzer import GenZSentimentAnalyzer
+from ChatBot.text_processor import TextProcessor
+from .corpora import conversation_log_messages, jsonl_messages, synthetic_messages
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_FILE = os.path.join(ROOT, 'ChatBot', 'data', 'chatbot_data.json')
+MEMORY_FILE = os.path.join(ROOT, 'ChatBot', 'data', 'conversation_memory.json')
+REQUESTS_FILE = os.path.join(ROOT, 'requests.jsonl')
+
+TARGETS = ('get_response', 'calculate_similarity', 'analyze_sentiment')
+
+
+def percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+def summarize(latencies, total_seconds, peak_bytes):
+    latencies = sorted(latencies)
+    return {
+        'messages': len(latencies),
+        'seconds': round(total_seconds, 4),
+        'messages_per_second': round(len(latencies) / total_seconds, 1) if total_seconds else 0.0,
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 4),
+        'p90_ms': round(percentile(latencies, 0.90) * 1000, 4),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 4),
+        'max_ms': round(latencies[-1] * 1000, 4),
+        'peak_memory_kb': round(peak_bytes / 1024, 1)
+    }
+
+
+def run_target(call, messages, warmup, memory_sample):
+    """
+    Time call(index, message) for every message, then replay the first
+    memory_sample of them under tracemalloc for peak memory (tracing is slow,
+    so the timings come from the untraced pass).
+    """
+    for index, message in enumerate(messages[:warmup]):
+        call(index, message)
+
+    latencies = []
+    start = time.perf_counter()
+    for index, message in enumerate(messages):
+        call_start = time.perf_counter()
+        call(index, message)
+        latencies.append(time.perf_counter() - call_start)
+    total_seconds = time.perf_counter() - start
+
+    peak_bytes = 0
+    if memory_sample:
+        tracemalloc.start()
+        try:
+            for index, message in enumerate(messages[:memory_sample]):
+                call(index, message)
+            _, peak_bytes = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    return summarize(latencies, total_seconds, peak_bytes)
+
+
+def benchmark_source(messages, data, options, workdir):
+    """Replay one corpus through every target; returns {target: summary}"""
+    results = {}
+    messages = [message for message in messages if message.strip()]
+    if not messages:
+        return results
+
+    if 'get_response' in options.targets:
+        # Conversation memory goes to a scratch file so the shipped one is never touched
+        data_manager = DataManager(options.data_file, os.path.join(workdir, 'memory.json'))
+        bot = MeowBot(options.data_file, options.distance_backend, batch_scoring=options.batch_scoring,
+                      data_manager=data_manager)
+        with open(os.devnull, 'w', encoding='utf-8') as devnull, contextlib.redirect_stdout(devnull):
+            results['get_response'] = run_target(
+                lambda index, message: bot.get_response(message), messages, options.warmup, options.memory_sample
+            )
+        data_manager.close()
+
+    if 'calculate_similarity' in options.targets:
+        text_processor = TextProcessor(options.distance_backend)
+        patterns = [pattern for intent in data.values() for pattern in intent.get('patterns', [])]
+        # Each message is scored against one pattern, cycling through all of them
+        results['calculate_similarity'] = run_target(
+            lambda index, message: text_processor.calculate_similarity(message, patterns[index % len(patterns)]),
+            messages, options.warmup, options.memory_sample
+        )
+
+    if 'analyze_sentiment' in options.targets:
+        analyzer = GenZSentimentAnalyzer()
+        results['analyze_sentiment'] = run_target(
+            lambda index, message: analyzer.analyze_sentiment(message), messages, options.warmup, options.memory_sample
+        )
+
+    return results
+
+
+def load_sources(data, options):
+    """{source name: messages}; missing files are skipped"""
+    sources = {}
+    if options.conversations and os.path.exists(options.conversations):
+        sources['conversation_memory'] = conversation_log_messages(options.conversations)
+    if options.requests and os.path.exists(options.requests):
+        sources['requests'] = jsonl_messages(options.requests)
+    if options.synthetic:
+        sources['synthetic'] = synthetic_messages(data, options.synthetic, seed=options.seed)
+    return sources
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(baseline, current):
+    """Lines showing how throughput and tail latency moved since a baseline report"""
+    lines = []
+    for source, targets in current['results'].items():
+        for target, summary in targets.items():
+            before = baseline.get('results', {}).get(source, {}).get(target)
+            if not before or not before['messages_per_second']:
+                continue
+            speedup = summary['messages_per_second'] / before['messages_per_second']
+            lines.append(
+                f"{source:20} {target:22} {speedup:6.2f}x throughput   "
+                f"p99 {before['p99_ms']:.3f} -> {summary['p99_ms']:.3f} ms"
+            )
+    return lines
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Replay logged and synthetic messages through MeowBot and report throughput, "
+                    "latency percentiles and peak memory as JSON"
+    )
+    parser.add_argument('--data-file', default=DATA_FILE)
+    parser.add_argument('--conversations', default=MEMORY_FILE, help="conversation_memory.json to replay")
+    parser.add_argument('--requests', default=REQUESTS_FILE, help="JSON lines file to replay")
+    parser.add_argument('--synthetic', type=int, default=2000, help="synthetic messages to generate (0 for none)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--targets', nargs='+', choices=TARGETS, default=list(TARGETS))
+    parser.add_argument('--distance-backend', choices=('dp', 'bitparallel'), default='bitparallel')
+    parser.add_argument('--batch-scoring', action='store_true')
+    parser.add_argument('--warmup', type=int, default=20, help="messages replayed untimed first")
+    parser.add_argument('--memory-sample', type=int, default=200,
+                        help="messages replayed under tracemalloc for peak memory (0 to skip)")
+    parser.add_argument('--output', help="write the JSON report here instead of stdout")
+    parser.add_argument('--compare', help="earlier JSON report to compare against")
+    options = parser.parse_args(argv)
+
+    with open(options.data_file, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(),
+            'revision': git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'distance_backend': options.distance_backend,
+            'batch_scoring': options.batch_scoring,
+            'patterns': sum(len(intent.get('patterns', [])) for intent in data.values())
+        },
+        'results': {}
+    }
+
+    with tempfile.TemporaryDirectory() as workdir:
+        for source, messages in load_sources(data, options).items():
+            report['results'][source] = benchmark_source(messages, data, options, workdir)
+
+    text = json.dumps(report, indent=2)
+    if options.output:
+        with open(options.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+
+    if options.compare:
+        with open(options.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        print('\n'.join(compare(baseline, report)), file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
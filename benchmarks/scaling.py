@@ -0,0 +1,101 @@
+import contextlib
+import json
+import os
+import sys
+import tempfile
+import time
+
+from ChatBot.chatbot import MeowBot
+from ChatBot.data_manager import DataManager
+from .corpora import synthetic_messages
+from .generate_intents import generate_intents, write_intents
+from .replay import DATA_FILE, git_revision, run_target
+
+PLOT_WIDTH = 50
+
+
+def measure_size(pattern_count, base_data, options, workdir):
+    """Build a bot over pattern_count generated patterns and time get_response on it"""
+    data = generate_intents(pattern_count, seed=options.seed, base_data=base_data)
+    data_file = os.path.join(workdir, f'intents_{pattern_count}.json')
+    write_intents(data_file, data)
+
+    data_manager = DataManager(data_file, os.path.join(workdir, f'memory_{pattern_count}.json'))
+    start = time.perf_counter()
+    bot = MeowBot(data_file, options.distance_backend, batch_scoring=options.batch_scoring,
+                  data_manager=data_manager)
+    build_seconds = time.perf_counter() - start
+
+    # Messages come from the generated patterns, so most of them have a real match
+    messages = synthetic_messages(data, options.messages, seed=options.seed)
+    with open(os.devnull, 'w', encoding='utf-8') as devnull, contextlib.redirect_stdout(devnull):
+        summary = run_target(lambda index, message: bot.get_response(message),
+                             messages, options.warmup, options.memory_sample)
+    data_manager.close()
+    os.remove(data_file)
+
+    summary['patterns'] = sum(len(intent.get('patterns', [])) for intent in data.values())
+    summary['intents'] = len(data)
+    summary['build_seconds'] = round(build_seconds, 3)
+    return summary
+
+
+def ascii_plot(results):
+    """Horizontal bars of p50 (=) and p99 (-) latency per corpus size"""
+    longest = max(result['p99_ms'] for result in results) or 1.0
+    lines = [f"{'patterns':>9} | get_response latency (= p50, - p99, {longest:.2f} ms full width)"]
+    for result in results:
+        p50 = round(result['p50_ms'] / longest * PLOT_WIDTH)
+        p99 = round(result['p99_ms'] / longest * PLOT_WIDTH)
+        bar = '=' * p50 + '-' * (p99 - p50)
+        lines.append(f"{result['patterns']:>9} | {bar:<{PLOT_WIDTH}} {result['p50_ms']:.2f} / {result['p99_ms']:.2f} ms")
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Plot get_response latency against intent corpus size, using generated corpora"
+    )
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000],
+                        help="generated pattern counts to measure (up to 1M)")
+    parser.add_argument('--messages', type=int, default=200, help="messages replayed per size")
+    parser.add_argument('--base', default=DATA_FILE, help="intent file the generated intents are added to")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--distance-backend', choices=('dp', 'bitparallel'), default='bitparallel')
+    parser.add_argument('--batch-scoring', action='store_true')
+    parser.add_argument('--warmup', type=int, default=10)
+    parser.add_argument('--memory-sample', type=int, default=0,
+                        help="messages replayed under tracemalloc for peak memory (0 to skip)")
+    parser.add_argument('--output', help="write the JSON report here")
+    options = parser.parse_args(argv)
+
+    base_data = None
+    if options.base:
+        with open(options.base, 'r', encoding='utf-8') as f:
+            base_data = json.load(f)
+
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in sorted(options.sizes):
+            results.append(measure_size(size, base_data, options, workdir))
+            print(f"{results[-1]['patterns']} patterns: p50 {results[-1]['p50_ms']:.2f} ms", file=sys.stderr)
+
+    report = {
+        'meta': {
+            'revision': git_revision(),
+            'distance_backend': options.distance_backend,
+            'batch_scoring': options.batch_scoring,
+            'messages_per_size': options.messages
+        },
+        'results': results
+    }
+    if options.output:
+        with open(options.output, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(report, indent=2) + '\n')
+    print(ascii_plot(results))
+
+
+if __name__ == '__main__':
+    main()
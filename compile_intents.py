@@ -0,0 +1,4 @@
+from ChatBot.compiled_index import main
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,6 @@
 from ChatBot import MeowBot
+from ChatBot.instrumentation import Instrumentation
+from config import CHATBOT_CONFIG
 import sys
 
 def main():
@@ -7,8 +9,14 @@ def main():
         
     print("🚀 Starting MeowBot...")
     
-    chatbot = MeowBot()
+    # Per-stage timings go to the log file when logging is on ('perf stats' shows them)
+    instrumentation = None
+    if CHATBOT_CONFIG['enable_logging']:
+        instrumentation = Instrumentation(CHATBOT_CONFIG['log_file'])
+    
+    chatbot = MeowBot(instrumentation=instrumentation)
     chatbot.chat()
+    chatbot.instrumentation.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,12 @@
+from ChatBot.server import main
+from config import CHATBOT_CONFIG
+import sys
+
+if __name__ == "__main__":
+    if hasattr(sys.stdout, "reconfigure"):
+        sys.stdout.reconfigure(encoding='utf-8')
+
+    argv = sys.argv[1:]
+    if CHATBOT_CONFIG['enable_logging'] and '--log-file' not in argv:
+        argv += ['--log-file', CHATBOT_CONFIG['log_file']]
+    main(argv)
@@ -0,0 +1,25 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from ChatBot.chatbot import MeowBot  # noqa: E402
+from ChatBot.data_manager import DataManager  # noqa: E402
+
+
+@pytest.fixture(scope='session')
+def data_file():
+    return os.path.join(ROOT, 'ChatBot', 'data', 'chatbot_data.json')
+
+
+@pytest.fixture(scope='session')
+def bot(data_file, tmp_path_factory):
+    """A MeowBot over the shipped intents that keeps its memory in a temporary directory"""
+    memory_file = tmp_path_factory.mktemp('memory') / 'conversation_memory.json'
+    data_manager = DataManager(data_file, str(memory_file))
+    bot = MeowBot(data_file, start_session=False, data_manager=data_manager, reload_interval=None)
+    yield bot
+    data_manager.close()
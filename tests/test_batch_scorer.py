@@ -0,0 +1,48 @@
+import json
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from ChatBot.batch_scorer import BatchScorer, batch_levenshtein_distance, encode_strings  # noqa: E402
+from ChatBot.intent_index import IntentIndex  # noqa: E402
+from ChatBot.text_processor import TextProcessor  # noqa: E402
+
+MESSAGES = ['hello there', 'helo', 'how r u doing', 'tell me a jok', 'thats so mid', 'what is your name',
+            'im lowkey bored rn', 'no cap that slaps', 'bye', '🔥🔥', '']
+
+
+@pytest.fixture(scope='module')
+def data(data_file):
+    with open(data_file, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def test_batch_distance_matches_scalar():
+    text_processor = TextProcessor()
+    targets = ['', 'a', 'kitten', 'sitting', 'ñandú', 'levenshtein', 'frankenstein', 'aaaaaaaaaaaaaaaa']
+    codes, lengths = encode_strings(targets)
+    for text in targets + ['sittin', 'meilenstein']:
+        distances = batch_levenshtein_distance(text, codes, lengths).tolist()
+        assert distances == [text_processor.levenshtein_distance(text, target) for target in targets]
+
+
+def test_batch_scores_match_scalar_scores(data):
+    text_processor = TextProcessor()
+    index = IntentIndex(data, text_processor)
+    scorer = BatchScorer(index.entries)
+    for message in MESSAGES:
+        compiled_input = text_processor.compile(message)
+        expected = [text_processor.compiled_similarity(compiled_input, entry) for entry in index.entries]
+        assert scorer.scores(compiled_input).tolist() == expected
+        rows = list(range(0, len(index.entries), 3))
+        assert scorer.scores(compiled_input, rows).tolist() == [expected[row] for row in rows]
+
+
+def test_batch_index_answers_like_the_scalar_index(data):
+    scalar = IntentIndex(data, TextProcessor())
+    batch = IntentIndex(data, TextProcessor(batch_scoring=True))
+    for message in MESSAGES:
+        assert batch.find_best_match(message, threshold=0.2) == scalar.find_best_match(message, threshold=0.2)
+        assert batch.find_closest_matches(message, threshold=0.15, top_n=2) == \
+            scalar.find_closest_matches(message, threshold=0.15, top_n=2)
@@ -0,0 +1,36 @@
+import random
+
+from ChatBot.bk_tree import BKTree
+from ChatBot.text_processor import TextProcessor
+
+distance = TextProcessor().levenshtein_distance
+
+
+def brute_force(words, word, max_distance):
+    return sorted((distance(word, other), other) for other in set(words) if distance(word, other) <= max_distance)
+
+
+def random_words(rng, count):
+    return [''.join(rng.choice('abcdef') for _ in range(rng.randint(1, 8))) for _ in range(count)]
+
+
+def test_search_matches_brute_force():
+    rng = random.Random(0)
+    words = random_words(rng, 400)
+    tree = BKTree(distance, words)
+    assert len(tree) == len(set(words))
+    for word in random_words(rng, 50) + words[:10]:
+        for max_distance in range(4):
+            assert sorted(tree.search(word, max_distance)) == brute_force(words, word, max_distance)
+
+
+def test_extended_tree_shares_without_changing_the_original():
+    rng = random.Random(1)
+    words, added = random_words(rng, 200), random_words(rng, 100)
+    tree = BKTree(distance, words)
+    extended = tree.extended(added)
+
+    assert len(extended) == len(set(words + added))
+    for word in random_words(rng, 30):
+        assert sorted(tree.search(word, 2)) == brute_force(words, word, 2)
+        assert sorted(extended.search(word, 2)) == brute_force(words + added, word, 2)
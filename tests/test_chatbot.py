@@ -0,0 +1,39 @@
+from ChatBot.data_manager import DataManager
+
+
+def test_repeated_messages_get_their_own_results(bot):
+    results = bot.get_responses(['no cap this is bussin', 'no cap this is bussin', 'my name is Sam', 'my name is Sam'],
+                                session=0)
+    assert results[0]['sentiment'] == results[1]['sentiment']
+    results[0]['sentiment']['words_found'].clear()
+    results[2]['context_update']['name'] = 'Alex'
+    assert results[1]['sentiment']['words_found']
+    assert results[3]['context_update'] == {'name': 'Sam'}
+    assert bot.analyze_sentiment('no cap this is bussin')['words_found']
+
+
+def test_name_introduction_is_answered_before_sentiment(bot):
+    analysis = bot.analyze_message('my name is Sam')
+    assert analysis['introduced_name'] == 'Sam'
+    assert analysis['sentiment'] is None
+    assert bot.build_response('my name is Sam', analysis, {}, [])['response'] == 'Hey there, Sam!'
+
+
+def test_get_responses_writes_memory_once(bot, data_file, tmp_path, monkeypatch):
+    data_manager = DataManager(data_file, str(tmp_path / 'memory.json'), flush_interval=None)
+    monkeypatch.setattr(bot, 'data_manager', data_manager)
+    writes = []
+    write = data_manager.storage.write
+    monkeypatch.setattr(data_manager.storage, 'write', lambda records, snapshot: writes.append(records) or
+                        write(records, snapshot))
+
+    messages = ['hello', 'my name is Sam', 'no cap this is bussin', '', 'hello']
+    results = bot.get_responses(messages, session=0)
+    data_manager.close()
+
+    assert len(writes) == 1
+    assert [result['user_input'] for result in results] == messages
+    reloaded = DataManager(data_file, str(tmp_path / 'memory.json'))
+    stored = reloaded.get_recent_conversations(10)
+    reloaded.close()
+    assert [conversation['user_input'] for conversation in stored] == [m for m in messages if m]
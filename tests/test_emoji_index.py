@@ -0,0 +1,35 @@
+import pytest
+
+from ChatBot.emoji_index import EmojiIndex
+
+LEXICON = {'❤️': 0.8, '🔥': 0.8, '😂': 0.8, '💀': 0.2, '😢': -0.7, '👍': 0.5}
+
+
+@pytest.fixture
+def index():
+    return EmojiIndex(LEXICON)
+
+
+def test_ascii_text_scores_nothing(index):
+    assert index.score('no emoji here :) <3') == 0
+
+
+def test_multi_codepoint_emoji_match_their_entry(index):
+    assert index.score('love it ❤️') == pytest.approx(0.8)
+    assert index.score('love it ❤') == pytest.approx(0.8)       # without the presentation selector
+    assert index.score('nice 👍🏽') == pytest.approx(0.5)       # skin tone
+    assert index.score('🔥🔥 and 😢') == pytest.approx(0.9)
+
+
+def test_unknown_sequences_score_their_known_parts(index):
+    assert index.score('😂‍🔥') == pytest.approx(1.6)
+    assert index.score('🇫🇷 ñandú') == 0
+
+
+def test_repeated_runs_are_cached(index):
+    index.score('so good 🔥✨')
+    assert index.run_scores == {'🔥✨': pytest.approx(0.8)}
+    small = EmojiIndex(LEXICON, cache_size=2)
+    for text in ('🔥', '😂', '💀', '😢'):
+        small.score(text)
+    assert len(small.run_scores) <= 2
@@ -0,0 +1,38 @@
+import itertools
+
+from ChatBot.evaluator import ParallelEvaluator, evaluate_message
+
+
+MESSAGES = ['hello', 'helo there', 'what is your name', 'this is bussin fr', 'i hate mondays',
+            '', 'hello', 'tell me a joke', 'that is mid ngl', 'bye']
+
+
+def test_parallel_results_match_the_serial_bot(bot, data_file, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # the workers' bots keep their default memory file here
+    with ParallelEvaluator(data_file, processes=2, chunk_size=3) as evaluator:
+        results = list(evaluator.evaluate(MESSAGES))
+
+    assert results == [evaluate_message(bot, message) for message in MESSAGES]
+    for message, result in zip(MESSAGES, results):
+        if message:
+            assert result['intent'] == bot.analyze_message(message)['intent']
+    assert evaluator.throughput_report()['messages'] == len(MESSAGES)
+
+
+def test_input_is_not_read_ahead_of_the_consumer(data_file, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    read = itertools.count()
+
+    def endless():
+        for index in itertools.count():
+            next(read)
+            yield MESSAGES[index % len(MESSAGES)]
+
+    with ParallelEvaluator(data_file, processes=2, chunk_size=5) as evaluator:
+        results = evaluator.evaluate(endless())
+        consumed = list(itertools.islice(results, 12))
+        results.close()
+
+    assert len(consumed) == 12
+    # window of 2 chunks per process, plus the one taken in when a chunk came back
+    assert next(read) <= (evaluator.window + 3) * 5
@@ -0,0 +1,66 @@
+import pytest
+
+from ChatBot.chatbot import MeowBot
+from ChatBot.data_manager import DataManager
+from ChatBot.instrumentation import Instrumentation
+
+
+@pytest.fixture
+def instrumented_bot(data_file, tmp_path):
+    data_manager = DataManager(data_file, str(tmp_path / 'memory.json'))
+    instrumentation = Instrumentation()
+    bot = MeowBot(data_file, start_session=False, data_manager=data_manager, instrumentation=instrumentation,
+                  cache_size=0, reload_interval=None)
+    yield bot
+    data_manager.close()
+
+
+def test_stages_and_counters_are_recorded_per_message(instrumented_bot):
+    instrumented_bot.get_response('helo there')
+    instrumented_bot.get_response('tell me a jok')
+    stats = instrumented_bot.get_stats()
+
+    assert stats['messages'] == 2
+    for stage in ('total', 'typo_correction', 'user_info', 'name_detection', 'sentiment', 'intent_matching',
+                  'response', 'persistence'):
+        assert stats['stages'][stage]['calls'] == 2, stage
+    assert stats['stages']['total']['total_ms'] >= stats['stages']['intent_matching']['total_ms']
+    counters = stats['counters']
+    assert counters['similarity_computations'] > 0
+    assert counters['distance_computations'] > 0 and counters['dp_cells'] > 0
+    assert stats['per_message']['similarity_computations'] == round(counters['similarity_computations'] / 2, 1)
+
+
+def test_name_introductions_skip_the_matching_stages(instrumented_bot):
+    instrumented_bot.get_response('my name is Sam')
+    stages = instrumented_bot.get_stats()['stages']
+    assert stages['name_detection']['calls'] == 1
+    assert 'sentiment' not in stages and 'intent_matching' not in stages
+
+
+def test_reset_clears_everything(instrumented_bot):
+    instrumented_bot.get_response('hello')
+    instrumented_bot.instrumentation.reset()
+    stats = instrumented_bot.get_stats()
+    assert stats['messages'] == 0 and stats['stages'] == {} and stats['counters'] == {}
+
+
+def test_log_file_gets_one_line_per_interval(data_file, tmp_path):
+    log_file = tmp_path / 'stats.log'
+    instrumentation = Instrumentation(log_file=str(log_file), log_interval=0)
+    data_manager = DataManager(data_file, str(tmp_path / 'memory.json'))
+    bot = MeowBot(data_file, start_session=False, data_manager=data_manager, instrumentation=instrumentation,
+                  reload_interval=None)
+    try:
+        bot.get_response('hello')
+        bot.get_response('hello')
+    finally:
+        instrumentation.close()
+        data_manager.close()
+    lines = log_file.read_text(encoding='utf-8').splitlines()
+    assert len(lines) >= 2
+    assert '"messages": 1' in lines[0]
+
+
+def test_instrumentation_is_off_by_default(bot):
+    assert bot.get_stats() is None
@@ -0,0 +1,74 @@
+import copy
+import json
+
+import pytest
+
+from ChatBot.intent_snapshot import IntentSnapshot
+from ChatBot.sentiment_analyzer import GenZSentimentAnalyzer
+from ChatBot.text_processor import TextProcessor
+
+MESSAGES = ['hello there', 'helo', 'how r u doing', 'tell me a jok', 'thats so mid',
+            'what is your name', 'zebra crossing stripes', 'bye bye', 'no cap fr fr']
+
+
+@pytest.fixture(scope='module')
+def data(data_file):
+    with open(data_file, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def edited(data):
+    data = copy.deepcopy(data)
+    data['jokes']['patterns'] = data['jokes']['patterns'][1:] + ['zebra stripes joke']
+    data['goodbye']['patterns'] = ['see ya later alligator']
+    data['new_intent'] = {'patterns': ['crossing the street', 'hello there'], 'responses': ['ok']}
+    return data
+
+
+def answers(snapshot):
+    index, corrector = snapshot.intent_index, snapshot.typo_corrector
+    return ([index.find_best_match(message, threshold=0.2) for message in MESSAGES],
+            [index.find_closest_matches(message, threshold=0.15, top_n=2) for message in MESSAGES],
+            [corrector.correct_text(message) for message in MESSAGES + ['zebraa', 'allligator', 'sttripes']])
+
+
+@pytest.mark.parametrize('backend', ['dp', 'bitparallel'])
+def test_reload_extends_indexes_to_match_a_fresh_build(data, backend):
+    text_processor = TextProcessor(distance_backend=backend)
+    extra_words = GenZSentimentAnalyzer().lexicon_words()
+    previous = IntentSnapshot(data, text_processor, extra_words)
+    before = answers(previous)
+    previous_tree_root = previous.intent_index.vocabulary_tree.root[1].copy()
+    previous_deletes = {variant: list(words) for variant, words in previous.typo_corrector.deletes.items()}
+
+    reloaded = IntentSnapshot(edited(data), text_processor, extra_words, previous=previous)
+    fresh = IntentSnapshot(edited(data), text_processor, extra_words)
+
+    assert reloaded.intent_index.vocabulary_tree is not previous.intent_index.vocabulary_tree
+    assert reloaded.intent_index.recompiled_intents == 3
+    assert answers(reloaded) == answers(fresh)
+    assert fresh.typo_corrector.correct_text('zebraa') == 'zebra'
+    # The previous snapshot may still be answering requests: nothing of it changed
+    assert answers(previous) == before
+    assert previous.intent_index.vocabulary_tree.root[1] == previous_tree_root
+    assert previous.typo_corrector.deletes == previous_deletes
+
+
+def test_dead_strings_eventually_trigger_a_full_rebuild(data):
+    text_processor = TextProcessor()
+    snapshot = IntentSnapshot(data, text_processor)
+    vocabulary = set(snapshot.intent_index.vocabulary)
+    renamed = copy.deepcopy(data)
+    for intent_data in renamed.values():
+        intent_data['patterns'] = [pattern + ' xyzzy' for pattern in intent_data.get('patterns', [])][:1]
+
+    reloaded = IntentSnapshot(renamed, text_processor, previous=snapshot)
+    assert set(reloaded.intent_index.vocabulary) < vocabulary | {'xyzzy'}
+    assert len(reloaded.intent_index.phrases) == len(set(reloaded.intent_index.phrase_ids))
+    assert answers(reloaded) == answers(IntentSnapshot(renamed, text_processor))
+
+
+def test_sentiment_uses_the_snapshot_corrector(bot):
+    assert bot.sentiment_analyzer.typo_corrector is None
+    words = [word['word'] for word in bot.analyze_sentiment('this is slayy', bot.snapshot)['words_found']]
+    assert words == ['slay']
@@ -0,0 +1,63 @@
+import pytest
+
+from ChatBot.chatbot import MeowBot
+from ChatBot.data_manager import DataManager
+from ChatBot.lru_cache import LRUCache
+
+
+def test_least_recently_used_key_is_dropped():
+    cache = LRUCache(2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1
+    cache.put('c', 3)
+    assert cache.get('b') is None
+    assert (cache.get('a'), cache.get('c')) == (1, 3)
+    assert cache.stats() == {'size': 2, 'maxsize': 2, 'hits': 3, 'misses': 1, 'hit_rate': 0.75}
+
+
+def test_size_zero_caches_nothing():
+    cache = LRUCache(0)
+    cache.put('a', 1)
+    assert cache.get('a') is None and len(cache) == 0
+
+
+@pytest.fixture
+def editable_bot(data_file, tmp_path):
+    intents = tmp_path / 'chatbot_data.json'
+    with open(data_file, 'r', encoding='utf-8') as f:
+        intents.write_text(f.read(), encoding='utf-8')
+    data_manager = DataManager(str(intents), str(tmp_path / 'memory.json'))
+    bot = MeowBot(str(intents), start_session=False, data_manager=data_manager, cache_size=64, reload_interval=None)
+    yield bot
+    data_manager.close()
+
+
+def test_repeated_messages_are_answered_from_the_cache(editable_bot):
+    first = editable_bot.analyze_message('tell me a jok')
+    second = editable_bot.analyze_message('Tell me a jok')
+    assert (second['intent'], second['pattern'], second['score']) == (first['intent'], first['pattern'], first['score'])
+    assert second['sentiment'] is first['sentiment']
+
+    stats = editable_bot.cache_stats()
+    assert stats['intent']['hits'] >= 1
+    assert stats['sentiment']['hits'] == 1
+
+
+def test_reload_drops_cached_matches_of_changed_patterns(editable_bot):
+    assert editable_bot.analyze_message('zebra stripes')['intent'] != 'zebras'
+    intent_cache = editable_bot.snapshot.intent_cache
+
+    # Only responses change: the patterns, and so the cached matches, still hold
+    data = editable_bot.data_manager.load_data()
+    data['jokes']['responses'].append('why did the zebra cross the road?')
+    editable_bot.data_manager.save_data(data)
+    assert editable_bot.reload_if_changed()
+    assert editable_bot.snapshot.intent_cache is intent_cache
+
+    data['zebras'] = {'patterns': ['zebra stripes'], 'responses': ['stripes!']}
+    editable_bot.data_manager.save_data(data)
+    assert editable_bot.reload_if_changed()
+    assert editable_bot.snapshot.intent_cache is not intent_cache
+    assert editable_bot.analyze_message('zebra stripes')['intent'] == 'zebras'
+    assert editable_bot.cache_stats()['intent']['hits'] == 0
@@ -0,0 +1,116 @@
+import json
+import os
+import sys
+
+import pytest
+
+from ChatBot.compiled_index import CompiledIntents, compile_intents, load_compiled_index
+from ChatBot.intent_snapshot import IntentSnapshot
+from ChatBot.compiled_lexicon import CompiledLexicon, lexicon_checksum, write_compiled_lexicon
+from ChatBot.mapped_file import CHECKSUM_SIZE, HEADER, SECTION, CorruptMappedFile, file_checksum, words_checksum
+from ChatBot.sentiment_analyzer import GenZSentimentAnalyzer
+from ChatBot.text_processor import TextProcessor
+
+MESSAGES = ['hello there', 'helo', 'how r u doing', 'tell me a jok', 'thats so mid', 'what is your name',
+            'no cap this slapss', 'im not hapy', 'bye', 'ñandú', '🔥🔥 so fire', '']
+
+
+@pytest.fixture
+def lexicon_file(tmp_path):
+    path = tmp_path / 'slang.json'
+    path.write_text(json.dumps({"positive": {"bussin fr": 1.5, "goated": 1.2}, "emoji": {"🫶": 1.0}}),
+                    encoding='utf-8')
+    return str(path)
+
+
+def answers(snapshot):
+    index, corrector = snapshot.intent_index, snapshot.typo_corrector
+    return ([index.find_best_match(message, threshold=0.2) for message in MESSAGES],
+            [index.find_closest_matches(message, threshold=0.15, top_n=2) for message in MESSAGES],
+            [corrector.correct_text(message) for message in MESSAGES])
+
+
+@pytest.mark.parametrize('backend', TextProcessor.DISTANCE_BACKENDS)
+def test_compiled_index_answers_like_the_built_one(tmp_path, data_file, backend):
+    extra_words = GenZSentimentAnalyzer().lexicon_words()
+    path = compile_intents(data_file, str(tmp_path / 'intents.idx'), extra_words)
+    compiled = load_compiled_index(path, file_checksum(data_file), words_checksum(extra_words))
+    assert compiled is not None
+
+    with open(data_file, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    text_processor = TextProcessor(distance_backend=backend)
+    built = IntentSnapshot(data, text_processor, extra_words)
+    mapped = IntentSnapshot(data, text_processor, extra_words, compiled=compiled)
+    assert mapped.intent_index.intent_patterns == built.intent_index.intent_patterns
+    assert answers(mapped) == answers(built)
+    # A reload from the mapped snapshot builds in memory again
+    assert answers(IntentSnapshot(data, text_processor, extra_words, previous=mapped)) == answers(built)
+
+
+def test_compiled_lexicon_scores_like_the_built_one(tmp_path, lexicon_file):
+    built = GenZSentimentAnalyzer()
+    path = str(tmp_path / 'builtin.lex')
+    write_compiled_lexicon(path, built, (lexicon_checksum(built),))
+    mapped = GenZSentimentAnalyzer()
+    mapped.use_compiled_lexicon(CompiledLexicon(path))
+    for message in MESSAGES + ['not very good', 'kinda mid tbh 😭', 'that hits different ❤️']:
+        assert mapped.analyze_sentiment(message) == built.analyze_sentiment(message)
+
+    extended = GenZSentimentAnalyzer(lexicon_file=lexicon_file, compiled_lexicon=str(tmp_path / 'slang.lex'))
+    assert extended.compiled_lexicon is not None
+    words = extended.analyze_sentiment('this is bussin fr 🫶')['words_found']
+    assert [(word['word'], word['score']) for word in words] == [('bussin fr', 1.5)]
+    assert extended.analyze_sentiment('this is bussin fr 🫶')['emoji_score'] == 1.0
+
+
+def truncate(path, size):
+    with open(path, 'r+b') as f:
+        f.truncate(size)
+
+
+@pytest.mark.parametrize('keep', [0.2, 0.6, 0.99])
+def test_truncated_index_is_rejected(tmp_path, data_file, keep):
+    path = compile_intents(data_file, str(tmp_path / 'intents.idx'))
+    truncate(path, int(os.path.getsize(path) * keep))
+    with pytest.raises(CorruptMappedFile):
+        CompiledIntents(path)
+    assert load_compiled_index(path, file_checksum(data_file), words_checksum(())) is None
+
+
+def test_truncated_lexicon_is_compiled_again(tmp_path, lexicon_file):
+    path = str(tmp_path / 'slang.lex')
+    analyzer = GenZSentimentAnalyzer(lexicon_file=lexicon_file, compiled_lexicon=path)
+    expected = analyzer.analyze_sentiment('this is bussin fr 🫶')
+    truncate(path, os.path.getsize(path) - 16)
+    with pytest.raises(CorruptMappedFile):
+        CompiledLexicon(path)
+
+    reloaded = GenZSentimentAnalyzer(lexicon_file=lexicon_file, compiled_lexicon=path)
+    assert reloaded.analyze_sentiment('this is bussin fr 🫶') == expected
+    CompiledLexicon(path)
+
+
+def section_position(path, wanted):
+    """(offset, byte length) of a section, read straight from the section table"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    _, _, section_count, checksum_count, _ = HEADER.unpack_from(data)
+    position = HEADER.size + CHECKSUM_SIZE * checksum_count
+    for i in range(section_count):
+        name, _, offset, length = SECTION.unpack_from(data, position + i * SECTION.size)
+        if name.rstrip(b'\x00').decode('ascii') == wanted:
+            return offset, length
+    raise KeyError(wanted)
+
+
+def test_offsets_past_their_data_are_rejected(tmp_path):
+    analyzer = GenZSentimentAnalyzer()
+    path = str(tmp_path / 'builtin.lex')
+    write_compiled_lexicon(path, analyzer, (lexicon_checksum(analyzer),))
+    offset, length = section_position(path, 'negations.offsets')
+    with open(path, 'r+b') as f:
+        f.seek(offset + length - 4)
+        f.write((1 << 30).to_bytes(4, sys.byteorder))
+    with pytest.raises(CorruptMappedFile):
+        CompiledLexicon(path)
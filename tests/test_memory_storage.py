@@ -0,0 +1,118 @@
+import gc
+import weakref
+
+import pytest
+
+from ChatBot.data_manager import DataManager
+from ChatBot.memory_storage import JsonMemoryStorage, MemoryStorage
+
+
+def test_incomplete_storage_fails_when_constructed():
+    class LoadOnly(MemoryStorage):
+        def load(self):
+            return {}
+
+    with pytest.raises(TypeError):
+        LoadOnly()
+
+
+def test_json_storage_is_a_memory_storage(tmp_path):
+    storage = JsonMemoryStorage(str(tmp_path / 'memory.json'))
+    assert isinstance(storage, MemoryStorage)
+    assert storage.load() == {"conversations": [], "user_context": {}, "session_count": 0}
+
+
+@pytest.mark.parametrize('max_conversations', [None, 3, 100])
+def test_sqlite_history_survives_a_restart(tmp_path, max_conversations):
+    memory_file = str(tmp_path / 'memory.json')
+    manager = DataManager(memory_file=memory_file, storage='sqlite', max_conversations=max_conversations)
+    session = manager.start_new_session()
+    manager.add_messages_to_memory([(f'message {i}', f'reply {i}', None) for i in range(10)])
+    manager.close()
+
+    restarted = DataManager(memory_file=memory_file, storage='sqlite', max_conversations=max_conversations)
+    try:
+        recent = restarted.get_recent_conversations(8)
+        assert [entry['user_input'] for entry in recent] == [f'message {i}' for i in range(2, 10)]
+        assert len(restarted.get_recent_conversations(8, session_id=session)) == 8
+        assert restarted.load_conversation_memory()['session_count'] == session
+    finally:
+        restarted.close()
+
+
+def test_queued_context_is_copied_when_recorded(tmp_path):
+    memory_file = str(tmp_path / 'memory.json')
+    manager = DataManager(memory_file=memory_file, storage='jsonl', flush_interval=60)
+    context = {'name': 'Bob', 'likes': ['cats']}
+    manager.add_message_to_memory('hi', 'hey', context)
+    context['name'] = 'Changed'
+    context['likes'].append('dogs')
+    manager.close()
+
+    restarted = DataManager(memory_file=memory_file, storage='jsonl')
+    try:
+        assert restarted.get_user_context() == {'name': 'Bob', 'likes': ['cats']}
+    finally:
+        restarted.close()
+
+
+def test_closed_manager_can_be_collected(tmp_path):
+    manager = DataManager(memory_file=str(tmp_path / 'memory.json'), flush_interval=60)
+    manager.add_message_to_memory('hi', 'hey')
+    manager.close()
+    ref = weakref.ref(manager)
+    del manager
+    gc.collect()
+    assert ref() is None
+
+
+@pytest.mark.parametrize('storage', ['json', 'jsonl', 'sqlite'])
+def test_close_twice_is_harmless(tmp_path, storage):
+    manager = DataManager(memory_file=str(tmp_path / 'memory.json'), storage=storage, flush_interval=60)
+    manager.add_message_to_memory('hi', 'hey')
+    manager.close()
+    manager.close()
+
+    restarted = DataManager(memory_file=str(tmp_path / 'memory.json'), storage=storage)
+    try:
+        assert [c['user_input'] for c in restarted.get_recent_conversations(5)] == ['hi']
+    finally:
+        restarted.close()
+
+
+def test_memory_is_handed_out_as_a_copy(tmp_path):
+    manager = DataManager(memory_file=str(tmp_path / 'memory.json'), flush_interval=None)
+    try:
+        manager.add_message_to_memory('hi', 'hey', {'name': 'Bob'})
+        memory = manager.load_conversation_memory()
+        memory['conversations'].clear()
+        memory['user_context']['name'] = 'Changed'
+        manager.get_user_context()['name'] = 'Changed'
+        assert len(manager.load_conversation_memory()['conversations']) == 1
+        assert manager.get_user_context() == {'name': 'Bob'}
+    finally:
+        manager.close()
+
+
+def test_jsonl_replay_drops_a_torn_last_line(tmp_path):
+    memory_file = str(tmp_path / 'memory.json')
+    manager = DataManager(memory_file=memory_file, storage='jsonl', flush_interval=60)
+    manager.add_messages_to_memory([('hi', 'hey', {'name': 'Bob'}), ('sup', 'nm', None)])
+    manager.close()
+    log_file = manager.storage.log_file
+    with open(log_file, 'a') as f:
+        f.write('{"type": "conversation", "user_in')  # crash in the middle of an append
+
+    restarted = DataManager(memory_file=memory_file, storage='jsonl', flush_interval=60)
+    assert [entry['user_input'] for entry in restarted.get_recent_conversations(5)] == ['hi', 'sup']
+    assert restarted.get_user_context() == {'name': 'Bob'}
+    with open(log_file) as f:
+        assert f.read().endswith('}\n')
+    restarted.add_message_to_memory('later', 'ok')
+    restarted.close()
+
+    again = DataManager(memory_file=memory_file, storage='jsonl')
+    try:
+        assert [entry['user_input'] for entry in again.get_recent_conversations(5)] == ['hi', 'sup', 'later']
+    finally:
+        again.close()
@@ -0,0 +1,60 @@
+import json
+import random
+
+import pytest
+
+from ChatBot.intent_index import IntentIndex
+from ChatBot.ngram_index import NGramIndex
+from ChatBot.text_processor import TextProcessor
+
+THRESHOLDS = (0.15, 0.2, 0.3, 0.5, 0.7, 0.9)
+
+
+def random_words(rng, count):
+    return [''.join(rng.choice('abcdeh ') for _ in range(rng.randint(0, 14))) for _ in range(count)]
+
+
+def test_count_filter_never_drops_a_match():
+    rng = random.Random(0)
+    text_processor = TextProcessor()
+    items = random_words(rng, 300)
+    index = NGramIndex()
+    for item_id, item in enumerate(items):
+        index.add(item_id, item)
+
+    for text in random_words(rng, 100) + items[:20]:
+        similarities = [text_processor.levenshtein_similarity(text, item) for item in items]
+        for threshold in THRESHOLDS:
+            candidates = index.candidates(text, threshold)
+            for item_id, similarity in enumerate(similarities):
+                if similarity >= threshold:
+                    assert item_id in candidates, (text, items[item_id], threshold)
+
+
+def test_extended_index_leaves_the_original_alone():
+    index = NGramIndex()
+    for item_id, item in enumerate(['hello', 'help me', 'bye']):
+        index.add(item_id, item)
+    before = {gram: list(postings) for gram, postings in index.postings.items()}
+
+    extended = index.extended([(3, 'hello there'), (4, 'yo')])
+    assert index.postings == before and len(index) == 3
+    assert {0, 3} <= extended.candidates('hello there', 0.4)
+    assert 4 in extended.candidates('yo', 0.9)
+
+
+@pytest.mark.parametrize('threshold', [0.15, 0.2, 0.5])
+def test_candidates_keep_every_entry_reaching_the_threshold(data_file, threshold):
+    with open(data_file, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    index = IntentIndex(data)
+    similarity = index.text_processor.compiled_similarity
+    messages = ['helo there', 'how r u', 'tell me a joke pls', 'thats lowkey mid', 'who made u',
+                'what can you do', 'im so bored rn', 'gm bestie', 'xyz', '']
+
+    for message in messages:
+        compiled_input = index.compile_input(message, threshold)
+        candidates = set(index.candidates(compiled_input, threshold))
+        for entry_id, entry in enumerate(index.entries):
+            if similarity(compiled_input, entry) >= threshold:
+                assert entry_id in candidates, (message, entry.text)
@@ -0,0 +1,114 @@
+import random
+import re
+
+import pytest
+
+from ChatBot.sentiment_analyzer import GenZSentimentAnalyzer
+from ChatBot.typo_corrector import TypoCorrector
+
+# Phrase names the word-by-word analyzer reported
+OLD_PHRASE_NAMES = {'nocap_positive': 'no cap', 'hitsdifferent_positive': 'hits different'}
+
+
+def word_by_word_analysis(analyzer, text):
+    """
+    The analyzer as it was before the lexicon automaton: phrases rewritten with
+    re.sub, then one lexicon lookup per word. Kept here as the reference.
+    """
+    text_with_phrases = re.sub(r'\bno cap\b', 'NOCAP_POSITIVE', text, flags=re.IGNORECASE)
+    text_with_phrases = re.sub(r'\bhits different\b', 'HITSDIFFERENT_POSITIVE', text_with_phrases, flags=re.IGNORECASE)
+    words = text_with_phrases.lower().split()
+    sentiment_score = 0.0
+    found_words = []
+    emoji_score = sum(analyzer.emoji_sentiment.get(char, 0) for char in text)
+    sentiment_score += emoji_score
+
+    for i, word in enumerate(words):
+        clean_word = re.sub(r'[^\w\s]', '', word)
+        word_score = None
+        if clean_word in analyzer.sentiment_words['positive']:
+            word_score = analyzer.sentiment_words['positive'][clean_word]
+        elif clean_word in analyzer.sentiment_words['negative']:
+            word_score = analyzer.sentiment_words['negative'][clean_word]
+        elif clean_word in OLD_PHRASE_NAMES:
+            word_score = 0.8
+        elif analyzer.typo_corrector is not None:
+            correction, _ = analyzer.typo_corrector.lookup(clean_word, accept=analyzer.correctable_words)
+            if correction is not None:
+                clean_word = correction
+                word_score = analyzer.sentiment_words['positive'].get(
+                    correction, analyzer.sentiment_words['negative'].get(correction)
+                )
+
+        if word_score is not None:
+            modifier = 1.0
+            if i > 0 and words[i - 1] in analyzer.intensity_modifiers:
+                modifier = analyzer.intensity_modifiers[words[i - 1]]
+            negated = False
+            if i > 0 and any(words[j] in analyzer.negation_words for j in range(max(0, i - 2), i)):
+                negated = True
+                word_score *= -0.7
+            final_score = word_score * modifier
+            sentiment_score += final_score
+            found_words.append({'word': OLD_PHRASE_NAMES.get(clean_word, clean_word), 'score': final_score,
+                                'negated': negated, 'modifier': modifier})
+
+    overall = 'positive' if sentiment_score > 0.4 else 'negative' if sentiment_score < -0.4 else 'neutral'
+    return {
+        'score': round(sentiment_score, 2),
+        'overall': overall,
+        'intensity': round(abs(sentiment_score), 2),
+        'words_found': found_words,
+        'emoji_score': round(emoji_score, 2),
+        'confidence': min(1.0, abs(sentiment_score) / 2.0)
+    }
+
+
+def messages(analyzer, count=2000, seed=0):
+    """
+    Random messages over the lexicon, modifiers, negations, typos and emoji.
+    Left out are the deliberate differences of the automaton: 'goes hard' (now
+    its listed score), multi-codepoint emoji, punctuation before a modifier or
+    negation, 'dont' without an apostrophe and the uppercase-only 'L'.
+    """
+    rng = random.Random(seed)
+    lexicon = [word for word in analyzer.lexicon_words() if word != 'L']
+    vocabulary = (lexicon + list(analyzer.intensity_modifiers) + sorted(analyzer.negation_words) +
+                  ['no cap', 'hits different', 'No Cap', 'slayy', 'bussinn', 'trashh', 'cringee'] +
+                  ['i', 'the', 'this', 'is', 'movie', 'honestly', 'bro', 'a', 'fine', 'mind'])
+    emoji = [char for char in analyzer.emoji_sentiment if len(char) == 1]
+    result = []
+    for _ in range(count):
+        words = [rng.choice(vocabulary) for _ in range(rng.randint(1, 8))]
+        if rng.random() < 0.3:
+            words[rng.randrange(len(words))] = rng.choice(vocabulary).upper()
+        text = ' '.join(words)
+        if rng.random() < 0.3:
+            text += rng.choice(['!', '!!', '?', '.'])
+        if rng.random() < 0.3:
+            text += ' ' + ''.join(rng.choice(emoji) for _ in range(rng.randint(1, 3)))
+        result.append(text)
+    return result
+
+
+@pytest.fixture(scope='module')
+def analyzer():
+    analyzer = GenZSentimentAnalyzer()
+    analyzer.typo_corrector = TypoCorrector(analyzer.lexicon_words())
+    return analyzer
+
+
+def test_automaton_matches_the_word_by_word_analyzer(analyzer):
+    for text in messages(analyzer):
+        assert analyzer.analyze_sentiment(text) == word_by_word_analysis(analyzer, text), text
+
+
+def test_batch_matches_single_analysis(analyzer):
+    pytest.importorskip('numpy')
+    texts = messages(analyzer, 300, seed=1)
+    batch = analyzer.analyze_batch(texts)
+    for i, text in enumerate(texts):
+        single = analyzer.analyze_sentiment(text)
+        assert batch['score'][i] == single['score']
+        assert batch['overall'][i] == single['overall']
+        assert batch['word_count'][i] == len(single['words_found'])
@@ -0,0 +1,160 @@
+import asyncio
+import json
+import struct
+import threading
+import time
+
+from ChatBot.server import (CLOSE, CONTINUATION, MAX_BODY_BYTES, MESSAGE_TOO_BIG, PROTOCOL_ERROR, TEXT,
+                            ChatServer, parse_args)
+from ChatBot.session_manager import DEFAULT_SESSION_DIR
+
+
+class RecordingWriter:
+    def __init__(self):
+        self.data = bytearray()
+
+    def write(self, data):
+        self.data += data
+
+    async def drain(self):
+        pass
+
+
+class FakeSessions:
+    """Session manager whose replies wait until release is set"""
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.release = threading.Event()
+        self.started = threading.Event()
+        self.bot = self
+
+    def get_result(self, user_id, message):
+        self.started.set()
+        self.release.wait(5)
+        time.sleep(self.delay)
+        return {'intent': 'greeting', 'score': 1.0, 'sentiment': {'overall': 'positive'},
+                'response': f"hi {user_id}"}
+
+    def end_session(self, user_id, save=True):
+        pass
+
+    def stats(self):
+        return {}
+
+    def get_stats(self):
+        return {}
+
+    def close(self):
+        pass
+
+
+async def post_chat(port, payload):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    body = json.dumps(payload).encode('utf-8')
+    writer.write(b"POST /chat HTTP/1.1\r\nConnection: close\r\nContent-Length: %d\r\n\r\n" % len(body) + body)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, body = response.split(b'\r\n\r\n', 1)
+    return head.decode('latin-1'), json.loads(body)
+
+
+def client_frame(opcode, payload, fin):
+    """Masked client frame (with an all-zero mask, so the payload goes through as is)"""
+    first = (0x80 if fin else 0) | opcode
+    if len(payload) < 126:
+        header = struct.pack('!BB', first, 0x80 | len(payload))
+    else:
+        header = struct.pack('!BBH', first, 0x80 | 126, len(payload))
+    return header + b'\x00' * 4 + payload
+
+
+def run_session(frames):
+    async def session():
+        reader = asyncio.StreamReader()
+        for frame in frames:
+            reader.feed_data(frame)
+        reader.feed_eof()
+        writer = RecordingWriter()
+        server = ChatServer(session_manager=object())
+        try:
+            await server.websocket_session(reader, writer, {'sec-websocket-key': 'dGhlIHNhbXBsZSBub25jZQ=='}, 'alice')
+        finally:
+            server.executor.shutdown()
+        return bytes(writer.data)
+    return asyncio.run(session())
+
+
+def test_endless_continuation_frames_are_closed_with_1009():
+    chunk = b'x' * (MAX_BODY_BYTES // 4)
+    frames = [client_frame(TEXT, chunk, fin=False)]
+    frames += [client_frame(CONTINUATION, chunk, fin=False) for _ in range(10)]
+    reply = run_session(frames)
+
+    close = struct.pack('!BB', 0x80 | CLOSE, 2 + len(b'message too big')) + struct.pack('!H', MESSAGE_TOO_BIG)
+    assert reply.split(b'\r\n\r\n', 1)[1].startswith(close)
+
+
+def test_oversized_frame_is_closed_with_1009():
+    frame = struct.pack('!BBQ', 0x80 | TEXT, 0x80 | 127, MAX_BODY_BYTES + 1) + b'\x00' * 4
+    reply = run_session([frame])
+    assert struct.pack('!H', MESSAGE_TOO_BIG) in reply.split(b'\r\n\r\n', 1)[1]
+
+
+def test_unmasked_frame_is_closed_with_1002():
+    frame = struct.pack('!BB', 0x80 | TEXT, 2) + b'hi'
+    reply = run_session([frame])
+    assert reply.split(b'\r\n\r\n', 1)[1][2:4] == struct.pack('!H', PROTOCOL_ERROR)
+
+
+def test_http_chat_replies_and_reports_latency_from_arrival():
+    async def scenario():
+        sessions = FakeSessions(delay=0.05)
+        server = ChatServer(session_manager=sessions, port=0, max_workers=1, max_pending=4)
+        await server.start()
+        try:
+            # The second request waits for the only worker, which shows up in both trackers
+            first = asyncio.ensure_future(post_chat(server.port, {'message': 'hello', 'user_id': 'alice'}))
+            second = asyncio.ensure_future(post_chat(server.port, {'message': 'hello', 'user_id': 'bob'}))
+            await asyncio.sleep(0.1)
+            sessions.release.set()
+            return await first, await second, server.stats()
+        finally:
+            await server.close()
+
+    (head, reply), _, stats = asyncio.run(scenario())
+    assert head.startswith('HTTP/1.1 200')
+    assert reply == {'user_id': 'alice', 'response': 'hi alice', 'intent': 'greeting',
+                     'score': 1.0, 'sentiment': 'positive'}
+    assert stats['latency']['requests'] == 2
+    assert stats['latency']['max_ms'] >= 100  # the wait before release counts
+    assert stats['queue_wait']['requests'] == 2
+
+
+def test_http_chat_answers_503_when_every_slot_is_taken():
+    async def scenario():
+        sessions = FakeSessions()
+        server = ChatServer(session_manager=sessions, port=0, max_workers=1, max_pending=1)
+        await server.start()
+        try:
+            first = asyncio.ensure_future(post_chat(server.port, {'message': 'hello'}))
+            await asyncio.get_running_loop().run_in_executor(None, sessions.started.wait, 5)
+            busy = await post_chat(server.port, {'message': 'hello again'})
+            sessions.release.set()
+            return busy, await first, server.stats()
+        finally:
+            await server.close()
+
+    (head, payload), (first_head, _), stats = asyncio.run(scenario())
+    assert head.startswith('HTTP/1.1 503')
+    assert 'Retry-After: 1' in head
+    assert payload == {'error': 'busy, try again'}
+    assert first_head.startswith('HTTP/1.1 200')
+    assert stats['rejected'] == 1
+
+
+def test_cli_defaults_keep_sessions_in_the_package():
+    args = parse_args([])
+    assert args.session_dir == DEFAULT_SESSION_DIR
+    assert (args.host, args.port, args.workers, args.max_pending) == ('127.0.0.1', 8765, 4, 64)
+    assert parse_args(['--session-dir', 'elsewhere']).session_dir == 'elsewhere'
@@ -0,0 +1,84 @@
+import json
+import os
+import threading
+
+from ChatBot.session_manager import DEFAULT_SESSION_DIR, SessionManager
+
+
+def test_default_session_dir_is_inside_the_package():
+    assert DEFAULT_SESSION_DIR == os.path.join(os.path.dirname(os.path.abspath(__import__('ChatBot').__file__)),
+                                               'data', 'sessions')
+    assert '\\' not in os.path.relpath(DEFAULT_SESSION_DIR)
+
+
+def test_session_files_are_read_without_the_lock(tmp_path, bot):
+    manager = SessionManager(bot=bot, session_dir=str(tmp_path))
+    with open(manager.session_file('alice'), 'w') as f:
+        json.dump({"user_id": 'alice', "user_context": {"name": 'Alice'}, "message_count": 3}, f)
+
+    reading = threading.Event()
+    release = threading.Event()
+    restore_session = manager.restore_session
+
+    def slow_restore(user_id):
+        assert not manager._lock.locked()
+        if user_id == 'alice':
+            reading.set()
+            assert release.wait(5)
+        return restore_session(user_id)
+
+    manager.restore_session = slow_restore
+    sessions = []
+    first = threading.Thread(target=lambda: sessions.append(manager.get_session('alice')))
+    first.start()
+    assert reading.wait(5)
+    # Other users are served while alice's file is being read...
+    assert manager.get_session('bob', pin=True).user_id == 'bob'
+    # ...and a second request for alice waits for that read rather than starting its own
+    second = threading.Thread(target=lambda: sessions.append(manager.get_session('alice')))
+    second.start()
+    release.set()
+    first.join(5)
+    second.join(5)
+
+    assert len(sessions) == 2 and sessions[0] is sessions[1]
+    assert sessions[0].user_context == {"name": 'Alice'}
+    assert manager.restores == 1
+    assert not manager.loading
+
+
+def test_cold_sessions_are_evicted_and_restored_from_disk(tmp_path, bot):
+    manager = SessionManager(bot=bot, session_dir=str(tmp_path), max_active_sessions=2)
+    assert manager.get_response('alice', 'my name is Alice') == 'Hey there, Alice!'
+    manager.get_response('bob', 'hello')
+    manager.get_response('carol', 'hello')
+
+    assert list(manager.sessions) == ['bob', 'carol']
+    assert manager.evictions == 1
+    with open(manager.session_file('alice')) as f:
+        saved = json.load(f)
+    assert saved['user_context'] == {'name': 'Alice'} and saved['message_count'] == 1
+
+    alice = manager.get_session('alice')
+    assert alice.user_context == {'name': 'Alice'}
+    assert list(alice.recent_conversations) == [{'user_input': 'my name is Alice', 'bot_response': 'Hey there, Alice!'}]
+    assert manager.restores == 1
+    assert list(manager.sessions) == ['carol', 'alice']
+    assert manager.stats()['active_sessions'] == 2
+
+
+def test_corrupt_session_file_starts_a_new_session(tmp_path, bot):
+    manager = SessionManager(bot=bot, session_dir=str(tmp_path))
+    path = manager.session_file('alice')
+    with open(path, 'w') as f:
+        f.write('{"user_id": "alice", "user_con')
+
+    assert manager.get_response('alice', 'my name is Alice') == 'Hey there, Alice!'
+    assert manager.get_session('alice').message_count == 1
+    assert manager.restores == 0
+    assert not os.path.exists(path)
+    with open(path + '.corrupt') as f:
+        assert f.read().startswith('{"user_id"')
+
+    manager.close()
+    assert manager.restore_session('alice').user_context == {'name': 'Alice'}
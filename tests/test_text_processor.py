@@ -0,0 +1,76 @@
+import random
+
+import pytest
+
+from ChatBot.text_processor import TextProcessor
+
+
+def plain_distance(s1, s2):
+    """Full DP table, no band and no early exit"""
+    previous_row = list(range(len(s2) + 1))
+    for i, c1 in enumerate(s1, 1):
+        current_row = [i]
+        for j, c2 in enumerate(s2, 1):
+            current_row.append(min(previous_row[j] + 1, current_row[j - 1] + 1, previous_row[j - 1] + (c1 != c2)))
+        previous_row = current_row
+    return previous_row[-1]
+
+
+def random_pairs(count=400, seed=0, max_length=12):
+    rng = random.Random(seed)
+    pairs = [('', ''), ('', 'abc'), ('abc', ''), ('same', 'same'), ('kitten', 'sitting'), ('ñandú', 'nandu')]
+    for _ in range(count):
+        s1 = ''.join(rng.choice('abcde') for _ in range(rng.randint(0, max_length)))
+        s2 = ''.join(rng.choice('abcde') for _ in range(rng.randint(0, max_length)))
+        pairs.append((s1, s2))
+    return pairs
+
+
+@pytest.mark.parametrize('backend', TextProcessor.DISTANCE_BACKENDS)
+def test_distance_matches_plain_dp(backend):
+    text_processor = TextProcessor(distance_backend=backend)
+    for s1, s2 in random_pairs():
+        assert text_processor.levenshtein_distance(s1, s2) == plain_distance(s1, s2), (s1, s2)
+
+
+@pytest.mark.parametrize('backend', TextProcessor.DISTANCE_BACKENDS)
+def test_bounded_distance_is_exact_within_the_bound(backend):
+    text_processor = TextProcessor(distance_backend=backend)
+    for s1, s2 in random_pairs(seed=1):
+        distance = plain_distance(s1, s2)
+        for max_distance in range(6):
+            expected = distance if distance <= max_distance else max_distance + 1
+            assert text_processor.levenshtein_distance(s1, s2, max_distance) == expected, (s1, s2, max_distance)
+
+
+def test_banded_distance_needs_the_longer_string_first():
+    text_processor = TextProcessor()
+    for s1, s2 in random_pairs(seed=2):
+        longer, shorter = (s1, s2) if len(s1) >= len(s2) else (s2, s1)
+        for max_distance in range(4):
+            distance = plain_distance(longer, shorter)
+            expected = distance if distance <= max_distance else max_distance + 1
+            assert text_processor.bounded_levenshtein_distance(longer, shorter, max_distance) == expected
+
+
+def test_bit_parallel_handles_patterns_over_64_characters():
+    text_processor = TextProcessor(distance_backend='bitparallel')
+    rng = random.Random(3)
+    for _ in range(20):
+        s1 = ''.join(rng.choice('abc') for _ in range(rng.randint(60, 150)))
+        s2 = ''.join(rng.choice('abc') for _ in range(rng.randint(60, 150)))
+        masks = text_processor.build_char_masks(s2)
+        assert text_processor.levenshtein_distance(s1, s2, None, masks) == plain_distance(s1, s2)
+
+
+@pytest.mark.parametrize('backend', TextProcessor.DISTANCE_BACKENDS)
+def test_similarity_is_exact_at_or_above_the_threshold(backend):
+    text_processor = TextProcessor(distance_backend=backend)
+    for s1, s2 in random_pairs(seed=4):
+        exact = text_processor.levenshtein_similarity(s1, s2)
+        for threshold in (0.15, 0.2, 0.5, 0.8):
+            bounded = text_processor.levenshtein_similarity(s1, s2, threshold)
+            if exact >= threshold:
+                assert bounded == exact
+            else:
+                assert bounded < threshold
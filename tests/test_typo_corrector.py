@@ -0,0 +1,113 @@
+import random
+
+import pytest
+
+from ChatBot.sentiment_analyzer import GenZSentimentAnalyzer
+from ChatBot.typo_corrector import TypoCorrector, load_common_words
+
+
+@pytest.fixture
+def corrector():
+    words = ['hello', 'help', 'slay', 'bussin', 'trash', 'hate', 'fire', 'mid', 'love']
+    return TypoCorrector(words, known_words=load_common_words())
+
+
+def test_lookup_corrects_misspelled_words(corrector):
+    assert corrector.lookup('slayy') == ('slay', 1)
+    assert corrector.lookup('bussinn') == ('bussin', 1)
+    assert corrector.lookup('hellooo') == ('hello', 2)
+
+
+def test_lookup_leaves_known_words_alone(corrector):
+    for word in ('have', 'fine', 'mind', 'live', 'never'):
+        assert corrector.lookup(word, accept={'hate', 'fire', 'mid', 'love'}) == (None, None)
+        assert corrector.lookup(word) == (word, 0)
+
+
+def test_short_words_get_less_slack(corrector):
+    assert corrector.max_distance_for('cap') == 0
+    assert corrector.lookup('mdi') == (None, None)
+    assert corrector.max_distance_for('have') == 0
+    assert corrector.max_distance_for('haet') == 1
+    assert corrector.lookup('helo') == ('hello', 1)
+    assert corrector.lookup('slyy') == ('slay', 1)
+
+
+def test_lookup_matches_brute_force():
+    words = ['slay', 'slays', 'slayed', 'bussin', 'busy', 'trash', 'trashy', 'goated', 'based', 'vibes']
+    corrector = TypoCorrector(words)
+    distance = corrector.text_processor.levenshtein_distance
+    for word in ['slayy', 'bussinn', 'trasher', 'goatted', 'vibez', 'basedd', 'slayedd', 'xxxxxx']:
+        limit = corrector.max_distance_for(word)
+        best = min(((distance(word, w), i) for i, w in enumerate(words) if distance(word, w) <= limit), default=None)
+        expected = (words[best[1]], best[0]) if best else (None, None)
+        assert corrector.lookup(word) == expected
+
+
+def symspell_brute_force(corrector, word, max_edit_distance):
+    """Closest word by (distance, more occurrences, added first), checking every word"""
+    distance = corrector.text_processor.levenshtein_distance
+    keys = [(distance(word, candidate), -count, corrector.word_ranks[candidate], candidate)
+            for candidate, count in corrector.word_counts.items()]
+    best = min((key for key in keys if key[0] <= max_edit_distance), default=None)
+    return (best[3], best[0]) if best else (None, None)
+
+
+def random_words(rng, count):
+    return [''.join(rng.choice('abcdefg') for _ in range(rng.randint(1, 9))) for _ in range(count)]
+
+
+def test_lookup_matches_brute_force_at_every_distance():
+    rng = random.Random(0)
+    corrector = TypoCorrector(random_words(rng, 500))
+    for word in random_words(rng, 200):
+        for max_edit_distance in range(3):
+            assert corrector.lookup(word, max_edit_distance) == \
+                symspell_brute_force(corrector, word, max_edit_distance), (word, max_edit_distance)
+
+
+def test_rebuilt_corrector_matches_a_fresh_one():
+    rng = random.Random(1)
+    old_words, new_words = random_words(rng, 300), random_words(rng, 300)
+    words = old_words[100:] + new_words[:150] + old_words[150:200]
+    previous = TypoCorrector(old_words)
+    deletes = {variant: list(candidates) for variant, candidates in previous.deletes.items()}
+
+    rebuilt, fresh = previous.rebuilt(words), TypoCorrector(words)
+    assert rebuilt.word_counts == fresh.word_counts and rebuilt.word_ranks == fresh.word_ranks
+    assert {variant: sorted(candidates) for variant, candidates in rebuilt.deletes.items()} == \
+        {variant: sorted(candidates) for variant, candidates in fresh.deletes.items()}
+    assert previous.deletes == deletes
+    for word in random_words(rng, 100):
+        assert rebuilt.lookup(word, 2) == fresh.lookup(word, 2)
+
+
+def test_correct_text_keeps_the_message_as_written(corrector):
+    assert corrector.correct_text('I have a fine mind') == 'I have a fine mind'
+    assert corrector.correct_text('Hellooo there, SLAYY!') == 'Hello there, SLAY!'
+    assert corrector.correct_text('"helo," she said') == '"hello," she said'
+    assert corrector.correct_text('Helloo!') == 'Hello!'
+
+
+@pytest.mark.parametrize('sentence, wrong_word', [
+    ('I have a dog', 'hate'),
+    ('I am fine', 'fire'),
+    ('never mind', 'mid'),
+    ('where do you live', 'love'),
+])
+def test_everyday_words_are_not_read_as_slang(bot, sentence, wrong_word):
+    analysis = bot.analyze_message(sentence)
+    assert analysis['corrected_input'] == sentence
+    assert wrong_word not in [found['word'] for found in analysis['sentiment']['words_found']]
+    assert analysis['sentiment']['score'] == 0
+
+
+def test_handle_typos_returns_the_original_text(bot):
+    assert bot.handle_typos_and_variations('I have a fine mind') == 'I have a fine mind'
+    assert bot.handle_typos_and_variations('this is bussinn') == 'this is bussin'
+
+
+def test_misspelled_slang_still_scores():
+    corrector = TypoCorrector(['slay'], known_words=load_common_words())
+    analyzer = GenZSentimentAnalyzer(typo_corrector=corrector)
+    assert analyzer.analyze_sentiment('slayy')['words_found'][0]['word'] == 'slay'